@@ -1,8 +1,25 @@
 import fire
 
-from src import clockify, google_sheets, jira, openai, toggl, wrike
+from src import (
+    clockify,
+    daemon,
+    events,
+    export,
+    google_sheets,
+    jira,
+    openai,
+    pipeline,
+    rollups,
+    store,
+    team,
+    toggl,
+    warm,
+    webhooks,
+    wrike,
+)
 
 if __name__ == "__main__":
+    events.setup()
     fire.Fire(
         {
             "toggl": toggl,
@@ -11,5 +28,13 @@ if __name__ == "__main__":
             "openai": openai,
             "google_sheets": google_sheets,
             "clockify": clockify,
+            "export": export,
+            "daemon": daemon,
+            "pipeline": pipeline,
+            "rollups": rollups,
+            "store": store,
+            "team": team,
+            "warm": warm,
+            "webhooks": webhooks,
         }
     )
@@ -0,0 +1,143 @@
+import datetime
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+
+import requests
+
+from .config import SYNC_JOURNAL_PATH
+
+logger = logging.getLogger("checkpoint")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    key TEXT PRIMARY KEY,
+    target TEXT NOT NULL,
+    status TEXT NOT NULL,
+    detail TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class ProviderError(Exception):
+    """The provider answered with a rate limit or server error, the row itself may be fine."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_provider_error(error):
+    """
+    Whether an exception or failed response is the provider's fault, not the row's.
+
+    Rate limits (429), server errors (5xx) and failed connections count towards
+    the CircuitBreaker, a rejected row only fails that row.
+    """
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+def connect(path=SYNC_JOURNAL_PATH):
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def write_keys(target, writes):
+    """
+    Return a journal key per write, from the target and the content of the write.
+
+    The key doesn't depend on the position of the row in the sheet, so rows can
+    be moved or inserted between runs. Identical writes get distinct keys by
+    their occurrence number.
+    """
+    keys = []
+    occurrences = {}
+    for write in writes:
+        content = json.dumps([target, write], sort_keys=True, default=str)
+        digest = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        occurrences[digest] = occurrences.get(digest, 0) + 1
+        keys.append(f"{digest}:{occurrences[digest]}")
+    return keys
+
+
+def done_keys(connection, keys):
+    """Return the keys among `keys` already written in a previous run."""
+    done = set()
+    for start in range(0, len(keys), 500):
+        batch = keys[start : start + 500]
+        rows = connection.execute(
+            f"""
+            SELECT key FROM journal
+            WHERE status = 'written' AND key IN ({", ".join("?" * len(batch))})
+            """,
+            batch,
+        )
+        done.update(key for (key,) in rows)
+    return done
+
+
+def record(connection, key, target, status, detail=""):
+    """Record the outcome of a write, committed right away so it survives a crash."""
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO journal VALUES (?, ?, ?, ?, ?)",
+            (
+                key,
+                target,
+                status,
+                str(detail),
+                datetime.datetime.now().isoformat(timespec="seconds"),
+            ),
+        )
+
+
+class CircuitBreaker:
+    """
+    Pause after `threshold` provider errors in a row, instead of sending more requests.
+
+    Callers record successful writes and provider errors (see is_provider_error),
+    not rows the provider rejected.
+
+    Each pause is twice as long as the previous one. After `max_pauses` pauses
+    without a successful write in between, CircuitOpenError is raised to stop
+    the run, which can then be resumed later.
+    """
+
+    def __init__(self, threshold=5, pause=30, max_pauses=3):
+        self.threshold = threshold
+        self.pause = pause
+        self.max_pauses = max_pauses
+        self.failures = 0
+        self.pauses = 0
+
+    def record(self, success):
+        if success:
+            self.failures = 0
+            self.pauses = 0
+            return
+
+        self.failures += 1
+        if self.failures < self.threshold:
+            return
+        if self.pauses >= self.max_pauses:
+            raise CircuitOpenError(
+                f"Stopped after {self.pauses} pauses, the provider keeps failing"
+            )
+        delay = self.pause * 2**self.pauses
+        logger.warning(f"{self.failures} errors in a row, pausing for {delay} seconds")
+        time.sleep(delay)
+        self.pauses += 1
+        self.failures = 0
@@ -2,7 +2,18 @@ from datetime import datetime
 
 import requests
 
-from .config import CLOCKIFY_API_KEY, CLOCKIFY_API_URL
+from . import rate_limit
+from .config import (
+    CLOCKIFY_API_KEY,
+    CLOCKIFY_API_URL,
+    CLOCKIFY_REPORTS_API_URL,
+    CLOCKIFY_REQUESTS_PER_MINUTE,
+)
+from .reports import fetch_report
+from .utils import as_list
+
+# Largest page Clockify returns for a detailed report
+REPORT_PAGE_SIZE = 1000
 
 headers = {
     "X-Api-Key": CLOCKIFY_API_KEY,
@@ -10,6 +21,10 @@ headers = {
 }
 
 
+def _throttle():
+    rate_limit.wait("clockify", CLOCKIFY_API_KEY, CLOCKIFY_REQUESTS_PER_MINUTE)
+
+
 def validate_date(date_str):
     try:
         return datetime.strptime(date_str, "%Y-%m-%d")
@@ -29,6 +44,7 @@ def get_time_entries(workspace_id, start_date, end_date):
         "start": start_date.isoformat() + "Z",
         "end": end_date.isoformat() + "Z",
     }
+    _throttle()
     response = requests.get(
         f"{CLOCKIFY_API_URL}/workspaces/{workspace_id}/time-entries",
         headers=headers,
@@ -49,6 +65,8 @@ def add_time_entry(workspace_id, start_time, end_time, description):
         # Add more fields as per Clockify API requirements
     }
 
+    _throttle()
+
     response = requests.post(
         f"{CLOCKIFY_API_URL}/workspaces/{workspace_id}/time-entries",
         headers=headers,
@@ -62,8 +80,83 @@ def add_time_entry(workspace_id, start_time, end_time, description):
 
 
 def get_workspaces():
+    _throttle()
     response = requests.get(f"{CLOCKIFY_API_URL}/workspaces", headers=headers)
     if response.status_code == 200:
         return response.json()
     else:
         response.raise_for_status()
+
+
+def _report_date_range(start_date, end_date):
+    if validate_date(start_date) > validate_date(end_date):
+        raise ValueError("The start date cannot be later than the end date")
+    # Both days are included in the report
+    return {
+        "dateRangeStart": f"{start_date}T00:00:00.000Z",
+        "dateRangeEnd": f"{end_date}T23:59:59.999Z",
+        "exportType": "JSON",
+    }
+
+
+def _post_report(workspace_id, report_type, body):
+    _throttle()
+    response = requests.post(
+        f"{CLOCKIFY_REPORTS_API_URL}/workspaces/{workspace_id}/reports/{report_type}",
+        headers=headers,
+        json=body,
+    )
+
+    if response.status_code == 200:
+        return response.json()
+    else:
+        response.raise_for_status()
+
+
+def get_summary_report(workspace_id, start_date, end_date, groups=("PROJECT", "TASK")):
+    """
+    Get the time totals of a workspace, grouped and summed by Clockify.
+
+    Example, hours per user and project last quarter:
+        python main.py clockify get_summary_report --workspace_id=ID \
+            --start_date=2024-07-01 --end_date=2024-09-30 --groups=USER,PROJECT
+
+    :param groups: Up to three of PROJECT, CLIENT, TASK, TAG, USER, DATE...
+    :return: The summary report, with nested groupOne and children totals in seconds.
+    """
+    groups = as_list(groups)
+    body = {
+        **_report_date_range(start_date, end_date),
+        "summaryFilter": {"groups": groups},
+    }
+    return fetch_report(
+        ("clockify", "summary", workspace_id, start_date, end_date, tuple(groups)),
+        end_date,
+        lambda: _post_report(workspace_id, "summary", body),
+        CLOCKIFY_API_KEY,
+    )
+
+
+def iter_detailed_report(
+    workspace_id, start_date, end_date, page_size=REPORT_PAGE_SIZE
+):
+    """Yield the entries of a detailed report, one page at a time."""
+    date_range = _report_date_range(start_date, end_date)
+    key = ("clockify", "detailed", workspace_id, start_date, end_date, page_size)
+    page = 1
+    while True:
+        body = {
+            **date_range,
+            "detailedFilter": {"page": page, "pageSize": page_size},
+        }
+        report = fetch_report(
+            (*key, page),
+            end_date,
+            lambda: _post_report(workspace_id, "detailed", body),
+            CLOCKIFY_API_KEY,
+        )
+        entries = report.get("timeentries", [])
+        yield from entries
+        if len(entries) < page_size:
+            return
+        page += 1
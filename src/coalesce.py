@@ -0,0 +1,80 @@
+import datetime
+
+# Largest gap between two Jira worklogs that still counts as contiguous
+CONTIGUOUS_GAP = datetime.timedelta(minutes=1)
+
+
+def _join_comments(comments):
+    # Keep the order of the rows, drop empty and repeated comments
+    return "; ".join(dict.fromkeys(comment for comment in comments if comment))
+
+
+def coalesce_timelog_rows(rows):
+    """
+    Merge Wrike sheet rows (date, hours, comment, task_key) with the same task and date.
+
+    Hours are added up and comments joined. Rows with hours that aren't a number
+    are kept as is, so the write reports the error.
+
+    :return: The reduced list of rows, in the order each task and date first appears.
+    """
+    merged = {}
+    for row in rows:
+        date, hours, comment, task_key = row
+        try:
+            hours = float(hours)
+        except (TypeError, ValueError):
+            merged[id(row)] = list(row)
+            continue
+        key = (task_key, date)
+        if key in merged:
+            merged[key][1] += hours
+            merged[key][2].append(comment)
+        else:
+            merged[key] = [date, hours, [comment], task_key]
+
+    coalesced = []
+    for date, hours, comments, task_key in merged.values():
+        if isinstance(comments, list):
+            hours, comments = round(hours, 2), _join_comments(comments)
+        coalesced.append([date, hours, comments, task_key])
+    return coalesced
+
+
+def coalesce_worklogs(worklogs):
+    """
+    Merge Jira worklogs of the same task that follow each other on the same day.
+
+    A worklog is merged into the previous one when it starts at most
+    CONTIGUOUS_GAP after the previous one ends. Durations are added up and
+    comments joined.
+
+    :param worklogs: List of dicts with task_id, start (datetime), seconds and comment.
+    :return: The reduced list of worklogs, sorted by task and start.
+    """
+    coalesced = []
+    for worklog in sorted(worklogs, key=lambda w: (w["task_id"], w["start"])):
+        previous = coalesced[-1] if coalesced else None
+        if (
+            previous
+            and previous["task_id"] == worklog["task_id"]
+            and previous["start"].date() == worklog["start"].date()
+            and worklog["start"]
+            <= previous["start"]
+            + datetime.timedelta(seconds=previous["seconds"])
+            + CONTIGUOUS_GAP
+        ):
+            previous["seconds"] += worklog["seconds"]
+            previous["comment"] = _join_comments(
+                [previous["comment"], worklog["comment"]]
+            )
+        else:
+            coalesced.append(dict(worklog))
+    return coalesced
+
+
+def print_plan(row_count, writes, describe):
+    """Print the writes left after coalescing, before any of them is sent."""
+    print(f"Coalesced {row_count} rows into {len(writes)} writes:")
+    for write in writes:
+        print(f"  {describe(write)}")
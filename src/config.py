@@ -9,22 +9,77 @@ load_dotenv()
 # Clockify
 CLOCKIFY_API_KEY = os.environ.get("CLOCKIFY_API_KEY")
 CLOCKIFY_API_URL = os.environ.get("CLOCKIFY_API_URL", "https://api.clockify.me/api/v1")
+CLOCKIFY_REPORTS_API_URL = os.environ.get(
+    "CLOCKIFY_REPORTS_API_URL", "https://reports.api.clockify.me/v1"
+)
+CLOCKIFY_REQUESTS_PER_MINUTE = int(os.getenv("CLOCKIFY_REQUESTS_PER_MINUTE", "3000"))
+
+# Local rollups of hours per task, day and week (SQLite)
+ROLLUP_STORE_PATH = os.getenv("ROLLUP_STORE_PATH", "rollups.sqlite3")
+
+# Summary and detailed reports of closed periods (Clockify and Toggl)
+REPORTS_DISK_CACHE_DIR = os.getenv(
+    "REPORTS_DISK_CACHE_DIR", "reports_disk_cache_directory"
+)
+
+# Sync daemon
+DAEMON_STATE_FILE = os.getenv("DAEMON_STATE_FILE", "daemon_state.json")
+
+# Sheet sync checkpoints (SQLite), used to resume interrupted runs
+SYNC_JOURNAL_PATH = os.getenv("SYNC_JOURNAL_PATH", "sync_journal.sqlite3")
+
+# Exports
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+
+# Structured event log (JSON lines), rotated when it reaches EVENT_LOG_MAX_BYTES
+EVENT_LOG_FILE = os.getenv("EVENT_LOG_FILE", "logs/events.jsonl")
+EVENT_LOG_MAX_BYTES = int(os.getenv("EVENT_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+EVENT_LOG_BACKUP_COUNT = int(os.getenv("EVENT_LOG_BACKUP_COUNT", "5"))
 
 # Google Sheets
 DEFAULT_GOOGLE_SHEET_ID = os.environ.get("DEFAULT_GOOGLE_SHEET_ID")
+GOOGLE_SHEETS_DISK_CACHE_DIR = os.getenv(
+    "GOOGLE_SHEETS_DISK_CACHE_DIR", "google_sheets_disk_cache_directory"
+)
+
+# Jira
+JIRA_DISK_CACHE_DIR = os.getenv("JIRA_DISK_CACHE_DIR", "jira_disk_cache_directory")
 
 # OpenAI
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
+# Local task store (SQLite)
+TASK_STORE_PATH = os.getenv("TASK_STORE_PATH", "task_store.sqlite3")
+
+# Team mode, a YAML roster with the credentials of each user
+TEAM_ROSTER_FILE = os.getenv("TEAM_ROSTER_FILE", "team.yaml")
+
+# Timezone used to turn entry start times into local dates
+TIMEZONE = os.getenv("TIMEZONE", "America/Montreal")
+
 # Toggl
 TOGGL_API_KEY = os.environ.get("TOGGL_API_KEY")
 TOGGL_API_URL = os.environ.get("TOGGL_API_URL", "https://api.track.toggl.com/api/v8")
+TOGGL_REPORTS_API_URL = os.environ.get(
+    "TOGGL_REPORTS_API_URL", "https://api.track.toggl.com/reports/api/v2"
+)
+TOGGL_REQUESTS_PER_MINUTE = int(os.getenv("TOGGL_REQUESTS_PER_MINUTE", "60"))
+
+# Webhooks
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WRIKE_WEBHOOK_SECRET = os.getenv("WRIKE_WEBHOOK_SECRET")
+JIRA_WEBHOOK_SECRET = os.getenv("JIRA_WEBHOOK_SECRET")
 
 # Wrike
 WRIKE_ACCESS_TOKEN = os.environ.get("WRIKE_ACCESS_TOKEN")
 WRIKE_API_URL = os.environ.get("WRIKE_API_URL", "https://www.wrike.com/api/v4")
 WRIKE_USER_ID = os.environ.get("WRIKE_USER_ID")
 WRIKE_DISK_CACHE_DIR = os.getenv("WRIKE_DISK_CACHE_DIR", "disk_cache_directory")
+WRIKE_MAX_WORKERS = int(os.getenv("WRIKE_MAX_WORKERS", "4"))
+WRIKE_REQUESTS_PER_MINUTE = int(os.getenv("WRIKE_REQUESTS_PER_MINUTE", "400"))
+# Seconds before the timelogs of a month that is not over yet are fetched again
+WRIKE_OPEN_WINDOW_TTL = int(os.getenv("WRIKE_OPEN_WINDOW_TTL", "300"))
 
 def load_yaml_config(filename="config.yaml"):
     with open(filename, "r") as file:
@@ -0,0 +1,230 @@
+import datetime
+import json
+import logging
+import os
+import time
+
+from . import events, rollups
+from .config import DAEMON_STATE_FILE, ROLLUP_STORE_PATH
+from .entries import fingerprint
+from .pipeline import fetch_entries
+from .targets import RetryableTargetError, TargetError, get_target
+from .utils import as_list
+
+logger = logging.getLogger("daemon")
+
+# Failed pushes of an unchanged entry before it is parked, parked entries are
+# only retried when the entry changes and never hold back the watermark
+MAX_PUSH_ATTEMPTS = 3
+
+
+def load_state(path=DAEMON_STATE_FILE):
+    if not os.path.exists(path):
+        return {"watermarks": {}, "pushed": {}, "parked": {}}
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_state(state, path=DAEMON_STATE_FILE):
+    # Write then rename, so a crash never leaves a half written state file
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def _fetch_window(state, source, lookback_days, today):
+    watermark = state["watermarks"].get(source)
+    start = (
+        datetime.date.fromisoformat(watermark) if watermark else today
+    ) - datetime.timedelta(days=lookback_days)
+    # End dates are exclusive in the Toggl and Clockify APIs
+    return start, today + datetime.timedelta(days=1)
+
+
+def poll_once(
+    source,
+    targets,
+    state,
+    workspace_id=None,
+    lookback_days=1,
+    dry_run=False,
+    rollup_path=None,
+):
+    """
+    Fetch the recent entries of a source and push the new or changed ones to the targets.
+
+    Entries are fetched from the source watermark (the day of the latest pushed
+    entry) minus lookback_days. Each pushed entry is remembered with a fingerprint,
+    a changed entry replaces the previously pushed timelog or worklog. When
+    rollup_path is set, the fetched entries also update the local rollups.
+
+    A failed entry keeps the watermark from moving past it, until it has failed
+    MAX_PUSH_ATTEMPTS times. It is then parked in the state and skipped until
+    it is edited. Failures of the target itself (rate limits, server errors,
+    no connection) hold the watermark without counting as attempts.
+
+    :return: Dict counting new, changed, unchanged, skipped, parked and failed entries.
+    """
+    today = datetime.date.today()
+    start, end = _fetch_window(state, source, lookback_days, today)
+    entries = fetch_entries(
+        source, start.isoformat(), end.isoformat(), workspace_id=workspace_id
+    )
+    if rollup_path:
+        rollups.ingest(source, entries, rollup_path)
+
+    state.setdefault("parked", {})
+    summary = {
+        "new": 0,
+        "changed": 0,
+        "unchanged": 0,
+        "skipped": 0,
+        "parked": 0,
+        "failed": 0,
+    }
+    latest_date = None
+    earliest_failure = None
+
+    for entry in entries:
+        entry_date = entry["start"].date()
+        if not entry["task_key"]:
+            summary["skipped"] += 1
+            continue
+
+        for target in targets:
+            key = f"{source}:{entry['id']}:{target.name}"
+            pushed = state["pushed"].get(key)
+            entry_fingerprint = fingerprint(entry)
+            if pushed and pushed["fingerprint"] == entry_fingerprint:
+                summary["unchanged"] += 1
+                continue
+            parked = state["parked"].get(key)
+            if parked and parked["fingerprint"] != entry_fingerprint:
+                # The entry was edited, give it a fresh set of attempts
+                parked = None
+            if parked and parked["attempts"] >= MAX_PUSH_ATTEMPTS:
+                summary["parked"] += 1
+                continue
+
+            status = "changed" if pushed else "new"
+            if dry_run:
+                logger.info(f"Dry run mode: Would push {status} {key} to {target.name}")
+                summary[status] += 1
+                continue
+
+            try:
+                if pushed:
+                    if not target.delete(pushed["task_key"], pushed["target_id"]):
+                        raise TargetError(
+                            f"Failed to delete {pushed['target_id']}, the change was not pushed"
+                        )
+                    # Gone from the target, a failed create is retried as new
+                    del state["pushed"][key]
+                target_id = target.create(entry)
+            except RetryableTargetError as e:
+                # Not the entry's fault, retry it on the next poll without an attempt
+                summary["failed"] += 1
+                logger.error(f"Failed to push {key}, the target is unavailable: {e}")
+                earliest_failure = min(filter(None, [earliest_failure, entry_date]))
+                continue
+            except (TargetError, ValueError) as e:
+                attempts = parked["attempts"] + 1 if parked else 1
+                state["parked"][key] = {
+                    "fingerprint": entry_fingerprint,
+                    "attempts": attempts,
+                    "date": entry_date.isoformat(),
+                    "error": str(e),
+                }
+                summary["failed"] += 1
+                if attempts < MAX_PUSH_ATTEMPTS:
+                    logger.error(f"Failed to push {key}: {e}")
+                    earliest_failure = min(filter(None, [earliest_failure, entry_date]))
+                else:
+                    logger.error(
+                        f"Failed to push {key} {attempts} times, parked until it changes: {e}"
+                    )
+                continue
+
+            state["parked"].pop(key, None)
+
+            state["pushed"][key] = {
+                "fingerprint": entry_fingerprint,
+                "task_key": entry["task_key"],
+                "target_id": target_id,
+                "date": entry_date.isoformat(),
+            }
+            summary[status] += 1
+            logger.info(f"Pushed {status} {key} to {target.name} as {target_id}")
+
+        latest_date = max(filter(None, [latest_date, entry_date]))
+
+    if not dry_run:
+        # Never move past a failed entry, so it is retried on the next poll
+        watermark = earliest_failure or latest_date
+        if watermark:
+            state["watermarks"][source] = watermark.isoformat()
+        # Entries older than the fetch window are never seen again
+        for name in ("pushed", "parked"):
+            state[name] = {
+                key: value
+                for key, value in state[name].items()
+                if not key.startswith(f"{source}:")
+                or value["date"] >= start.isoformat()
+            }
+    return summary
+
+
+def run(
+    sources="toggl",
+    targets="wrike",
+    interval=300,
+    workspace_id=None,
+    jira_instance="default",
+    lookback_days=1,
+    state_file=DAEMON_STATE_FILE,
+    once=False,
+    dry_run=False,
+):
+    """
+    Poll Toggl and/or Clockify forever and push new entries to Wrike and/or Jira.
+
+    The description of each entry must start with the task key, e.g.
+    "ABC-123 Review pull request". State is saved to state_file after every poll,
+    so the daemon picks up where it left off after a restart.
+
+    :param sources: Comma separated sources, toggl and/or clockify.
+    :param targets: Comma separated targets, wrike and/or jira.
+    :param interval: Seconds between polls.
+    :param workspace_id: Clockify workspace ID, required for the clockify source.
+    :param jira_instance: Name of the Jira instance in config.yaml.
+    :param lookback_days: Days before the watermark to fetch again, to catch edited entries.
+    :param once: Poll a single time and exit.
+    :param dry_run: Only log what would be pushed.
+    """
+    events.setup(console=True)
+
+    targets = [get_target(name, jira_instance) for name in as_list(targets)]
+    state = load_state(state_file)
+
+    while True:
+        for source in as_list(sources):
+            try:
+                summary = poll_once(
+                    source,
+                    targets,
+                    state,
+                    workspace_id,
+                    lookback_days,
+                    dry_run,
+                    rollup_path=ROLLUP_STORE_PATH,
+                )
+                logger.info(f"Polled {source}: {summary}")
+            except Exception as e:
+                # Keep the daemon alive, the next poll will retry
+                logger.error(f"Failed to poll {source}: {e}")
+            if not dry_run:
+                save_state(state, state_file)
+
+        if once:
+            return state
+        time.sleep(interval)
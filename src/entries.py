@@ -0,0 +1,85 @@
+import hashlib
+from datetime import datetime
+
+import pytz
+
+from .config import TIMEZONE
+
+
+def _parse_datetime(value):
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = pytz.utc.localize(dt)
+    return dt.astimezone(pytz.timezone(TIMEZONE))
+
+
+def task_key_from_description(description):
+    """The task key is the first word of the description, e.g. "ABC-123 Fix login"."""
+    words = (description or "").split()
+    return words[0] if words else None
+
+
+def _comment_from_description(description):
+    words = (description or "").split(maxsplit=1)
+    return words[1] if len(words) > 1 else ""
+
+
+def normalize_toggl_entry(entry):
+    """
+    Convert a Toggl time entry to the common entry format, or None if it is still running.
+
+    Common entries are dicts with source, id, description, task_key, comment,
+    start (localized datetime), seconds and project_id.
+    """
+    if entry.get("duration", -1) < 0 or not entry.get("start"):
+        return None
+    description = entry.get("description", "")
+    return {
+        "source": "toggl",
+        "id": str(entry["id"]),
+        "description": description,
+        "task_key": task_key_from_description(description),
+        "comment": _comment_from_description(description),
+        "start": _parse_datetime(entry["start"]),
+        "seconds": int(entry["duration"]),
+        "project_id": entry.get("pid"),
+    }
+
+
+def normalize_clockify_entry(entry):
+    """Convert a Clockify time entry to the common entry format, or None if it is still running."""
+    interval = entry.get("timeInterval") or {}
+    if not interval.get("start") or not interval.get("end"):
+        return None
+    description = entry.get("description", "")
+    start = _parse_datetime(interval["start"])
+    end = _parse_datetime(interval["end"])
+    return {
+        "source": "clockify",
+        "id": str(entry["id"]),
+        "description": description,
+        "task_key": task_key_from_description(description),
+        "comment": _comment_from_description(description),
+        "start": start,
+        "seconds": int((end - start).total_seconds()),
+        "project_id": entry.get("projectId"),
+    }
+
+
+NORMALIZERS = {
+    "toggl": normalize_toggl_entry,
+    "clockify": normalize_clockify_entry,
+}
+
+
+def fingerprint(entry):
+    """Hash of the fields that are written to the targets, used to detect changed entries."""
+    content = "\x1f".join(
+        [
+            str(entry["task_key"]),
+            entry["comment"],
+            entry["start"].isoformat(),
+            str(entry["seconds"]),
+        ]
+    )
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
@@ -0,0 +1,100 @@
+import atexit
+import datetime
+import json
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from .config import EVENT_LOG_BACKUP_COUNT, EVENT_LOG_FILE, EVENT_LOG_MAX_BYTES
+
+# Headers that carry credentials and must never be written to a log
+SENSITIVE_HEADERS = {
+    "authorization",
+    "proxy-authorization",
+    "cookie",
+    "set-cookie",
+    "x-api-key",
+    "x-auth-token",
+    "x-hook-secret",
+    "x-hub-signature",
+}
+
+# Attributes every LogRecord has, anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+_console_handler = None
+_setup_lock = threading.Lock()
+
+
+def redact_headers(headers):
+    """Return a copy of the headers with the credentials replaced by ***."""
+    return {
+        name: "***" if name.lower() in SENSITIVE_HEADERS else value
+        for name, value in (headers or {}).items()
+    }
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the fields passed with extra= kept as keys."""
+
+    def format(self, record):
+        event = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        event.update(
+            (name, value)
+            for name, value in vars(record).items()
+            if name not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str)
+
+
+def setup(
+    path=EVENT_LOG_FILE,
+    max_bytes=EVENT_LOG_MAX_BYTES,
+    backup_count=EVENT_LOG_BACKUP_COUNT,
+    console=False,
+):
+    """
+    Send the logs of every module to a rotating JSON lines file.
+
+    Records are put on a queue by the logging call and written by a background
+    thread, so logging never waits on the disk. Calling it again only adds the
+    console output if requested.
+
+    :param console: Also print the logs to stderr, for long running commands.
+    """
+    global _listener, _console_handler
+
+    root = logging.getLogger()
+    with _setup_lock:
+        if _listener is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            file_handler = RotatingFileHandler(
+                path,
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                encoding="utf-8",
+                delay=True,
+            )
+            file_handler.setFormatter(JsonFormatter())
+
+            records = queue.SimpleQueue()
+            _listener = QueueListener(records, file_handler, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)
+            root.addHandler(QueueHandler(records))
+            root.setLevel(logging.INFO)
+
+        if console and _console_handler is None:
+            _console_handler = logging.StreamHandler()
+            _console_handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            root.addHandler(_console_handler)
@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+
+from . import wrike
+from .config import EXPORT_DIR
+from .periods import is_closed, month_key, month_windows
+
+FORMATS = ("csv", "arrow", "parquet")
+
+TIMELOG_COLUMNS = [
+    "id",
+    "taskId",
+    "userId",
+    "categoryId",
+    "hours",
+    "createdDate",
+    "updatedDate",
+    "trackedDate",
+    "comment",
+]
+TASK_COLUMNS = ["id", "title"]
+
+MANIFEST_FILE = "_manifest.json"
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self.columns = columns
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+
+    def write(self, records):
+        self.writer.writerows(
+            [record.get(column) for column in self.columns] for record in records
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class _ArrowWriter:
+    def __init__(self, path, columns):
+        pa = _import_pyarrow()
+        self.pa = pa
+        self.schema = pa.schema([(column, pa.string()) for column in columns])
+        self.sink = pa.OSFile(path, "wb")
+        self.writer = self._open(self.sink)
+
+    def _open(self, sink):
+        return self.pa.ipc.new_file(sink, self.schema)
+
+    def write(self, records):
+        batch = self.pa.RecordBatch.from_pylist(
+            [
+                {
+                    column: None if record.get(column) is None else str(record[column])
+                    for column in self.schema.names
+                }
+                for record in records
+            ],
+            schema=self.schema,
+        )
+        self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+        self.sink.close()
+
+
+class _ParquetWriter(_ArrowWriter):
+    def _open(self, sink):
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(sink, self.schema)
+
+
+_WRITERS = {"csv": _CsvWriter, "arrow": _ArrowWriter, "parquet": _ParquetWriter}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "Arrow and Parquet exports require pyarrow, install it with `pip install pyarrow`"
+        )
+    return pyarrow
+
+
+def _validate_format(fmt):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format {fmt}, expected one of {FORMATS}")
+    return fmt
+
+
+def _batched(records, batch_size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_records(records, path, columns, fmt="csv", batch_size=5000):
+    """
+    Stream records (dicts) into a single file, at most batch_size rows in memory.
+
+    The file is written under a temporary name and renamed once complete, so an
+    interrupted export never leaves a truncated partition behind.
+
+    :return: Number of records written.
+    """
+    _validate_format(fmt)
+    tmp_path = f"{path}.tmp"
+    writer = _WRITERS[fmt](tmp_path, columns)
+    count = 0
+    try:
+        for batch in _batched(records, batch_size):
+            writer.write(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    os.replace(tmp_path, path)
+    return count
+
+
+def _load_manifest(directory):
+    path = os.path.join(directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"closed": {}}
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _save_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+def export_timelogs(
+    start_date,
+    end_date,
+    output_dir=EXPORT_DIR,
+    fmt="csv",
+    for_current_user=True,
+    batch_size=5000,
+):
+    """
+    Export Wrike timelogs to files partitioned by tracked month.
+
+    Partitions are written to <output_dir>/timelogs/month=YYYY-MM/part.<fmt> and
+    cover whole calendar months, or under timelogs_all_users/ for the timelogs
+    of every user. Runs are incremental: a closed month that was already
+    exported is never rewritten, only new and still open months are.
+
+    :param start_date: First tracked date to export (YYYY-MM-DD).
+    :param end_date: Last tracked date to export (YYYY-MM-DD).
+    :param output_dir: Root directory of the export.
+    :param fmt: One of csv, arrow or parquet.
+    :param for_current_user: Boolean, if set to True will only export timelogs of the current user.
+    :return: Dict of month to number of rows written, for the partitions written by this run.
+    """
+    _validate_format(fmt)
+    # Each filter has its own partitions and manifest, a month exported for the
+    # current user is not closed for every user
+    directory = os.path.join(
+        output_dir, "timelogs" if for_current_user else "timelogs_all_users"
+    )
+    os.makedirs(directory, exist_ok=True)
+    manifest = _load_manifest(directory)
+
+    written = {}
+    for window in month_windows(start_date, end_date):
+        month = month_key(window[0])
+        partition = os.path.join(directory, f"month={month}")
+        path = os.path.join(partition, f"part.{fmt}")
+
+        if month in manifest["closed"] and os.path.exists(path):
+            continue
+
+        os.makedirs(partition, exist_ok=True)
+        timelogs = wrike.get_all_timelogs(
+            tracked_date_range=window, for_current_user=for_current_user
+        )
+        written[month] = write_records(timelogs, path, TIMELOG_COLUMNS, fmt, batch_size)
+
+        if is_closed(window[1]):
+            manifest["closed"][month] = written[month]
+            _save_manifest(directory, manifest)
+
+    return written
+
+
+def export_tasks(
+    folder_or_project_id=None,
+    output_dir=EXPORT_DIR,
+    fmt="csv",
+    page_size=1000,
+):
+    """
+    Export Wrike tasks page by page to <output_dir>/tasks.<fmt>.
+
+    :return: Number of tasks written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    records = (
+        {"id": task_id, "title": title}
+        for page in wrike.iter_task_pages(folder_or_project_id, page_size)
+        for task_id, title in page
+    )
+    path = os.path.join(output_dir, f"tasks.{fmt}")
+    return write_records(records, path, TASK_COLUMNS, fmt, page_size)
@@ -0,0 +1,53 @@
+from collections import defaultdict
+
+
+class FolderIndex:
+    """
+    In-memory view of the Wrike folder tree, built from a single /folders response.
+
+    Folders are linked through their childIds. A Wrike folder can have several
+    parents, so each folder keeps a set of parent IDs.
+    """
+
+    def __init__(self, folders):
+        self.folders = {folder["id"]: folder for folder in folders}
+        self.parents = defaultdict(set)
+        for folder in folders:
+            for child_id in folder.get("childIds", []):
+                self.parents[child_id].add(folder["id"])
+
+    def list_folders(self):
+        return [(folder["id"], folder["title"]) for folder in self.folders.values()]
+
+    def list_projects(self):
+        return [
+            (folder["id"], folder["title"])
+            for folder in self.folders.values()
+            if "project" in folder
+        ]
+
+    def ancestors(self, folder_id):
+        ancestors = set()
+        pending = list(self.parents.get(folder_id, ()))
+        while pending:
+            parent_id = pending.pop()
+            if parent_id in ancestors:
+                continue
+            ancestors.add(parent_id)
+            pending.extend(self.parents.get(parent_id, ()))
+        return ancestors
+
+    def minimal_roots(self, folder_ids):
+        """
+        Drop every folder that is a descendant of another requested folder.
+
+        Tasks are fetched with descendants, so the remaining roots cover all the
+        requested folders exactly once. Order and unknown IDs are preserved.
+        """
+        requested = list(dict.fromkeys(folder_ids))
+        requested_set = set(requested)
+        return [
+            folder_id
+            for folder_id in requested
+            if not self.ancestors(folder_id) & requested_set
+        ]
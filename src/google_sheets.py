@@ -1,47 +1,116 @@
 import datetime
+import fnmatch
 import logging
 import os
 import pickle
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 
+import google_auth_httplib2
+import httplib2
 import pytz
+from diskcache import Cache
 from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import Resource, build
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 
-from src.config import DEFAULT_GOOGLE_SHEET_ID
+from src import checkpoint, task_index
+from src.checkpoint import CircuitBreaker, CircuitOpenError
+from src.coalesce import coalesce_worklogs, print_plan
+from src.config import DEFAULT_GOOGLE_SHEET_ID, GOOGLE_SHEETS_DISK_CACHE_DIR
 from src.jira import JiraAPI
-from src.wrike import create_time_logs_from_data, get_all_tasks
+from src.utils import print_table
+from src.wrike import create_time_logs_from_data, get_tasks_for_folders
 
-# Create a logger for the 'google_sheets' module
 logger = logging.getLogger("google_sheets")
-logger.setLevel(logging.INFO)  # Set the logging level to INFO
 
-# Directory for log files
-log_dir = "logs/google_sheets"
-if not os.path.exists(log_dir):
-    os.makedirs(log_dir)  # Create the directory if it doesn't exist
+# If modifying these SCOPES, delete the file token.pickle.
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    # Used to read the spreadsheet version, see read_sheets
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
 
-# Log file name with date and time
-log_file = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S") + ".log"
+# Columns each sync reads, so we never download more than the schema needs
+WRIKE_SYNC_COLUMNS = "A:D"
+JIRA_SYNC_COLUMNS = "A:E"
 
-# Create a file handler to write logs to a file
-file_handler = logging.FileHandler(os.path.join(log_dir, log_file))
-file_handler.setLevel(logging.INFO)  # Set the logging level for the file handler
+# Partial responses, Google only sends the parts of each reply the code reads
+SHEET_TITLES_FIELDS = "sheets.properties.title"
+SHEET_VALUES_FIELDS = "valueRanges.values"
 
-# Create a formatter and set it for the file handler
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(formatter)
+# Properties of each sheet needed to address it in a batchUpdate request
+SHEET_IDS_FIELDS = "sheets.properties(sheetId,title)"
 
-# Add the file handler to the logger
-logger.addHandler(file_handler)
+# Sheet values cached with the spreadsheet version they were read at
+sheet_cache = Cache(GOOGLE_SHEETS_DISK_CACHE_DIR)
 
-# If modifying these SCOPES, delete the file token.pickle.
-SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+
+# Services are built once per process and shared by all threads
+_services = {}
+_services_lock = threading.Lock()
+_credentials = None
+_started_at = time.perf_counter()
+_first_request_logged = False
+
+_jira_apis = {}
+_jira_apis_lock = threading.Lock()
 
 
 def login_to_google_sheets():
+    return get_service("sheets", "v4")
+
+
+def get_service(api="sheets", version="v4"):
+    """
+    Return a process-wide, thread-safe Google API service.
+
+    The service is built from the discovery document bundled with
+    google-api-python-client, so building it needs no network round trip.
+    Credentials are refreshed by google-auth only once they expire.
+    """
+    global _credentials
+    with _services_lock:
+        if (api, version) not in _services:
+            built_at = time.perf_counter()
+            if _credentials is None:
+                _credentials = _load_credentials()
+            _services[(api, version)] = build(
+                api,
+                version,
+                credentials=_credentials,
+                static_discovery=True,
+                cache_discovery=False,
+                requestBuilder=_build_request,
+            )
+            logger.info(
+                f"Built {api} {version} service in "
+                f"{(time.perf_counter() - built_at) * 1000:.0f} ms"
+            )
+        return _services[(api, version)]
+
+
+def _build_request(http, *args, **kwargs):
+    # httplib2 is not thread-safe, give every request its own connection
+    global _first_request_logged
+    if not _first_request_logged:
+        _first_request_logged = True
+        logger.info(
+            "First Google API request "
+            f"{(time.perf_counter() - _started_at) * 1000:.0f} ms after startup"
+        )
+    authorized_http = google_auth_httplib2.AuthorizedHttp(
+        _credentials, http=httplib2.Http()
+    )
+    return HttpRequest(authorized_http, *args, **kwargs)
+
+
+def _load_credentials():
     creds = None
     token_pickle_file = "token.pickle"
     # Check if the token.pickle file exists and is valid for current scopes
@@ -73,13 +142,88 @@ def login_to_google_sheets():
         logger.error("Authentication has failed")
         sys.exit(1)
 
-    service = build("sheets", "v4", credentials=creds)
-    return service
+    return creds
+
+
+def get_spreadsheet_version(spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID):
+    """
+    Return the Drive version of a spreadsheet, which changes on every edit.
+
+    Returns None when it can't be read, e.g. with a token missing the Drive scope.
+    """
+    try:
+        drive = get_service("drive", "v3")
+        metadata = drive.files().get(fileId=spreadsheet_id, fields="version").execute()
+        return metadata.get("version")
+    except Exception as e:
+        logger.warning(
+            f"Unable to read the version of spreadsheet {spreadsheet_id}: {e}"
+        )
+        return None
+
+
+def _a1_range(title, columns):
+    escaped_title = title.replace("'", "''")
+    return f"'{escaped_title}'!{columns}"
+
+
+def read_sheets(
+    titles, spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID, columns="A:Z", service=None
+):
+    """
+    Read several sheets of a spreadsheet in a single batchGet request.
+
+    Values are cached with the spreadsheet version. When the spreadsheet hasn't
+    changed since the last read, nothing is downloaded at all.
+
+    :param titles: Sheet titles to read.
+    :param spreadsheet_id: ID of the spreadsheet.
+    :param columns: Columns to read, e.g. "A:E".
+    :param service: Optional Sheets service, to reuse an authenticated one.
+    :return: Dict of sheet title to list of rows.
+    """
+    titles = list(dict.fromkeys(titles))
+    version = get_spreadsheet_version(spreadsheet_id)
+
+    values = {}
+    for title in titles:
+        cached = sheet_cache.get((spreadsheet_id, title, columns))
+        if version is not None and cached and cached["version"] == version:
+            values[title] = cached["values"]
+
+    missing = [title for title in titles if title not in values]
+    if not missing:
+        logger.info(f"Spreadsheet '{spreadsheet_id}' unchanged, using cached values")
+        return values
+
+    service = service or login_to_google_sheets()
+    result = (
+        service.spreadsheets()
+        .values()
+        .batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=[_a1_range(title, columns) for title in missing],
+            fields=SHEET_VALUES_FIELDS,
+        )
+        .execute()
+    )
+    for title, value_range in zip(missing, result.get("valueRanges", [])):
+        values[title] = value_range.get("values", [])
+        if version is not None:
+            sheet_cache[(spreadsheet_id, title, columns)] = {
+                "version": version,
+                "values": values[title],
+            }
+    return values
 
 
 def check_or_create_sheet(service, spreadsheet_id, title):
     # Get metadata to check for the existing sheets
-    sheet_metadata = service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
+    sheet_metadata = (
+        service.spreadsheets()
+        .get(spreadsheetId=spreadsheet_id, fields=SHEET_TITLES_FIELDS)
+        .execute()
+    )
     sheets = sheet_metadata.get("sheets", "")
 
     # Determine if the sheet exists
@@ -133,11 +277,8 @@ def sync_wrike_to_sheets(spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID):
     # Get folder or project IDs from environment variable
     folder_ids = os.getenv("WRIKE_FOLDER_IDS", "").split(",")
 
-    # Fetch Wrike data for each folder or project ID
-    wrike_data = []
-    for folder_id in folder_ids:
-        folder_data = get_all_tasks(folder_or_project_id=folder_id.strip())
-        wrike_data.extend(folder_data)
+    # Fetch Wrike data for all folders or projects, each task only once
+    wrike_data = get_tasks_for_folders(folder_ids)
 
     # Check or create the Google Sheet
     check_or_create_sheet(service, spreadsheet_id, sheet_title)
@@ -148,21 +289,9 @@ def sync_wrike_to_sheets(spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID):
     print(f"Sync completed. Data added to the sheet: {sheet_title}")
 
 
-def fetch_data_from_sheet(title, spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID):
-    service = login_to_google_sheets()
-
-    # Assumes you want to fetch all rows and columns
-    range_name = f"{title}!A:Z"
-
+def fetch_data_from_sheet(title, spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID, columns="A:Z"):
     try:
-        # Use the Sheets API to fetch the data
-        result = (
-            service.spreadsheets()
-            .values()
-            .get(spreadsheetId=spreadsheet_id, range=range_name)
-            .execute()
-        )
-        values = result.get("values", [])
+        values = read_sheets([title], spreadsheet_id, columns).get(title)
 
         if not values:
             logger.warning(f"No data found in sheet: {title}")
@@ -178,22 +307,82 @@ def fetch_data_from_sheet(title, spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID):
         return None
 
 
-def sync_sheet_to_wrike(title=None, spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID, dry_run=False):
+def sync_sheet_to_wrike(
+    title=None,
+    spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID,
+    dry_run=False,
+    coalesce=False,
+    resume=False,
+    validate=False,
+    values=None,
+):
+    """
+    Create a Wrike timelog for each row of a sheet (date, hours, comment, task).
+
+    With validate, task cells are resolved against the tasks of WRIKE_FOLDER_IDS
+    by ID or title before anything is written, rows with an unknown task fail.
+
+    :param values: Rows of the sheet already read with read_sheets, the sheet
+        is only read when they are missing.
+    """
     if title is None:
         title = f"wrike sync {datetime.datetime.now().strftime('%Y-%m-%d')}"
-    data = fetch_data_from_sheet(title, spreadsheet_id)
+    if values is None:
+        data = fetch_data_from_sheet(title, spreadsheet_id, columns=WRIKE_SYNC_COLUMNS)
+    else:
+        data = [row[:4] for row in values]
     if not data:
         logger.info(f"No data found in sheet: {title}")
-        return
+        return {"rows": 0, "written": 0, "failed": 0}
     data = data[1:]  # skip the first row
 
     # Log the number of rows to be processed
     logger.info(f"Processing {len(data)} rows from sheet '{title}'")
 
-    timelogs = create_time_logs_from_data(data=data, dry_run=dry_run)
+    row_count = len(data)
+    unknown = 0
+    if validate:
+        tasks = task_index.wrike_index()
+        rows = []
+        for index, row in enumerate(data, start=2):
+            cell = row[3] if len(row) > 3 else ""
+            task_id = tasks.resolve(cell)
+            if task_id is None:
+                _log_unknown_task(tasks, index, cell)
+                unknown += 1
+            else:
+                rows.append([*row[:3], task_id])
+        data = rows
+    else:
+        # Cells picked from the task dropdown read "<task ID> <title>"
+        data = [
+            [*row[:3], str(row[3]).strip().split(" ")[0]] if len(row) > 3 else row
+            for row in data
+        ]
+
+    timelogs = create_time_logs_from_data(
+        data=data, dry_run=dry_run, coalesce=coalesce, resume=resume
+    )
     for timelog in timelogs:
         logger.info(f"Created time log: {timelog}")
 
+    written = len([timelog for timelog in timelogs if timelog])
+    return {
+        "rows": row_count,
+        "written": written,
+        "failed": len(timelogs) - written + unknown,
+    }
+
+
+def _unknown_task_message(tasks, cell):
+    suggestions = tasks.suggest(cell)
+    hint = f", did you mean {' or '.join(suggestions)}?" if suggestions else ""
+    return f"Unknown task '{cell}'{hint}"
+
+
+def _log_unknown_task(tasks, index, cell):
+    logger.error(f"Row {index}: {_unknown_task_message(tasks, cell)}")
+
 
 def sync(client):
     jira_instance_name = client
@@ -206,77 +395,396 @@ def sync_sheet_to_jira(
     jira_instance_name: str,
     spreadsheet_id: str = DEFAULT_GOOGLE_SHEET_ID,
     dry_run: bool = False,
+    coalesce: bool = False,
+    resume: bool = False,
+    validate: bool = False,
+    values: list = None,
 ):
+    """
+    Log the rows of a sheet (date, start time, hours, task, comment) as Jira worklogs.
+
+    With validate, task cells are resolved against the open issues of the
+    instance by key or summary before anything is written, rows with an
+    unknown task fail.
+
+    With coalesce, rows of the same task that follow each other on the same day
+    are merged into a single worklog, and the reduced plan is printed first.
+    Every write is recorded in the checkpoint journal, with resume the worklogs
+    written by a previous run are skipped.
+
+    :param values: Rows of the sheet already read with read_sheets, the sheet
+        is only read when they are missing.
+    """
     logger.info("Starting sync from Google Sheets to Jira.")
-    montreal_tz = pytz.timezone("America/Montreal")
+    summary = {"rows": 0, "written": 0, "failed": 0, "skipped": 0}
+
+    if values is None:
+        values = read_sheets([sheet_name], spreadsheet_id, JIRA_SYNC_COLUMNS)[
+            sheet_name
+        ]
+    if not values:
+        logger.warning("No data found in the specified Google Sheet.")
+        return summary
+
+    jira_api: JiraAPI = get_jira_api(jira_instance_name)
+    summary["rows"] = len(values) - 1
+    tasks = task_index.jira_index(jira_api) if validate else None
+    worklogs = []
+    invalid_rows = []
+
+    for index, row in enumerate(values[1:], start=2):  # Skip header row
+        try:
+            worklogs.append(_parse_worklog_row(row, tasks, jira_api))
+        except ValueError as e:
+            logger.error(f"Row {index}: {e}")
+            summary["failed"] += 1
+            invalid_rows.append((row, e))
+
+    if coalesce:
+        row_count = len(worklogs)
+        worklogs = coalesce_worklogs(worklogs)
+        print_plan(
+            row_count,
+            worklogs,
+            lambda w: (
+                f"{w['start']:%Y-%m-%d %H:%M} {w['task_id']} {w['seconds']}s {w['comment']}"
+            ),
+        )
 
-    try:
-        service: Resource = login_to_google_sheets()
-        range_name: str = f"{sheet_name}!A:E"
-        result = (
-            service.spreadsheets()
-            .values()
-            .get(spreadsheetId=spreadsheet_id, range=range_name)
-            .execute()
+    if dry_run:
+        for worklog in worklogs:
+            logger.info(
+                f"Dry run mode: Would log time for task {worklog['task_id']} at {worklog['start']} for {worklog['seconds']} seconds."
+            )
+    else:
+        _log_worklogs(
+            jira_api, jira_instance_name, worklogs, invalid_rows, resume, summary
         )
-        values = result.get("values", [])
 
-        if not values:
-            logger.warning("No data found in the specified Google Sheet.")
-            return
+    logger.info("Sync from Google Sheets to Jira completed.")
+    return summary
 
-        jira_api: JiraAPI = JiraAPI(instance_name=jira_instance_name)
 
-        for index, row in enumerate(values[1:], start=2):  # Skip header row
-            if len(row) < 4:
-                logger.error(
-                    f"Row {index} is missing some values. Expected at least 4, got {len(row)}."
-                )
-                continue
+def _parse_worklog_row(row, tasks, jira_api):
+    """
+    Turn a row (date, start time, hours, task, comment) into a worklog.
 
-            start_date, start_time, time_spent, task = row[:4]
-            comment = (
-                row[4] if len(row) > 4 else ""
-            )  # Check if comment is provided; otherwise, set to empty string
+    :raises ValueError: The row is incomplete, its task unknown or a value invalid.
+    """
+    if len(row) < 4:
+        raise ValueError(f"Missing some values. Expected at least 4, got {len(row)}.")
 
-            task_id: str = task.split(" ")[0]
-            datetime_str: str = f"{start_date} {start_time}"
+    start_date, start_time, time_spent, task = row[:4]
+    comment = row[4] if len(row) > 4 else ""
 
-            # 10/24/2024	4:15 PM
-            format_1 = "%m/%d/%Y %I:%M %p"
-            # 2024-10-24 16:15:00
-            format_2 = "%Y-%m-%d %H:%M:%S"
-            try:
-                start_datetime: datetime.datetime = datetime.datetime.strptime(
-                    datetime_str, format_1
+    if tasks is None:
+        task_id: str = task.split(" ")[0]
+    else:
+        task_id = task_index.resolve_issue(tasks, task, jira_api)
+        if task_id is None:
+            raise ValueError(_unknown_task_message(tasks, task))
+
+    datetime_str: str = f"{start_date} {start_time}"
+    # 10/24/2024	4:15 PM, or 2024-10-24 16:15:00
+    for date_format in ("%m/%d/%Y %I:%M %p", "%Y-%m-%d %H:%M:%S"):
+        try:
+            start_datetime = datetime.datetime.strptime(datetime_str, date_format)
+            break
+        except ValueError:
+            continue
+    else:
+        raise ValueError(f"Invalid date and time '{datetime_str}'")
+
+    try:
+        time_spent_seconds = int(float(time_spent) * 3600)
+    except ValueError:
+        raise ValueError(f"Invalid hours '{time_spent}'") from None
+
+    return {
+        "task_id": task_id,
+        "start": pytz.timezone("America/Montreal").localize(start_datetime),
+        "seconds": time_spent_seconds,
+        "comment": comment,
+    }
+
+
+def _log_worklogs(
+    jira_api, jira_instance_name, worklogs, invalid_rows, resume, summary
+):
+    target = f"jira:{jira_instance_name}"
+    breaker = CircuitBreaker()
+    with closing(checkpoint.connect()) as connection:
+        invalid_keys = checkpoint.write_keys(target, [row for row, _ in invalid_rows])
+        for key, (_, error) in zip(invalid_keys, invalid_rows):
+            checkpoint.record(connection, key, target, "failed", error)
+
+        keys = checkpoint.write_keys(target, worklogs)
+        done = checkpoint.done_keys(connection, keys) if resume else set()
+        try:
+            for key, worklog in zip(keys, worklogs):
+                task_id = worklog["task_id"]
+                if key in done:
+                    logger.info(f"Skipped worklog already written for task {task_id}")
+                    summary["skipped"] += 1
+                    continue
+
+                response: dict = jira_api.log_time_to_jira_task(
+                    task_id, worklog["start"], worklog["seconds"], worklog["comment"]
                 )
-                montreal_dt: datetime.datetime = montreal_tz.localize(start_datetime)
-            except ValueError as e:
-                try:
-                    start_datetime: datetime.datetime = datetime.datetime.strptime(
-                        datetime_str, format_2
-                    )
-                    montreal_dt: datetime.datetime = montreal_tz.localize(
-                        start_datetime
+                logger.info(f"Logged time for task {task_id}: {response}")
+                if "error" in response:
+                    summary["failed"] += 1
+                    checkpoint.record(
+                        connection, key, target, "failed", response["details"]
                     )
-                except ValueError as e:
-                    logger.error(
-                        f"Error parsing date and time for row {index}: {str(e)}"
+                else:
+                    summary["written"] += 1
+                    checkpoint.record(
+                        connection, key, target, "written", response["worklog"]["id"]
                     )
-                    continue
+                # Raises CircuitOpenError when Jira keeps failing, a rejected row
+                # only fails that row
+                if "error" not in response or response.get("provider_error"):
+                    breaker.record("error" not in response)
+        except CircuitOpenError as e:
+            logger.error(f"{e}, run again with resume=True to continue")
+            summary["error"] = str(e)
+
+
+def _column_index(column):
+    # "A" is 0, "Z" is 25, "AA" is 26
+    index = 0
+    for letter in column.upper():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def publish_task_catalog(
+    title,
+    column="D",
+    catalog_title="Task catalog",
+    spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID,
+    jira_instance_name=None,
+    folder_ids=None,
+):
+    """
+    Write the known tasks to a catalog sheet and make a column of a sheet a dropdown of them.
+
+    The catalog holds the Wrike tasks of WRIKE_FOLDER_IDS, or the open issues of
+    a Jira instance, one "<ID or key> <title>" label per row. Cells of the
+    column, below the header, only accept a label of the catalog.
+
+    Example:
+        python main.py google_sheets publish_task_catalog "Jira Sync Instance1" \
+            --jira_instance_name=Instance1 --catalog_title="Instance1 issues"
+
+    :param title: Title of the sheet to add the dropdown to.
+    :param column: Column of the task cells, D for both Wrike and Jira sync sheets.
+    :param catalog_title: Title of the catalog sheet, created if it doesn't exist.
+    :param jira_instance_name: Publish the issues of this Jira instance instead of Wrike tasks.
+    :param folder_ids: Comma separated Wrike folder IDs, defaults to WRIKE_FOLDER_IDS.
+    :return: Number of tasks in the catalog.
+    """
+    if jira_instance_name:
+        tasks = task_index.jira_index(get_jira_api(jira_instance_name))
+    else:
+        tasks = task_index.wrike_index(folder_ids)
+    labels = tasks.labels()
+
+    service = login_to_google_sheets()
+    check_or_create_sheet(service, spreadsheet_id, catalog_title)
+    service.spreadsheets().values().clear(
+        spreadsheetId=spreadsheet_id, range=_a1_range(catalog_title, "A:A"), body={}
+    ).execute()
+    service.spreadsheets().values().update(
+        spreadsheetId=spreadsheet_id,
+        range=_a1_range(catalog_title, "A1"),
+        # Task titles are written as is, never parsed as formulas
+        valueInputOption="RAW",
+        body={"values": [[label] for label in labels]},
+    ).execute()
 
-            time_spent_seconds: int = int(float(time_spent) * 3600)
+    metadata = (
+        service.spreadsheets()
+        .get(spreadsheetId=spreadsheet_id, fields=SHEET_IDS_FIELDS)
+        .execute()
+    )
+    sheet_ids = {
+        sheet["properties"]["title"]: sheet["properties"]["sheetId"]
+        for sheet in metadata.get("sheets", [])
+    }
+    if title not in sheet_ids:
+        raise ValueError(f"No sheet named {title} in spreadsheet {spreadsheet_id}")
+
+    column_index = _column_index(column)
+    catalog_range = _a1_range(catalog_title, f"$A$1:$A${max(len(labels), 1)}")
+    service.spreadsheets().batchUpdate(
+        spreadsheetId=spreadsheet_id,
+        body={
+            "requests": [
+                {
+                    "setDataValidation": {
+                        "range": {
+                            "sheetId": sheet_ids[title],
+                            "startRowIndex": 1,
+                            "startColumnIndex": column_index,
+                            "endColumnIndex": column_index + 1,
+                        },
+                        "rule": {
+                            "condition": {
+                                "type": "ONE_OF_RANGE",
+                                "values": [{"userEnteredValue": f"={catalog_range}"}],
+                            },
+                            "strict": True,
+                            "showCustomUi": True,
+                        },
+                    }
+                }
+            ]
+        },
+    ).execute()
+    logger.info(f"Published {len(labels)} tasks to '{catalog_title}' for '{title}'")
+    return len(labels)
+
+
+def get_jira_api(instance_name):
+    """Return a JiraAPI client per instance, authenticated once and shared by threads."""
+    with _jira_apis_lock:
+        if instance_name not in _jira_apis:
+            _jira_apis[instance_name] = JiraAPI(instance_name=instance_name)
+        return _jira_apis[instance_name]
+
+
+def list_sheet_titles(spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID):
+    metadata = (
+        login_to_google_sheets()
+        .spreadsheets()
+        .get(spreadsheetId=spreadsheet_id, fields=SHEET_TITLES_FIELDS)
+        .execute()
+    )
+    return [sheet["properties"]["title"] for sheet in metadata.get("sheets", [])]
+
+
+def _parse_batch_target(target):
+    # "wrike:<sheet title or glob>" or "jira:<jira instance>:<sheet title or glob>"
+    kind, _, rest = target.partition(":")
+    if kind == "wrike" and rest:
+        return kind, None, rest
+    if kind == "jira":
+        instance_name, _, pattern = rest.partition(":")
+        if instance_name and pattern:
+            return kind, instance_name, pattern
+    raise ValueError(
+        f"Invalid target {target}, expected wrike:<sheet> or jira:<instance>:<sheet>"
+    )
+
+
+def plan_batch_sync(targets, sheet_titles):
+    """Expand targets whose sheet is a glob (e.g. "jira:Client:Jira Sync *") into jobs."""
+    jobs = []
+    for target in [targets] if isinstance(targets, str) else targets:
+        kind, instance_name, pattern = _parse_batch_target(target)
+        # A plain title is kept even if missing, so it shows up as an error
+        titles = fnmatch.filter(sheet_titles, pattern)
+        if not titles and not any(char in pattern for char in "*?["):
+            titles = [pattern]
+        for title in titles:
+            if (kind, instance_name, title) not in jobs:
+                jobs.append((kind, instance_name, title))
+    return jobs
+
+
+def run_sync_jobs(
+    jobs,
+    spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID,
+    max_workers=4,
+    dry_run=False,
+    coalesce=False,
+    resume=False,
+):
+    """
+    Run sheet syncs on a bounded worker pool.
 
-            if not dry_run:
-                response: dict = jira_api.log_time_to_jira_task(
-                    task_id, montreal_dt, time_spent_seconds, comment
+    The sheets of every job are read up front in a single batchGet, then the
+    workers share the Sheets service, one Jira client per instance and the
+    Wrike cache.
+
+    :param jobs: List of (kind, jira_instance_name, sheet_title) tuples, see plan_batch_sync.
+    :return: One result dict per job, in the same order.
+    """
+    try:
+        # The Jira columns include the Wrike ones
+        values = read_sheets(
+            [title for _, _, title in jobs], spreadsheet_id, JIRA_SYNC_COLUMNS
+        )
+    except Exception as e:
+        # A missing sheet fails the whole batchGet, each job then reads its own
+        # sheet and only the missing one reports an error
+        logger.warning(f"Unable to read the sheets of the batch at once: {e}")
+        values = {}
+
+    def run_job(job):
+        kind, instance_name, title = job
+        started_at = time.perf_counter()
+        try:
+            if kind == "wrike":
+                summary = sync_sheet_to_wrike(
+                    title,
+                    spreadsheet_id,
+                    dry_run,
+                    coalesce,
+                    resume,
+                    values=values.get(title),
                 )
-                logger.info(f"Logged time for task {task_id}: {response}")
             else:
-                logger.info(
-                    f"Dry run mode: Would log time for task {task_id} at {montreal_dt} for {time_spent_seconds} seconds."
+                summary = sync_sheet_to_jira(
+                    title,
+                    instance_name,
+                    spreadsheet_id,
+                    dry_run,
+                    coalesce,
+                    resume,
+                    values=values.get(title),
                 )
+        except Exception as e:
+            # One failing sheet must not stop the others
+            logger.error(f"Failed to sync sheet '{title}': {e}")
+            summary = {"error": str(e)}
+        return {
+            "target": kind if kind == "wrike" else f"jira:{instance_name}",
+            "sheet": title,
+            **summary,
+            "seconds": round(time.perf_counter() - started_at, 2),
+        }
 
-        logger.info("Sync from Google Sheets to Jira completed successfully.")
-    except Exception as e:
-        logger.error(f"An error occurred while syncing data to Jira: {str(e)}")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_job, jobs))
+
+
+def batch_sync(
+    targets,
+    spreadsheet_id=DEFAULT_GOOGLE_SHEET_ID,
+    max_workers=4,
+    dry_run=False,
+    coalesce=False,
+    resume=False,
+):
+    """
+    Sync many sheets to Wrike and Jira in a single run.
+
+    Example:
+        python main.py google_sheets batch_sync \\
+            --targets='["wrike:wrike sync 2024-*", "jira:Instance1:Jira Sync *"]'
+
+    :param targets: List of "wrike:<sheet>" or "jira:<jira instance>:<sheet>", sheet titles can be globs.
+    :param max_workers: Number of sheets synced at the same time.
+    :param coalesce: Merge rows of the same task and day before writing them.
+    :param resume: Skip the rows written by a previous run, see the checkpoint journal.
+    """
+    jobs = plan_batch_sync(targets, list_sheet_titles(spreadsheet_id))
+    results = run_sync_jobs(
+        jobs, spreadsheet_id, max_workers, dry_run, coalesce, resume
+    )
+
+    columns = ["target", "sheet", "rows", "written", "failed", "seconds", "error"]
+    print_table(columns, results)
@@ -0,0 +1,75 @@
+import hashlib
+import json
+
+import requests
+
+# Seconds a stored body is kept after its last use, one-off URLs (later pages,
+# a changing `since`) would otherwise stay in the cache forever
+BODY_TTL = 7 * 24 * 3600
+
+
+def credential_scope(*credentials):
+    """Short hash of credentials, keeps what different users fetched apart in a cache."""
+    text = "\0".join(str(credential) for credential in credentials)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def _validators_key(url, params, scope):
+    params = json.dumps(params or {}, sort_keys=True, default=str)
+    return ("validators", url, params, scope)
+
+
+def conditional_get(
+    cache,
+    url,
+    headers=None,
+    params=None,
+    get=requests.get,
+    expire=BODY_TTL,
+    scope=None,
+):
+    """
+    GET a URL, revalidating the last response with its ETag or Last-Modified.
+
+    The body of every response that came with a validator is kept in `cache`
+    until it goes `expire` seconds without being used. When the server answers
+    304 Not Modified, the kept body is put back in the response, which is then
+    handled like a 200, so callers don't need to know the request was
+    conditional.
+
+    :param cache: diskcache Cache the validators and bodies are kept in.
+    :param get: Function sending the request, requests.get or a session's get.
+    :param expire: Seconds the body is kept after the last 200 or 304.
+    :param scope: credential_scope of the user, a body is only reused for them.
+    :return: The requests Response.
+    """
+    key = _validators_key(url, params, scope)
+    stored = cache.get(key)
+    headers = dict(headers or {})
+    if stored:
+        if stored["etag"]:
+            headers["If-None-Match"] = stored["etag"]
+        if stored["last_modified"]:
+            headers["If-Modified-Since"] = stored["last_modified"]
+
+    response = get(url, headers=headers, params=params)
+
+    if response.status_code == 304 and stored:
+        cache.touch(key, expire=expire)
+        response.status_code = 200
+        response._content = stored["content"]
+        return response
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if response.status_code == 200 and (etag or last_modified):
+        cache.set(
+            key,
+            {
+                "etag": etag,
+                "last_modified": last_modified,
+                "content": response.content,
+            },
+            expire=expire,
+        )
+    return response
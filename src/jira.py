@@ -1,10 +1,51 @@
+import os
+import re
 from datetime import datetime
 
 import pytz
 import yaml
+from diskcache import Cache
 
 from jira import JIRA
 
+from .checkpoint import is_provider_error
+from .config import JIRA_DISK_CACHE_DIR
+from .http_cache import conditional_get, credential_scope
+
+cache = Cache(JIRA_DISK_CACHE_DIR)
+
+# Seconds before the list of issues of an instance is fetched again
+ISSUE_LIST_TTL = 3600
+
+# Maximum number of worklog IDs Jira accepts in a single /worklog/list request
+WORKLOGS_PER_REQUEST = 1000
+
+
+def credential_variable(variable, instance_name):
+    """Environment variable replacing a credential of one instance, e.g. JIRA_API_TOKEN_INSTANCE1."""
+    return f"{variable}_{re.sub(r'[^A-Z0-9]', '_', instance_name.upper())}"
+
+
+def invalidate_issue(issue_key_or_id):
+    """Drop the cached lookups of an issue, by key or by ID, in every instance."""
+    issue_key_or_id = str(issue_key_or_id)
+    for key in list(cache.iterkeys()):
+        if key[0] == "issues":
+            # The issue may have been renamed, closed or reopened
+            cache.delete(key)
+            continue
+        if key[0] != "issue":
+            continue
+        issue = cache.get(key)
+        if issue and issue_key_or_id in (str(issue["id"]), issue["key"], key[2]):
+            cache.delete(key)
+
+
+def _is_author(worklog, account_id):
+    author = worklog.get("author", {})
+    # accountId on Jira Cloud, name on Jira Server
+    return account_id in (author.get("accountId"), author.get("name"))
+
 
 class JiraAPI:
     def __init__(self, config_file="config.yaml", instance_name="default"):
@@ -34,9 +75,21 @@ class JiraAPI:
 
     def authenticate(self):
         instance_config = self.get_instance_config(self.instance_name)
+        # JIRA_USER_EMAIL_<INSTANCE> and JIRA_API_TOKEN_<INSTANCE> replace the
+        # credentials of that instance only, so each user of a team can share the
+        # same instance configuration
+        self.user_email = os.getenv(
+            credential_variable("JIRA_USER_EMAIL", self.instance_name),
+            instance_config["user_email"],
+        )
+        api_token = os.getenv(
+            credential_variable("JIRA_API_TOKEN", self.instance_name),
+            instance_config["api_token"],
+        )
+        self.scope = credential_scope(self.user_email, api_token)
         return JIRA(
             server=instance_config["base_url"],
-            basic_auth=(instance_config["user_email"], instance_config["api_token"]),
+            basic_auth=(self.user_email, api_token),
         )
 
     def get_instance_config(self, instance_name):
@@ -45,6 +98,35 @@ class JiraAPI:
                 return instance
         raise ValueError(f"No JIRA instance found with name {instance_name}")
 
+    def get_issue_key(self, task_id):
+        """Resolve an issue ID or key to its current key, cached until invalidated."""
+        key = ("issue", self.instance_name, str(task_id))
+        issue = cache.get(key)
+        if issue is None:
+            found = self.client.issue(task_id, fields="key")
+            issue = {"id": found.id, "key": found.key}
+            cache[key] = issue
+        return issue["key"]
+
+    def list_issues(self, jql):
+        """Return (key, id, summary) of the issues matching a JQL query, cached for ISSUE_LIST_TTL."""
+        key = ("issues", self.instance_name, jql)
+        issues = cache.get(key)
+        if issues is None:
+            found = self.client.search_issues(jql, fields="summary", maxResults=False)
+            issues = [(issue.key, issue.id, issue.fields.summary) for issue in found]
+            cache.set(key, issues, expire=ISSUE_LIST_TTL)
+        return issues
+
+    def get_current_user(self):
+        """Return the accountId (Jira Cloud) or name (Jira Server) of the authenticated user."""
+        key = ("myself", self.instance_name, self.user_email)
+        account_id = cache.get(key)
+        if account_id is None:
+            account_id = self.client.current_user()
+            cache[key] = account_id
+        return account_id
+
     @staticmethod
     def parse_and_localize_datetime(datetime_str, timezone_str="America/Montreal"):
         """Parse a datetime string and localize it to a given timezone."""
@@ -77,16 +159,122 @@ class JiraAPI:
             # Parse and localize datetime from string
             start_datetime = self.parse_and_localize_datetime(start_datetime_str)
 
-            issue = self.client.issue(task_id)
             worklog = self.client.add_worklog(
-                issue=issue.key,
+                issue=self.get_issue_key(task_id),
                 timeSpentSeconds=time_spent_seconds,
                 started=start_datetime,
                 comment=comment,
             )
             return {"success": True, "worklog": worklog.raw}
         except Exception as e:
-            return {"error": "Failed to log time to Jira task", "details": str(e)}
+            return {
+                "error": "Failed to log time to Jira task",
+                "details": str(e),
+                "provider_error": is_provider_error(e),
+            }
+
+    def delete_worklog(self, issue_key, worklog_id):
+        """Delete a worklog, returns True if Jira confirmed the deletion."""
+        # Jira client doesn't support deleting worklogs directly, so we have to use the REST API
+        headers = {"Content-Type": "application/json"}
+        url = f"{self.client.server_url}/rest/api/2/issue/{issue_key}/worklog/{worklog_id}"
+        auth = (
+            self.client._session.auth[0],
+            self.client._session.auth[1],
+        )
+        response = self.client._session.delete(url, headers=headers, auth=auth)
+        return response.status_code == 204
+
+    def _get_json(self, path, params=None, conditional=True):
+        url = f"{self.client.server_url}/rest/api/2/{path}"
+        if conditional:
+            # Revalidated with the ETag or Last-Modified of the previous response
+            response = conditional_get(
+                cache,
+                url,
+                params=params,
+                get=self.client._session.get,
+                scope=self.scope,
+            )
+        else:
+            # A moving cursor, the same request is never sent twice
+            response = self.client._session.get(url, params=params)
+        # An error body is not a page, don't cache worklogs from it
+        response.raise_for_status()
+        return response.json()
+
+    def _changed_worklog_ids(self, path, since):
+        """Follow the pages of /worklog/updated or /worklog/deleted, returns (IDs, until)."""
+        ids = []
+        while True:
+            page = self._get_json(path, {"since": since}, conditional=False)
+            ids.extend(value["worklogId"] for value in page.get("values", []))
+            since = page["until"]
+            if page.get("lastPage", True):
+                return ids, since
+
+    def sync_worklogs(self, since):
+        """
+        Update the user's cached worklogs with the ones changed since a timestamp.
+
+        Only the worklogs updated or deleted after the previous sync are fetched,
+        up to WORKLOGS_PER_REQUEST per /worklog/list request. A since earlier
+        than the cached history fetches the missing part.
+
+        :param since: Unix timestamp in milliseconds.
+        :return: Dict of worklog ID to worklog.
+        """
+        # Users don't see the same worklogs, each one has their own copy
+        key = ("worklogs", self.instance_name, self.scope)
+        cached = cache.get(key) or {"since": None, "until": None, "worklogs": {}}
+        worklogs = cached["worklogs"]
+        if cached["since"] is None or since < cached["since"]:
+            start = since
+        else:
+            start, since = cached["until"], cached["since"]
+
+        updated_ids, until = self._changed_worklog_ids("worklog/updated", start)
+        for index in range(0, len(updated_ids), WORKLOGS_PER_REQUEST):
+            response = self.client._session.post(
+                f"{self.client.server_url}/rest/api/2/worklog/list",
+                json={"ids": updated_ids[index : index + WORKLOGS_PER_REQUEST]},
+            )
+            response.raise_for_status()
+            worklogs.update({worklog["id"]: worklog for worklog in response.json()})
+
+        deleted_ids, _ = self._changed_worklog_ids("worklog/deleted", start)
+        for worklog_id in deleted_ids:
+            worklogs.pop(str(worklog_id), None)
+
+        cache[key] = {"since": since, "until": until, "worklogs": worklogs}
+        return worklogs
+
+    def get_worklogs(self, start_date, end_date=None, for_current_user=True):
+        """
+        Get the worklogs started between two dates (YYYY-MM-DD, inclusive).
+
+        Worklogs are read from the local copy kept by sync_worklogs, so only the
+        ones changed since the last call are requested from Jira.
+
+        :param for_current_user: Only keep the worklogs of the authenticated user.
+        :return: List of worklogs, sorted by start time.
+        """
+        end_date = end_date or start_date
+        # Worklogs are logged on or after the day they start, so they were
+        # last updated after start_date
+        since = datetime.strptime(start_date, "%Y-%m-%d").timestamp() * 1000
+        worklogs = self.sync_worklogs(int(since))
+
+        account_id = self.get_current_user() if for_current_user else None
+        return sorted(
+            (
+                worklog
+                for worklog in worklogs.values()
+                if start_date <= worklog["started"][:10] <= end_date
+                and (not account_id or _is_author(worklog, account_id))
+            ),
+            key=lambda worklog: worklog["started"],
+        )
 
     def delete_all_worklogs_for_user_on_given_day(self, date_str, dry_run=False):
         try:
@@ -96,41 +284,37 @@ class JiraAPI:
             return {"error": "Invalid date format", "details": str(e)}
 
         formatted_date = date.strftime("%Y-%m-%d")
-        # Get the current user's account ID using the current_user method from the JIRA client
-        current_user_account_id = self.client.current_user()
+        account_id = self.get_current_user()
 
+        # Only the issues worked on that day, get_worklogs would sync every
+        # worklog of the instance changed since then
         issues = self.client.search_issues(
-            jql_str=f"worklogDate = {formatted_date}", expand="changelog"
+            jql_str=f"worklogDate = {formatted_date} AND worklogAuthor = currentUser()",
+            fields="key",
+            maxResults=False,
         )
+        worklogs = [
+            worklog.raw
+            for issue in issues
+            for worklog in self.client.worklogs(issue.key)
+            if _is_author(worklog.raw, account_id)
+            and worklog.raw["started"][:10] == formatted_date
+        ]
 
         results = []
-        for issue in issues:
-            worklogs = self.client.worklogs(issue)
-            for worklog in worklogs:
-                # Check if the worklog was made by the logged-in user using the account ID
-                if worklog.author.accountId == current_user_account_id:
-                    if worklog.started[:10] == formatted_date:
-                        if not dry_run:
-                            # Jira client doesn't support deleting worklogs directly, so we have to use the REST API
-                            headers = {"Content-Type": "application/json"}
-                            url = f"{self.client.server_url}/rest/api/2/issue/{issue.key}/worklog/{worklog.id}"
-                            auth = (
-                                self.client._session.auth[0],
-                                self.client._session.auth[1],
-                            )
-                            response = self.client._session.delete(
-                                url, headers=headers, auth=auth
-                            )
-                            if response.status_code == 204:
-                                results.append(
-                                    f"Deleted worklog {worklog.id} for issue {issue.key}"
-                                )
-                            else:
-                                results.append(
-                                    f"Failed to delete worklog {worklog.id} for issue {issue.key}"
-                                )
-                        else:
-                            results.append(
-                                f"Dry run mode: Would delete worklog {worklog.id} for issue {issue.key}"
-                            )
+        for worklog in worklogs:
+            issue_id = worklog["issueId"]
+            if not dry_run:
+                if self.delete_worklog(issue_id, worklog["id"]):
+                    results.append(
+                        f"Deleted worklog {worklog['id']} for issue {issue_id}"
+                    )
+                else:
+                    results.append(
+                        f"Failed to delete worklog {worklog['id']} for issue {issue_id}"
+                    )
+            else:
+                results.append(
+                    f"Dry run mode: Would delete worklog {worklog['id']} for issue {issue_id}"
+                )
         return results
@@ -1,3 +1,6 @@
+from contextlib import closing
+
+from .store import connect, search
 from .toggl import get_time_entries
 from .wrike import get_task_by_id
 
@@ -8,3 +11,19 @@ def match_toggl_entries_to_wrike_tasks(start_date, end_date):
         task_id = entry["id"]
         wrike_task = get_task_by_id(task_id)
         print(f"Matched Toggl entry {entry} to Wrike task {wrike_task}")
+
+
+def match_toggl_entries_by_description(start_date, end_date):
+    """Match Toggl entries to Wrike tasks by searching their description in the local task store."""
+    toggl_entries = get_time_entries(start_date, end_date)
+    matches = []
+    # One connection for the whole batch instead of one per search
+    with closing(connect()) as connection:
+        for entry in toggl_entries:
+            results = search(
+                entry.get("description", ""), limit=1, connection=connection
+            )
+            wrike_task = results[0] if results else None
+            print(f"Matched Toggl entry {entry} to Wrike task {wrike_task}")
+            matches.append((entry, wrike_task))
+    return matches
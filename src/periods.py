@@ -0,0 +1,55 @@
+import datetime
+
+
+def to_date(value):
+    """Accept a date, a datetime or a YYYY-MM-DD string and return a date."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str) and len(value) == 10 and value[4] == value[7] == "-":
+        # Much faster than strptime, which matters for the date of every timelog
+        try:
+            return datetime.date.fromisoformat(value)
+        except ValueError:
+            pass
+    try:
+        return datetime.datetime.strptime(str(value), "%Y-%m-%d").date()
+    except ValueError:
+        raise ValueError(f"The date must be in YYYY-MM-DD format, but got {value}")
+
+
+def month_windows(start_date, end_date):
+    """
+    Split a date range into calendar month windows.
+
+    Windows are always full months so that the same month requested by two
+    overlapping ranges maps to the same window (and the same cache entry).
+
+    :param start_date: First day of the range (date, datetime or YYYY-MM-DD string).
+    :param end_date: Last day of the range, inclusive.
+    :return: List of (first_day, last_day) tuples covering the range.
+    """
+    start_date = to_date(start_date)
+    end_date = to_date(end_date)
+
+    if start_date > end_date:
+        raise ValueError("The start date cannot be later than the end date")
+
+    windows = []
+    month_start = start_date.replace(day=1)
+    while month_start <= end_date:
+        next_month = (month_start + datetime.timedelta(days=32)).replace(day=1)
+        windows.append((month_start, next_month - datetime.timedelta(days=1)))
+        month_start = next_month
+    return windows
+
+
+def month_key(date):
+    return to_date(date).strftime("%Y-%m")
+
+
+def is_closed(window_end, today=None):
+    """A window is closed once its last day is in the past."""
+    today = to_date(today) if today else datetime.date.today()
+    return to_date(window_end) < today
@@ -0,0 +1,193 @@
+import csv
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+
+from . import checkpoint, clockify, toggl
+from .config import DEFAULT_GOOGLE_SHEET_ID, SYNC_JOURNAL_PATH
+from .entries import NORMALIZERS, fingerprint
+from .periods import to_date
+from .targets import get_target
+
+
+def fetch_entries(source, start_date, end_date, workspace_id=None):
+    """Fetch and normalize the finished entries of a source between two dates (YYYY-MM-DD)."""
+    if source == "toggl":
+        raw_entries = toggl.get_time_entries(start_date, end_date)
+    elif source == "clockify":
+        if not workspace_id:
+            raise ValueError("A Clockify workspace_id is required")
+        raw_entries = clockify.get_time_entries(workspace_id, start_date, end_date)
+    else:
+        raise ValueError(f"Unknown source {source}, expected toggl or clockify")
+
+    normalize = NORMALIZERS[source]
+    return [entry for entry in map(normalize, raw_entries or []) if entry]
+
+
+def iter_entries(source, start_date, end_date, workspace_id=None, chunk_days=7):
+    """
+    Yield normalized entries between two dates (inclusive).
+
+    Entries are fetched chunk_days at a time to keep memory bounded.
+    """
+    start_date = to_date(start_date)
+    # End dates are exclusive in the Toggl and Clockify APIs
+    end_date = to_date(end_date) + datetime.timedelta(days=1)
+    while start_date < end_date:
+        chunk_end = min(start_date + datetime.timedelta(days=chunk_days), end_date)
+        yield from fetch_entries(
+            source, start_date.isoformat(), chunk_end.isoformat(), workspace_id
+        )
+        start_date = chunk_end
+
+
+def load_mapping(file_path):
+    """
+    Load a CSV mapping table with a header row and two columns: match, task_key.
+
+    An entry maps to task_key when its project ID equals match, or when its
+    description contains match (case insensitive).
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        next(reader)  # Skip the header row
+        return [(match.strip(), task_key.strip()) for match, task_key in reader]
+
+
+def resolve_task_key(entry, mapping=None):
+    """Return the task key from the mapping table, or else the first word of the description."""
+    description = (entry["description"] or "").lower()
+    for match, task_key in mapping or []:
+        if str(entry.get("project_id")) == match or match.lower() in description:
+            return task_key
+    return entry["task_key"]
+
+
+def _write_entries(entries, target, dry_run, max_workers):
+    """Yield (entry, status, detail) while a bounded pool writes the entries to the target."""
+    # Never hold more than a couple of pending writes per worker
+    slots = threading.BoundedSemaphore(max_workers * 2)
+
+    def write(entry):
+        try:
+            if dry_run:
+                return entry, "dry run", ""
+            return entry, "written", target.create(entry)
+        except Exception as e:
+            # Connection and HTTP errors fail the entry, not the whole run
+            return entry, "failed", str(e)
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for entry in entries:
+            slots.acquire()
+            futures.append(executor.submit(write, entry))
+            while futures and futures[0].done():
+                yield futures.pop(0).result()
+        for future in futures:
+            yield future.result()
+
+
+def run(
+    source,
+    start_date,
+    end_date,
+    target,
+    workspace_id=None,
+    jira_instance="default",
+    mapping_file=None,
+    dry_run=False,
+    max_workers=4,
+    mirror_spreadsheet_id=None,
+    resume=True,
+    journal_path=SYNC_JOURNAL_PATH,
+):
+    """
+    Write Toggl or Clockify entries straight to Jira worklogs or Wrike timelogs.
+
+    :param source: toggl or clockify.
+    :param start_date: First day to sync (YYYY-MM-DD).
+    :param end_date: Last day to sync (YYYY-MM-DD).
+    :param target: wrike or jira.
+    :param workspace_id: Clockify workspace ID, required for the clockify source.
+    :param jira_instance: Name of the Jira instance in config.yaml.
+    :param mapping_file: Optional CSV mapping table, see load_mapping.
+    :param dry_run: Only print what would be written.
+    :param max_workers: Number of concurrent writes.
+    :param mirror_spreadsheet_id: Copy the results to a new sheet of this spreadsheet.
+    :param resume: Skip the entries written by a previous run, see the checkpoint journal.
+    :return: Dict counting written, failed, skipped and dry run entries.
+    """
+    mapping = load_mapping(mapping_file) if mapping_file else None
+    writer = None if dry_run else get_target(target, jira_instance)
+    journal_target = f"jira:{jira_instance}" if target == "jira" else target
+    summary = {"written": 0, "failed": 0, "skipped": 0, "dry run": 0}
+    mirror_rows = [["Date", "Start", "Hours", "Task", "Comment", "Status", "Detail"]]
+    connection = checkpoint.connect(journal_path)
+
+    def journal_key(entry):
+        # An edited entry is a new write
+        return f"{source}:{entry['id']}:{fingerprint(entry)}"
+
+    def resolved_entries():
+        for entry in iter_entries(source, start_date, end_date, workspace_id):
+            entry["task_key"] = resolve_task_key(entry, mapping)
+            if not entry["task_key"]:
+                summary["skipped"] += 1
+                print(
+                    f"Skipped entry {entry['id']}, no task key: {entry['description']}"
+                )
+                continue
+            if resume and checkpoint.done_keys(connection, [journal_key(entry)]):
+                summary["skipped"] += 1
+                print(f"Skipped entry {entry['id']}, already written")
+                continue
+            yield entry
+
+    with closing(connection):
+        for entry, status, detail in _write_entries(
+            resolved_entries(), writer, dry_run, max_workers
+        ):
+            if status != "dry run":
+                checkpoint.record(
+                    connection, journal_key(entry), journal_target, status, detail
+                )
+            summary[status] += 1
+            hours = round(entry["seconds"] / 3600, 2)
+            print(
+                f"{status}: {entry['task_key']} {entry['start']:%Y-%m-%d %H:%M} {hours}h {detail}"
+            )
+            if mirror_spreadsheet_id:
+                mirror_rows.append(
+                    [
+                        entry["start"].strftime("%Y-%m-%d"),
+                        entry["start"].strftime("%H:%M:%S"),
+                        hours,
+                        entry["task_key"],
+                        entry["comment"],
+                        status,
+                        detail,
+                    ]
+                )
+
+    if mirror_spreadsheet_id:
+        _mirror_to_sheet(mirror_spreadsheet_id, source, target, mirror_rows)
+    return summary
+
+
+def _mirror_to_sheet(spreadsheet_id, source, target, rows):
+    # Imported here so the pipeline doesn't need Google credentials unless mirroring
+    from . import google_sheets
+
+    if spreadsheet_id is True:
+        spreadsheet_id = DEFAULT_GOOGLE_SHEET_ID
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H-%M")
+    title = f"Pipeline {source} to {target} {now}"
+    service = google_sheets.login_to_google_sheets()
+    google_sheets.check_or_create_sheet(service, spreadsheet_id, title)
+    google_sheets.update_sheet_with_data(service, spreadsheet_id, title, rows)
+    print(f"Results mirrored to the sheet: {title}")
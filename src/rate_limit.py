@@ -0,0 +1,38 @@
+import hashlib
+import threading
+import time
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class RateLimiter:
+    """Space requests evenly so no more than per_minute are sent in a minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60 / per_minute
+        self.next_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_at - now
+            self.next_at = max(now, self.next_at) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def wait(provider, credential, per_minute):
+    """
+    Wait for the turn of the next request made with a credential.
+
+    Every credential has its own limiter, so users sharing a process don't
+    slow each other down.
+    """
+    fingerprint = hashlib.sha1(str(credential).encode("utf-8")).hexdigest()
+    with _limiters_lock:
+        limiter = _limiters.get((provider, fingerprint))
+        if limiter is None:
+            limiter = _limiters[(provider, fingerprint)] = RateLimiter(per_minute)
+    limiter.wait()
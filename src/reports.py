@@ -0,0 +1,34 @@
+from diskcache import Cache
+
+from .config import REPORTS_DISK_CACHE_DIR
+from .http_cache import credential_scope
+from .periods import is_closed
+
+cache = Cache(REPORTS_DISK_CACHE_DIR)
+
+
+def fetch_report(key, end_date, fetch, credential):
+    """
+    Return a report, cached permanently once the period it covers is over.
+
+    Reports of a period that includes today are always fetched, since new
+    entries can still be added.
+
+    :param key: Tuple identifying the report and all of its parameters.
+    :param end_date: Last day covered by the report (YYYY-MM-DD).
+    :param fetch: Function without arguments that requests the report.
+    :param credential: API key the report is fetched with, reports are cached per key
+        since users don't see the same entries.
+    """
+    key = (*key, credential_scope(credential))
+    if key in cache:
+        return cache[key]
+
+    report = fetch()
+    if report is not None and is_closed(end_date):
+        cache[key] = report
+    return report
+
+
+def delete_cache():
+    cache.clear()
@@ -0,0 +1,232 @@
+import datetime
+import sqlite3
+from contextlib import closing
+
+from . import pipeline, wrike
+from .config import ROLLUP_STORE_PATH
+from .jira import JiraAPI
+from .periods import to_date
+
+SOURCES = ("toggl", "clockify", "wrike", "jira")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    source TEXT NOT NULL,
+    id TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    project TEXT NOT NULL,
+    day TEXT NOT NULL,
+    week TEXT NOT NULL,
+    seconds INTEGER NOT NULL,
+    PRIMARY KEY (source, id)
+);
+CREATE INDEX IF NOT EXISTS entries_source_day ON entries (source, day);
+CREATE INDEX IF NOT EXISTS entries_source_week ON entries (source, week);
+
+CREATE TABLE IF NOT EXISTS daily (
+    source TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    project TEXT NOT NULL,
+    day TEXT NOT NULL,
+    seconds INTEGER NOT NULL,
+    PRIMARY KEY (source, task_key, project, day)
+);
+CREATE INDEX IF NOT EXISTS daily_day ON daily (day);
+
+CREATE TABLE IF NOT EXISTS weekly (
+    source TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    project TEXT NOT NULL,
+    week TEXT NOT NULL,
+    seconds INTEGER NOT NULL,
+    PRIMARY KEY (source, task_key, project, week)
+);
+CREATE INDEX IF NOT EXISTS weekly_week ON weekly (week);
+"""
+
+# Columns of the daily table each query can be grouped by
+GROUPS = {
+    "task": "task_key",
+    "project": "project",
+    "day": "day",
+    "week": "week",
+    "source": "source",
+}
+
+
+def connect(path=ROLLUP_STORE_PATH):
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _week_start(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def _to_row(source, entry):
+    """Turn a common entry (see entries.py), a Wrike timelog or a Jira worklog into a row."""
+    if source == "wrike":
+        entry = {
+            "id": entry["id"],
+            "task_key": entry.get("taskId"),
+            "project_id": None,
+            "start": entry["trackedDate"][:10],
+            "seconds": round(float(entry.get("hours", 0)) * 3600),
+        }
+    elif source == "jira":
+        entry = {
+            "id": entry["id"],
+            "task_key": entry.get("issueId"),
+            "project_id": None,
+            "start": entry["started"][:10],
+            "seconds": int(entry.get("timeSpentSeconds", 0)),
+        }
+    day = to_date(entry["start"])
+    return (
+        source,
+        str(entry["id"]),
+        str(entry.get("task_key") or ""),
+        str(entry.get("project_id") or ""),
+        day.isoformat(),
+        _week_start(day).isoformat(),
+        int(entry["seconds"]),
+    )
+
+
+def ingest(source, entries, path=ROLLUP_STORE_PATH):
+    """
+    Add or update entries and refresh the daily and weekly totals they touch.
+
+    Only the days and weeks of the ingested entries (old and new values) are
+    recomputed, with a GROUP BY over the entries table.
+
+    :return: Number of entries ingested.
+    """
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source {source}, expected one of {SOURCES}")
+    rows = [_to_row(source, entry) for entry in entries]
+    if not rows:
+        return 0
+
+    with closing(connect(path)) as connection, connection:
+        connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS touched (day TEXT, week TEXT)"
+        )
+        connection.execute("DELETE FROM touched")
+        # The previous day and week of updated entries must be recomputed too
+        connection.executemany(
+            """
+            INSERT INTO touched (day, week)
+            SELECT day, week FROM entries WHERE source = ? AND id = ?
+            """,
+            [(row[0], row[1]) for row in rows],
+        )
+        connection.executemany(
+            "INSERT INTO touched (day, week) VALUES (?, ?)",
+            [(row[4], row[5]) for row in rows],
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+        )
+
+        connection.execute(
+            "DELETE FROM daily WHERE source = ? AND day IN (SELECT day FROM touched)",
+            (source,),
+        )
+        connection.execute(
+            """
+            INSERT INTO daily (source, task_key, project, day, seconds)
+            SELECT source, task_key, project, day, SUM(seconds) FROM entries
+            WHERE source = ? AND day IN (SELECT day FROM touched)
+            GROUP BY source, task_key, project, day
+            """,
+            (source,),
+        )
+        connection.execute(
+            "DELETE FROM weekly WHERE source = ? AND week IN (SELECT week FROM touched)",
+            (source,),
+        )
+        connection.execute(
+            """
+            INSERT INTO weekly (source, task_key, project, week, seconds)
+            SELECT source, task_key, project, week, SUM(seconds) FROM entries
+            WHERE source = ? AND week IN (SELECT week FROM touched)
+            GROUP BY source, task_key, project, week
+            """,
+            (source,),
+        )
+    return len(rows)
+
+
+def update(
+    source,
+    start_date,
+    end_date,
+    workspace_id=None,
+    jira_instance="default",
+    path=ROLLUP_STORE_PATH,
+):
+    """
+    Fetch the entries of a source between two dates (YYYY-MM-DD) and ingest them.
+
+    :param source: toggl, clockify, wrike or jira.
+    :param workspace_id: Clockify workspace ID, required for the clockify source.
+    :param jira_instance: Name of the Jira instance in config.yaml, for the jira source.
+    :return: Number of entries ingested.
+    """
+    if source == "wrike":
+        entries = wrike.get_all_timelogs(tracked_date_range=(start_date, end_date))
+    elif source == "jira":
+        entries = JiraAPI(instance_name=jira_instance).get_worklogs(
+            start_date, end_date
+        )
+    elif source in ("toggl", "clockify"):
+        entries = pipeline.iter_entries(source, start_date, end_date, workspace_id)
+    else:
+        raise ValueError(f"Unknown source {source}, expected one of {SOURCES}")
+    return ingest(source, entries, path)
+
+
+def hours(
+    group_by="task", start_date=None, end_date=None, source=None, path=ROLLUP_STORE_PATH
+):
+    """
+    Total hours grouped by task, project, day, week or source, from the local totals only.
+
+    Example, hours per project last quarter:
+        python main.py rollups hours --group_by=project --start_date=2024-07-01 --end_date=2024-09-30
+
+    :return: List of (group, hours) tuples, largest first.
+    """
+    if group_by not in GROUPS:
+        raise ValueError(f"Unknown group {group_by}, expected one of {tuple(GROUPS)}")
+
+    if group_by == "week" and not start_date and not end_date:
+        table, column = "weekly", "week"
+    else:
+        table, column = "daily", GROUPS[group_by]
+        if group_by == "week":
+            column = "date(day, '-' || ((strftime('%w', day) + 6) % 7) || ' days')"
+
+    conditions, params = [], []
+    if source:
+        conditions.append("source = ?")
+        params.append(source)
+    if start_date:
+        conditions.append("day >= ?")
+        params.append(to_date(start_date).isoformat())
+    if end_date:
+        conditions.append("day <= ?")
+        params.append(to_date(end_date).isoformat())
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    with closing(connect(path)) as connection:
+        rows = connection.execute(
+            f"""
+            SELECT {column} AS grouped, SUM(seconds) FROM {table} {where}
+            GROUP BY grouped ORDER BY SUM(seconds) DESC
+            """,
+            params,
+        ).fetchall()
+    return [(group, round(seconds / 3600, 2)) for group, seconds in rows]
@@ -0,0 +1,183 @@
+import json
+import re
+import sqlite3
+from contextlib import closing
+
+from . import wrike
+from .config import TASK_STORE_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    folder_id TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_folder_id ON tasks (folder_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    title, content='tasks', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS tasks_ai AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_ad AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_au AFTER UPDATE ON tasks BEGIN
+    INSERT INTO tasks_fts (tasks_fts, rowid, title) VALUES ('delete', old.rowid, old.title);
+    INSERT INTO tasks_fts (rowid, title) VALUES (new.rowid, new.title);
+END;
+
+CREATE TABLE IF NOT EXISTS folders (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    child_ids TEXT NOT NULL,
+    is_project INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS timelogs (
+    id TEXT PRIMARY KEY,
+    task_id TEXT,
+    hours REAL,
+    tracked_date TEXT,
+    created_date TEXT,
+    updated_date TEXT,
+    comment TEXT
+);
+CREATE INDEX IF NOT EXISTS timelogs_task_id ON timelogs (task_id);
+CREATE INDEX IF NOT EXISTS timelogs_tracked_date ON timelogs (tracked_date);
+"""
+
+
+def connect(path=TASK_STORE_PATH):
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _upsert_tasks(connection, tasks, folder_id=None):
+    # An UPSERT (rather than INSERT OR REPLACE) keeps the rowid, and the FTS index, stable
+    connection.executemany(
+        """
+        INSERT INTO tasks (id, title, folder_id) VALUES (?, ?, ?)
+        ON CONFLICT (id) DO UPDATE SET
+            title = excluded.title,
+            folder_id = COALESCE(excluded.folder_id, tasks.folder_id)
+        WHERE tasks.title != excluded.title
+            OR tasks.folder_id IS NOT COALESCE(excluded.folder_id, tasks.folder_id)
+        """,
+        [(task_id, title or "", folder_id) for task_id, title in tasks],
+    )
+
+
+def sync_tasks(folder_or_project_id=None, page_size=1000, path=TASK_STORE_PATH):
+    """
+    Download Wrike tasks page by page into the local store.
+
+    :return: Number of tasks stored.
+    """
+    count = 0
+    with closing(connect(path)) as connection:
+        for page in wrike.iter_task_pages(folder_or_project_id, page_size):
+            with connection:
+                _upsert_tasks(connection, page, folder_or_project_id)
+            count += len(page)
+    return count
+
+
+def sync_folders(path=TASK_STORE_PATH):
+    """
+    Store the Wrike folder tree.
+
+    :return: Number of folders stored.
+    """
+    index = wrike.get_folder_index()
+    if not index:
+        return 0
+    with closing(connect(path)) as connection, connection:
+        connection.executemany(
+            "INSERT OR REPLACE INTO folders (id, title, child_ids, is_project) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    folder["id"],
+                    folder["title"],
+                    json.dumps(folder.get("childIds", [])),
+                    int("project" in folder),
+                )
+                for folder in index.folders.values()
+            ],
+        )
+    return len(index.folders)
+
+
+def sync_timelogs(start_date, end_date, for_current_user=True, path=TASK_STORE_PATH):
+    """
+    Store the Wrike timelogs tracked between two dates (YYYY-MM-DD).
+
+    :return: Number of timelogs stored.
+    """
+    timelogs = wrike.get_all_timelogs(
+        tracked_date_range=(start_date, end_date), for_current_user=for_current_user
+    )
+    with closing(connect(path)) as connection, connection:
+        connection.executemany(
+            """
+            INSERT OR REPLACE INTO timelogs
+                (id, task_id, hours, tracked_date, created_date, updated_date, comment)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    timelog["id"],
+                    timelog.get("taskId"),
+                    timelog.get("hours"),
+                    timelog.get("trackedDate"),
+                    timelog.get("createdDate"),
+                    timelog.get("updatedDate"),
+                    timelog.get("comment"),
+                )
+                for timelog in timelogs
+            ],
+        )
+    return len(timelogs)
+
+
+def _to_fts_query(text):
+    # Every word must match, as a prefix, so "onboard api" finds "Onboarding API"
+    words = re.findall(r"\w+", text or "")
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search(query, limit=10, path=TASK_STORE_PATH, connection=None):
+    """
+    Full-text search of the stored task titles, best matches first.
+
+    :param query: Free text, e.g. "onboarding api".
+    :param limit: Maximum number of results.
+    :param connection: Open store connection to reuse across a batch of
+        searches, otherwise one is opened on path.
+    :return: List of (task_id, title) tuples.
+    """
+    fts_query = _to_fts_query(query)
+    if not fts_query:
+        return []
+    if connection is None:
+        with closing(connect(path)) as connection:
+            return search(query, limit, connection=connection)
+    return connection.execute(
+        """
+        SELECT tasks.id, tasks.title
+        FROM tasks_fts JOIN tasks ON tasks.rowid = tasks_fts.rowid
+        WHERE tasks_fts MATCH ?
+        ORDER BY bm25(tasks_fts)
+        LIMIT ?
+        """,
+        (fts_query, limit),
+    ).fetchall()
+
+
+def get_task(task_id, path=TASK_STORE_PATH):
+    with closing(connect(path)) as connection:
+        return connection.execute(
+            "SELECT id, title FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
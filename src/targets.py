@@ -0,0 +1,74 @@
+import requests
+
+from . import wrike
+from .checkpoint import ProviderError
+from .jira import JiraAPI
+
+# Raised by the targets when the provider, not the entry, is the problem
+PROVIDER_ERRORS = (ProviderError, requests.ConnectionError, requests.Timeout)
+
+
+class TargetError(Exception):
+    pass
+
+
+class RetryableTargetError(TargetError):
+    """The target is rate limiting, failing or unreachable, the entry itself may be fine."""
+
+
+class WrikeTarget:
+    name = "wrike"
+
+    def create(self, entry):
+        """Create a timelog for a common entry (see entries.py) and return its ID."""
+        try:
+            # Bypass the cached create_timelog, every call here must reach Wrike
+            response = wrike._create_timelog_internal(
+                entry["task_key"],
+                round(entry["seconds"] / 3600, 2),
+                entry["start"].strftime("%Y-%m-%d"),
+                entry["comment"],
+            )
+        except PROVIDER_ERRORS as e:
+            raise RetryableTargetError(f"Wrike is unavailable: {e}") from e
+        if not response or not response.get("data"):
+            raise TargetError(f"Failed to create Wrike timelog for {entry['task_key']}")
+        return response["data"][0]["id"]
+
+    def delete(self, task_key, target_id):
+        try:
+            return wrike.delete_timelog(target_id) is not None
+        except PROVIDER_ERRORS as e:
+            raise RetryableTargetError(f"Wrike is unavailable: {e}") from e
+
+
+class JiraTarget:
+    name = "jira"
+
+    def __init__(self, instance_name="default"):
+        self.api = JiraAPI(instance_name=instance_name)
+
+    def create(self, entry):
+        """Log a common entry (see entries.py) as a worklog and return its ID."""
+        response = self.api.log_time_to_jira_task(
+            entry["task_key"], entry["start"], entry["seconds"], entry["comment"]
+        )
+        if response.get("provider_error"):
+            raise RetryableTargetError(f"{response['error']}: {response['details']}")
+        if "error" in response:
+            raise TargetError(f"{response['error']}: {response['details']}")
+        return response["worklog"]["id"]
+
+    def delete(self, task_key, target_id):
+        try:
+            return self.api.delete_worklog(task_key, target_id)
+        except PROVIDER_ERRORS as e:
+            raise RetryableTargetError(f"Jira is unavailable: {e}") from e
+
+
+def get_target(name, jira_instance="default"):
+    if name == "wrike":
+        return WrikeTarget()
+    if name == "jira":
+        return JiraTarget(instance_name=jira_instance)
+    raise ValueError(f"Unknown target {name}, expected wrike or jira")
@@ -0,0 +1,141 @@
+import os
+import re
+from bisect import bisect_left
+
+from jira.exceptions import JIRAError
+
+from . import wrike
+from .utils import as_list
+
+# Open issues only, closed ones are still accepted by the Jira sync, see resolve_issue
+ISSUE_CATALOG_JQL = "statusCategory != Done ORDER BY key"
+
+ISSUE_KEY_PATTERN = re.compile(r"^[A-Z][A-Z0-9_]+-\d+$")
+
+
+def normalize(text):
+    return " ".join(str(text).casefold().split())
+
+
+class TaskIndex:
+    """
+    Resolve free-text task cells to Wrike task IDs or Jira issue keys, without a request.
+
+    A task is found by its ID or key, its aliases, its exact title or, when a
+    single task starts that way, the beginning of its title. Titles are kept
+    sorted and searched with bisect, which answers the same prefix queries as a
+    trie with one string per task instead of one node per character.
+    """
+
+    def __init__(self, tasks):
+        """:param tasks: (key, title) or (key, title, aliases) tuples."""
+        self.titles = {}
+        self.aliases = {}
+        for task in tasks:
+            key, title = task[0], task[1]
+            self.titles[key] = title
+            for alias in (key, *(task[2] if len(task) > 2 else ())):
+                self.aliases[normalize(alias)] = key
+        self._sorted_titles = sorted(
+            (normalize(title), key) for key, title in self.titles.items()
+        )
+        self._sorted_aliases = sorted(self.aliases)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _titles_starting_with(self, prefix, limit):
+        matches = []
+        i = bisect_left(self._sorted_titles, (prefix,))
+        while i < len(self._sorted_titles) and len(matches) < limit:
+            title, key = self._sorted_titles[i]
+            if not title.startswith(prefix):
+                break
+            matches.append((title, key))
+            i += 1
+        return matches
+
+    def resolve(self, cell):
+        """
+        Return the key of the task a cell refers to, None if unknown or ambiguous.
+
+        The first word is tried as an ID, key or alias first, so cells like
+        "PROJ-12 Fix the login page" resolve to PROJ-12.
+        """
+        text = normalize(cell)
+        if not text:
+            return None
+        first_word = text.split(" ")[0]
+        if first_word in self.aliases:
+            return self.aliases[first_word]
+        if text in self.aliases:
+            return self.aliases[text]
+
+        matches = self._titles_starting_with(text, limit=2)
+        exact = [key for title, key in matches if title == text]
+        if len(exact) == 1:
+            return exact[0]
+        if len(matches) == 1:
+            return matches[0][1]
+        return None
+
+    def suggest(self, cell, limit=3):
+        """Return labels of tasks whose key or title starts like the cell."""
+        text = normalize(cell)
+        if not text:
+            return []
+        first_word = text.split(" ")[0]
+        keys = []
+        i = bisect_left(self._sorted_aliases, first_word)
+        while (
+            i < len(self._sorted_aliases)
+            and len(keys) < limit
+            and self._sorted_aliases[i].startswith(first_word)
+        ):
+            keys.append(self.aliases[self._sorted_aliases[i]])
+            i += 1
+        keys += [key for _, key in self._titles_starting_with(text, limit)]
+        return [self.label(key) for key in dict.fromkeys(keys)][:limit]
+
+    def label(self, key):
+        """Text of the task in the sheet dropdown, resolved back by its first word."""
+        return f"{key} {self.titles[key]}"
+
+    def labels(self):
+        return [self.label(key) for key in self.titles]
+
+
+def wrike_index(folder_ids=None):
+    """Index the tasks of the Wrike folders, defaults to WRIKE_FOLDER_IDS."""
+    if folder_ids is None:
+        folder_ids = os.getenv("WRIKE_FOLDER_IDS", "")
+    return TaskIndex(wrike.get_tasks_for_folders(as_list(folder_ids)))
+
+
+def jira_index(jira_api, jql=ISSUE_CATALOG_JQL):
+    """Index the issues of a Jira instance by key, ID and summary."""
+    return TaskIndex(
+        (key, summary, (issue_id,))
+        for key, issue_id, summary in jira_api.list_issues(jql)
+    )
+
+
+def resolve_issue(index, cell, jira_api):
+    """
+    Resolve a Jira task cell, asking Jira only for keys missing from the catalog.
+
+    The catalog holds the open issues, so a closed issue key is looked up
+    before being flagged as unknown. Errors other than a missing issue are
+    raised, a failing Jira doesn't make every row unknown.
+    """
+    key = index.resolve(cell)
+    if key is not None:
+        return key
+    first_word = str(cell).split(" ")[0].strip()
+    if ISSUE_KEY_PATTERN.match(first_word):
+        try:
+            return jira_api.get_issue_key(first_word)
+        except JIRAError as e:
+            if e.status_code != 404:
+                raise
+    return None
@@ -0,0 +1,139 @@
+import os
+import shlex
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from . import warm
+from .config import TEAM_ROSTER_FILE
+from .jira import credential_variable
+from .utils import as_list, print_table
+
+# Roster fields and the environment variables they replace for the user's run
+CREDENTIAL_VARIABLES = {
+    "wrike_access_token": "WRIKE_ACCESS_TOKEN",
+    "wrike_user_id": "WRIKE_USER_ID",
+    "toggl_api_key": "TOGGL_API_KEY",
+    "clockify_api_key": "CLOCKIFY_API_KEY",
+}
+
+# Fields of each instance in a user's `jira_instances`, and the variables they replace
+JIRA_CREDENTIAL_VARIABLES = {
+    "user_email": "JIRA_USER_EMAIL",
+    "api_token": "JIRA_API_TOKEN",
+}
+
+# Where the files that must not be shared between users are kept
+TEAM_STATE_DIR = "team"
+
+
+def load_roster(path=TEAM_ROSTER_FILE):
+    """
+    Read the users of the team from a YAML file with a `users` list.
+
+    Each user has a unique name, any of the fields of CREDENTIAL_VARIABLES and
+    a `jira_instances` mapping of instance name to JIRA_CREDENTIAL_VARIABLES
+    fields. The missing ones fall back to the .env and config.yaml credentials.
+    """
+    with open(path, "r") as file:
+        roster = yaml.safe_load(file) or {}
+
+    users = roster.get("users") or []
+    names = [user.get("name") for user in users]
+    if not all(names):
+        raise ValueError(f"Every user in {path} needs a name")
+    if len(set(names)) != len(names):
+        raise ValueError(f"User names in {path} must be unique")
+    return users
+
+
+def user_env(user, base_env=None):
+    """
+    Return the environment of a user's run, their credentials on top of base_env.
+
+    The sync journal, the daemon state and the event log are kept per user,
+    the disk caches stay shared so the team fetches the Wrike catalog once,
+    while responses that depend on the user are cached under their credentials.
+    """
+    env = dict(os.environ if base_env is None else base_env)
+    for field, variable in CREDENTIAL_VARIABLES.items():
+        if user.get(field):
+            env[variable] = str(user[field])
+    for instance_name, credentials in (user.get("jira_instances") or {}).items():
+        for field, variable in JIRA_CREDENTIAL_VARIABLES.items():
+            if credentials.get(field):
+                env[credential_variable(variable, instance_name)] = str(
+                    credentials[field]
+                )
+
+    state_dir = os.path.join(TEAM_STATE_DIR, user["name"])
+    env["SYNC_JOURNAL_PATH"] = os.path.join(state_dir, "sync_journal.sqlite3")
+    env["DAEMON_STATE_FILE"] = os.path.join(state_dir, "daemon_state.json")
+    env["EVENT_LOG_FILE"] = os.path.join(state_dir, "events.jsonl")
+    return env
+
+
+def _run_user(user, command):
+    started_at = time.perf_counter()
+    state_dir = os.path.join(TEAM_STATE_DIR, user["name"])
+    os.makedirs(state_dir, exist_ok=True)
+    output_file = os.path.join(state_dir, "output.log")
+
+    # Split before formatting, so names with spaces or quotes stay one argument
+    args = [arg.format(name=user["name"]) for arg in shlex.split(command)]
+    with open(output_file, "w", encoding="utf-8") as output:
+        completed = subprocess.run(
+            [sys.executable, "-m", "main", *args],
+            env=user_env(user),
+            stdout=output,
+            stderr=subprocess.STDOUT,
+            check=False,
+        )
+    return {
+        "user": user["name"],
+        "returncode": completed.returncode,
+        "seconds": round(time.perf_counter() - started_at, 2),
+        "output": output_file,
+    }
+
+
+def run(
+    command,
+    roster_file=TEAM_ROSTER_FILE,
+    max_workers=4,
+    share_catalog=True,
+    folder_ids=None,
+):
+    """
+    Run the same command for every user of the team, each with their own credentials.
+
+    Each user's command runs in its own process, so the credentials read from
+    the environment at start up are theirs. Before that, the Wrike folders,
+    projects and tasks are warmed once with the .env credentials, every run
+    then reads them from the shared disk cache.
+
+    Example, sync the sheet of each user named after them:
+        python main.py team run "google_sheets sync_sheet_to_wrike --title={name}"
+
+    :param command: Command line after main.py, {name} is replaced by the user's name.
+    :param roster_file: YAML file listing the users and their credentials.
+    :param max_workers: Number of users synced at the same time.
+    :param share_catalog: Warm the shared Wrike lookups before the users' runs.
+    :param folder_ids: Comma separated Wrike folder IDs to warm, defaults to WRIKE_FOLDER_IDS.
+    :return: True if every user's command succeeded.
+    """
+    users = load_roster(roster_file)
+
+    if share_catalog:
+        if folder_ids is None:
+            folder_ids = os.getenv("WRIKE_FOLDER_IDS", "")
+        warm.warm_once(as_list(folder_ids), [])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda user: _run_user(user, command), users))
+
+    print_table(["user", "returncode", "seconds", "output"], results)
+    return all(result["returncode"] == 0 for result in results)
@@ -3,7 +3,17 @@ from datetime import datetime
 import requests
 from tqdm import tqdm
 
-from .config import TOGGL_API_KEY, TOGGL_API_URL
+from . import rate_limit
+from .config import (
+    TOGGL_API_KEY,
+    TOGGL_API_URL,
+    TOGGL_REPORTS_API_URL,
+    TOGGL_REQUESTS_PER_MINUTE,
+)
+from .reports import fetch_report
+
+# The Reports API asks every client to identify itself
+REPORTS_USER_AGENT = "time-sync-tools"
 
 headers = {
     "Authorization": f"Basic {TOGGL_API_KEY}",
@@ -11,6 +21,10 @@ headers = {
 }
 
 
+def _throttle():
+    rate_limit.wait("toggl", TOGGL_API_KEY, TOGGL_REQUESTS_PER_MINUTE)
+
+
 def validate_date(date_str):
     try:
         return datetime.strptime(date_str, "%Y-%m-%d")
@@ -30,6 +44,7 @@ def get_time_entries(start_date, end_date):
         "start_date": start_date.isoformat() + "Z",
         "end_date": end_date.isoformat() + "Z",
     }
+    _throttle()
     response = requests.get(
         f"{TOGGL_API_URL}/time_entries", headers=headers, params=params
     )
@@ -56,6 +71,7 @@ def add_time_entry(description, start_time, end_time):
 
     print("Adding time entry...")
     with tqdm(total=1, desc="Uploading time entry to Toggl") as pbar:
+        _throttle()
         response = requests.post(
             f"{TOGGL_API_URL}/time_entries", headers=headers, json=data
         )
@@ -65,3 +81,76 @@ def add_time_entry(description, start_time, end_time):
         return response.json()
     else:
         response.raise_for_status()
+
+
+def _get_report(report_type, workspace_id, start_date, end_date, **params):
+    if validate_date(start_date) > validate_date(end_date):
+        raise ValueError("The start date cannot be later than the end date")
+
+    _throttle()
+
+    response = requests.get(
+        f"{TOGGL_REPORTS_API_URL}/{report_type}",
+        headers=headers,
+        params={
+            "workspace_id": workspace_id,
+            # Both days are included in the report
+            "since": start_date,
+            "until": end_date,
+            "user_agent": REPORTS_USER_AGENT,
+            **params,
+        },
+    )
+
+    if response.status_code == 200:
+        return response.json()
+    else:
+        response.raise_for_status()
+
+
+def get_summary_report(
+    workspace_id, start_date, end_date, grouping="projects", subgrouping="tasks"
+):
+    """
+    Get the time totals of a workspace, grouped and summed by Toggl.
+
+    Example, hours per user and project last quarter:
+        python main.py toggl get_summary_report --workspace_id=ID \
+            --start_date=2024-07-01 --end_date=2024-09-30 --grouping=users --subgrouping=projects
+
+    :param grouping: projects, clients or users.
+    :param subgrouping: time_entries, tasks, projects, users or clients.
+    :return: The summary report, with totals in milliseconds.
+    """
+    return fetch_report(
+        ("toggl", "summary", workspace_id, start_date, end_date, grouping, subgrouping),
+        end_date,
+        lambda: _get_report(
+            "summary",
+            workspace_id,
+            start_date,
+            end_date,
+            grouping=grouping,
+            subgrouping=subgrouping,
+        ),
+        TOGGL_API_KEY,
+    )
+
+
+def iter_detailed_report(workspace_id, start_date, end_date):
+    """Yield the entries of a detailed report, one page at a time."""
+    page = 1
+    while True:
+        report = fetch_report(
+            ("toggl", "details", workspace_id, start_date, end_date, page),
+            end_date,
+            lambda: _get_report(
+                "details", workspace_id, start_date, end_date, page=page
+            ),
+            TOGGL_API_KEY,
+        )
+        entries = report.get("data", [])
+        yield from entries
+        if not entries or page * report["per_page"] >= report["total_count"]:
+            return
+        page += 1
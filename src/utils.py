@@ -0,0 +1,13 @@
+def as_list(value):
+    # Fire turns "PROJECT,TASK" into a tuple, but a single value stays a string
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return list(value)
+
+
+def print_table(columns, results):
+    """Print a list of dicts as aligned columns, missing values are left blank."""
+    rows = [[str(result.get(column, "")) for column in columns] for result in results]
+    widths = [max(len(value) for value in values) for values in zip(columns, *rows)]
+    for values in [columns, *rows]:
+        print("  ".join(value.ljust(width) for value, width in zip(values, widths)))
@@ -0,0 +1,153 @@
+import datetime
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import jira, wrike
+from .config import config
+from .jira import JiraAPI
+from .utils import as_list, print_table
+
+# Wrike lookups made by most commands, cached by fetch_data
+WRIKE_LOOKUPS = (
+    wrike._get_connected_user_id_internal,
+    wrike._get_folder_tree_internal,
+    wrike._get_all_tasks_internal,
+)
+
+
+def plan_wrike_refresh():
+    """Return a job fetching again each cached Wrike lookup of the current user."""
+    jobs = []
+    for func in WRIKE_LOOKUPS:
+        for key in wrike._cached_keys(func):
+            args, kwargs = key[1], dict(key[2])
+            # Lookups of other Wrike users can't be fetched with these credentials
+            if key != wrike._cache_key(func, args, kwargs):
+                continue
+            jobs.append(
+                (
+                    " ".join(["refresh", func.__name__.strip("_"), *map(str, args)]),
+                    lambda func=func, args=args, kwargs=kwargs: wrike.refresh_data(
+                        func, *args, **kwargs
+                    ),
+                )
+            )
+    return jobs
+
+
+def _warm_jira(instance_name, refresh):
+    api = JiraAPI(instance_name=instance_name)
+    if refresh:
+        # Replaced once fetched, a failed refresh keeps the cached user
+        jira.cache[("myself", instance_name, api.user_email)] = (
+            api.client.current_user()
+        )
+    api.get_current_user()
+    # Brings the local copy of the worklogs up to date, from the start of the month
+    today = datetime.date.today()
+    return api.get_worklogs(today.replace(day=1).isoformat(), today.isoformat())
+
+
+def plan_jobs(folder_ids, jira_instances, refresh=False):
+    """Return (name, fetch) tuples, fetch being a function without arguments."""
+    jobs = [
+        ("wrike user", wrike.get_connected_user_id),
+        ("wrike folders", wrike.list_all_folders),
+        ("wrike projects", wrike.list_all_projects),
+    ]
+    for folder_id in folder_ids:
+        jobs.append(
+            (
+                f"wrike tasks {folder_id}",
+                lambda folder_id=folder_id: wrike.get_all_tasks(folder_id),
+            )
+        )
+    for instance_name in jira_instances:
+        jobs.append(
+            (
+                f"jira {instance_name}",
+                lambda instance_name=instance_name: _warm_jira(instance_name, refresh),
+            )
+        )
+    return jobs
+
+
+def _run_job(job):
+    name, fetch = job
+    started_at = time.perf_counter()
+    result, error = None, ""
+    try:
+        result = fetch()
+    except Exception as e:
+        error = str(e)
+
+    if isinstance(result, (list, dict)):
+        loaded = len(result)
+    else:
+        loaded = int(result is not None)
+    return {
+        "job": name,
+        "loaded": loaded,
+        "seconds": round(time.perf_counter() - started_at, 2),
+        "error": error,
+    }
+
+
+def warm_once(folder_ids, jira_instances, refresh=False, max_workers=8):
+    """
+    Run every warm-up job on a worker pool, returns one result dict per job.
+
+    With refresh, the cached Wrike lookups are fetched again first and only
+    replaced when the fetch succeeds, so a Wrike outage keeps the old values.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if refresh:
+            results = list(executor.map(_run_job, plan_wrike_refresh()))
+        jobs = plan_jobs(folder_ids, jira_instances, refresh)
+        return results + list(executor.map(_run_job, jobs))
+
+
+def run(
+    folder_ids=None,
+    jira_instances=None,
+    refresh=False,
+    max_workers=8,
+    interval=None,
+):
+    """
+    Prefetch the Wrike and Jira lookups most commands need, so they start from a hot cache.
+
+    Loads the Wrike user, folders, projects and the tasks of each folder, then
+    authenticates to each Jira instance and updates its current user and worklogs.
+    Prints what was loaded and how long each lookup took.
+
+    Example, refresh everything every morning from a long running process:
+        python main.py warm run --refresh=True --interval=86400
+
+    :param folder_ids: Comma separated Wrike folder or project IDs, defaults to WRIKE_FOLDER_IDS.
+    :param jira_instances: Comma separated Jira instance names, defaults to all of config.yaml.
+    :param refresh: Fetch the Wrike lookups again even if they are cached.
+    :param max_workers: Number of lookups made at the same time.
+    :param interval: Seconds between runs, runs once if not set.
+    """
+    if folder_ids is None:
+        folder_ids = os.getenv("WRIKE_FOLDER_IDS", "")
+    if jira_instances is None:
+        jira_instances = [
+            instance["name"] for instance in config.get("jira_instances") or []
+        ]
+    folder_ids = as_list(folder_ids)
+    jira_instances = as_list(jira_instances)
+
+    while True:
+        started_at = time.perf_counter()
+        results = warm_once(folder_ids, jira_instances, refresh, max_workers)
+
+        print_table(["job", "loaded", "seconds", "error"], results)
+        print(f"Cache warmed in {time.perf_counter() - started_at:.2f} seconds")
+
+        if not interval:
+            return
+        time.sleep(interval)
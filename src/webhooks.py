@@ -0,0 +1,147 @@
+import hashlib
+import hmac
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import events, jira, wrike
+from .config import (
+    JIRA_WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WRIKE_WEBHOOK_SECRET,
+)
+
+logger = logging.getLogger("webhooks")
+
+TIMELOG_REMOVED_TYPES = ("Removed", "Deleted")
+
+
+def _sign(secret, payload):
+    return hmac.new(secret.encode("utf-8"), payload, hashlib.sha256).hexdigest()
+
+
+def handle_wrike_events(events):
+    """
+    Invalidate or patch the Wrike cache entries affected by a webhook notification.
+
+    :param events: List of Wrike webhook events.
+    :return: List of the actions taken, for logging and tests.
+    """
+    actions = []
+    for event in events:
+        event_type = event.get("eventType", "")
+
+        if event_type.startswith("Timelog"):
+            removed = (
+                event.get("type") in TIMELOG_REMOVED_TYPES
+                or event.get("changeType") in TIMELOG_REMOVED_TYPES
+            )
+            wrike.invalidate_timelog(
+                event["timelogId"], task_id=event.get("taskId"), removed=removed
+            )
+            actions.append(f"timelog {event['timelogId']}")
+        elif event_type.startswith("Task"):
+            wrike.invalidate_task(
+                event["taskId"],
+                title=event.get("title") if event_type == "TaskTitleChanged" else None,
+                deleted=event_type == "TaskDeleted",
+            )
+            actions.append(f"task {event['taskId']}")
+        elif event_type.startswith(("Folder", "Project")):
+            wrike.invalidate_folders()
+            actions.append("folders")
+    return actions
+
+
+def handle_jira_event(event):
+    """
+    Invalidate the Jira cache entries affected by a webhook notification.
+
+    :return: List of the actions taken, for logging and tests.
+    """
+    event_type = event.get("webhookEvent", "")
+    issue = event.get("issue")
+    if event_type.startswith("jira:issue_") and issue:
+        jira.invalidate_issue(issue["id"])
+        jira.invalidate_issue(issue["key"])
+        return [f"issue {issue['key']}"]
+    return []
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    def _reply(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _handle_wrike(self, body):
+        hook_secret = self.headers.get("X-Hook-Secret")
+        if WRIKE_WEBHOOK_SECRET:
+            if not hook_secret:
+                return self._reply(401)
+            payload = json.loads(body or b"{}")
+            if isinstance(payload, dict) and payload.get("requestType"):
+                # Handshake sent by Wrike when the webhook is created
+                return self._reply(
+                    200,
+                    {
+                        "X-Hook-Secret": _sign(
+                            WRIKE_WEBHOOK_SECRET, hook_secret.encode()
+                        )
+                    },
+                )
+            if not hmac.compare_digest(hook_secret, _sign(WRIKE_WEBHOOK_SECRET, body)):
+                return self._reply(401)
+        actions = handle_wrike_events(json.loads(body))
+        logger.info(f"Wrike webhook invalidated: {actions}")
+        self._reply(200)
+
+    def _handle_jira(self, body):
+        if JIRA_WEBHOOK_SECRET:
+            signature = self.headers.get("X-Hub-Signature", "")
+            expected = f"sha256={_sign(JIRA_WEBHOOK_SECRET, body)}"
+            if not hmac.compare_digest(signature, expected):
+                return self._reply(401)
+        actions = handle_jira_event(json.loads(body))
+        logger.info(f"Jira webhook invalidated: {actions}")
+        self._reply(200)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            if self.path == "/wrike":
+                return self._handle_wrike(body)
+            if self.path == "/jira":
+                return self._handle_jira(body)
+            self._reply(404)
+        except (ValueError, KeyError) as e:
+            logger.error(f"Invalid webhook payload on {self.path}: {e}")
+            self._reply(400)
+
+
+def serve(host=WEBHOOK_HOST, port=WEBHOOK_PORT):
+    """
+    Listen for Wrike (POST /wrike) and Jira (POST /jira) webhooks.
+
+    Put it behind a tunnel or reverse proxy to receive notifications from the cloud.
+    """
+    events.setup(console=True)
+    server = ThreadingHTTPServer((host, port), WebhookHandler)
+    print(f"Listening for webhooks on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+def replay(file_path, provider="wrike"):
+    """Apply a webhook payload saved as JSON, e.g. to test the invalidation locally."""
+    with open(file_path, "r", encoding="utf-8") as file:
+        payload = json.load(file)
+    if provider == "wrike":
+        return handle_wrike_events(payload)
+    if provider == "jira":
+        return handle_jira_event(payload)
+    raise ValueError(f"Unknown provider {provider}, expected wrike or jira")
@@ -1,16 +1,63 @@
 import csv
+import logging
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from datetime import datetime
 
 import requests
-from diskcache import Cache
+from diskcache import Cache, Lock
 from halo import Halo
 
-from .config import WRIKE_ACCESS_TOKEN, WRIKE_API_URL, WRIKE_DISK_CACHE_DIR
+from . import checkpoint, rate_limit
+from .checkpoint import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ProviderError,
+    is_provider_error,
+)
+from .coalesce import coalesce_timelog_rows, print_plan
+from .config import (
+    SYNC_JOURNAL_PATH,
+    WRIKE_ACCESS_TOKEN,
+    WRIKE_API_URL,
+    WRIKE_DISK_CACHE_DIR,
+    WRIKE_MAX_WORKERS,
+    WRIKE_OPEN_WINDOW_TTL,
+    WRIKE_REQUESTS_PER_MINUTE,
+)
+from .events import redact_headers
+from .folder_index import FolderIndex
+from .http_cache import conditional_get, credential_scope
+from .periods import is_closed, month_windows, to_date
+
+logger = logging.getLogger("wrike")
 
 # Setup diskcache
 cache = Cache(WRIKE_DISK_CACHE_DIR)
 
+# Fetches in progress in this process, by cache key, see _fetch_once
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+_MISSING = object()
+
+# Seconds before the cross-process lock of a fetch is released if its process died
+FETCH_LOCK_EXPIRE = 120
+
+# Lookups whose result depends on the user of the access token, their cache keys
+# end with a fingerprint of the token so users sharing the cache never mix them
+USER_SCOPED = {
+    "_get_connected_user_id_internal",
+    "_get_all_timelogs_internal",
+    "_create_timelog_internal",
+}
+
+# Maximum number of task IDs Wrike accepts in a single /tasks/{ids} request
+TASKS_PER_REQUEST = 100
+
 
 def _validate_task_id(task_id):
     if not re.match("^[a-zA-Z0-9]+$", task_id):
@@ -26,41 +73,130 @@ def _validate_date(date_str):
     return date_str
 
 
+def _user_scope():
+    return credential_scope(WRIKE_ACCESS_TOKEN)
+
+
+def _throttle():
+    rate_limit.wait("wrike", WRIKE_ACCESS_TOKEN, WRIKE_REQUESTS_PER_MINUTE)
+
+
 def _get_headers():
     return {"Authorization": f"Bearer {WRIKE_ACCESS_TOKEN}"}
 
 
+def _get(url, params=None, conditional=True):
+    """
+    GET a Wrike endpoint, a 304 reuses the body of the previous response.
+
+    Requests that are never sent twice the same way (later pages, batches of
+    IDs) pass conditional=False, there is nothing to revalidate.
+    """
+    _throttle()
+    if not conditional:
+        return requests.get(url, headers=_get_headers(), params=params)
+    return conditional_get(
+        cache,
+        url,
+        headers=_get_headers(),
+        params=params,
+        get=requests.get,
+        scope=_user_scope(),
+    )
+
+
 def _handle_api_response(response):
     if response.status_code == 200:
         return response.json()
     else:
-        print(
-            f"Error: Unable to process API request. HTTP Status code: {response.status_code}"
+        logger.error(
+            f"Unable to process API request. HTTP Status code: {response.status_code}",
+            extra={
+                "status_code": response.status_code,
+                "url": response.url,
+                "method": response.request.method,
+                "request_headers": redact_headers(response.request.headers),
+                "response_body": response.text[:2000],
+            },
         )
-        print(f"Response body: {response.text}")
-        print(f"Request URL: {response.url}")
-        print(f"Request headers: {response.request.headers}")
-        print(f"Request body: {response.request.body}")
         return None
 
 
-def fetch_data(func, *args, **kwargs):
+def _cache_key(func, args, kwargs):
     key = (func.__name__, args, frozenset(kwargs.items()))
+    if func.__name__ in USER_SCOPED:
+        key += (_user_scope(),)
+    return key
+
+
+def fetch_data(func, *args, **kwargs):
+    return _fetch_once(None, func, args, kwargs)
+
+
+def fetch_recent_data(expire, func, *args, **kwargs):
+    """Same as fetch_data, but the cached result expires after `expire` seconds."""
+    return _fetch_once(expire, func, args, kwargs)
 
-    if key in cache:
-        return cache[key]
 
-    result = func(*args, **kwargs)
-    cache[key] = result
+def refresh_data(func, *args, **kwargs):
+    """
+    Call func again and replace the result fetch_data cached for it.
+
+    The cached result is only replaced once the call succeeds, until then
+    other callers keep reading it.
+    """
+    key = _cache_key(func, args, kwargs)
+    with Lock(cache, ("lock", key), expire=FETCH_LOCK_EXPIRE):
+        result = func(*args, **kwargs)
+        if result is not None:
+            cache.set(key, result)
     return result
 
 
+def _fetch_once(expire, func, args, kwargs):
+    """
+    Return the cached result of func, or call it once for every concurrent caller.
+
+    Threads asking for the same key wait for the first one and share its
+    result. Processes sharing the cache directory wait on a diskcache lock,
+    then read the result the first process cached.
+    """
+    key = _cache_key(func, args, kwargs)
+    result = cache.get(key, default=_MISSING)
+    if result is not _MISSING:
+        return result
+
+    with _in_flight_lock:
+        flight = _in_flight.setdefault(
+            key, {"lock": threading.Lock(), "callers": 0, "result": _MISSING}
+        )
+        flight["callers"] += 1
+    try:
+        with flight["lock"]:
+            if flight["result"] is not _MISSING:
+                return flight["result"]
+            with Lock(cache, ("lock", key), expire=FETCH_LOCK_EXPIRE):
+                result = cache.get(key, default=_MISSING)
+                if result is _MISSING:
+                    result = func(*args, **kwargs)
+                    # Failed requests return None, don't cache them so the next call retries
+                    if result is not None:
+                        cache.set(key, result, expire=expire)
+            flight["result"] = result
+            return result
+    finally:
+        with _in_flight_lock:
+            flight["callers"] -= 1
+            if not flight["callers"]:
+                del _in_flight[key]
+
+
 def get_connected_user_id():
     return fetch_data(_get_connected_user_id_internal)
 
 
 def _get_connected_user_id_internal():
-    response = requests.get(f"{WRIKE_API_URL}/contacts?me=true", headers=_get_headers())
+    response = _get(f"{WRIKE_API_URL}/contacts?me=true")
     data = _handle_api_response(response)
 
     if data and "data" in data and len(data["data"]) > 0:
@@ -78,13 +214,25 @@ def _get_connected_user_id_internal():
 def get_all_tasks(folder_or_project_id=None, page_size=1000, tsv=False):
     data = fetch_data(_get_all_tasks_internal, folder_or_project_id, page_size)
     if tsv:
-        return "\n".join([f"{row[0]}\t{row[1]}" for row in data])
+        return "\n".join([_to_tsv_row(row) for row in data])
     else:
         return data
 
 
 def _get_all_tasks_internal(folder_or_project_id=None, page_size=1000):
     tasks = []
+    for page in iter_task_pages(folder_or_project_id, page_size):
+        tasks.extend(page)
+    return tasks
+
+
+def iter_task_pages(folder_or_project_id=None, page_size=1000):
+    """
+    Yield tasks one API page at a time, as lists of (task_id, task_name) tuples.
+
+    Nothing is cached, not even for revalidation, so callers can stream large
+    task lists without holding them in memory or on disk.
+    """
     next_page_token = None
 
     while True:
@@ -96,20 +244,30 @@ def _get_all_tasks_internal(folder_or_project_id=None, page_size=1000):
         if folder_or_project_id:
             url = f"{WRIKE_API_URL}/folders/{folder_or_project_id}/tasks"
 
-        response = requests.get(url, headers=_get_headers(), params=params)
+        # Page tokens are single use, don't keep the pages for revalidation
+        response = _get(url, params=params, conditional=False)
         data = _handle_api_response(response)
 
-        if data and "data" in data:
-            for task in data["data"]:
-                task_id = task.get("id")
-                task_name = task.get("title")
-                tasks.append((task_id, task_name))
+        if not data or "data" not in data:
+            break
 
-            next_page_token = data.get("nextPageToken")
-            if not next_page_token:
-                break
+        yield [(task.get("id"), task.get("title")) for task in data["data"]]
 
-    return tasks
+        next_page_token = data.get("nextPageToken")
+        if not next_page_token:
+            break
+
+
+def _to_tsv_row(values):
+    """Join values with tabs, escaping backslashes, tabs and newlines inside them."""
+    return "\t".join(
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        for value in values
+    )
 
 
 def _print_to_console_as_csv(data):
@@ -124,31 +282,59 @@ def get_all_tasks_as_csv(folder_or_project_id=None, page_size=1000):
 
 
 def list_all_projects():
-    return fetch_data(_list_all_projects_internal)
+    index = get_folder_index()
+    return index.list_projects() if index else None
 
 
-def _list_all_projects_internal():
-    response = requests.get(
-        f"{WRIKE_API_URL}/folders", headers=_get_headers(), params={"type": "Project"}
-    )
-    data = _handle_api_response(response)
-    return (
-        [(project["id"], project["title"]) for project in data["data"]]
-        if data
-        else None
-    )
+def list_all_folders():
+    index = get_folder_index()
+    return index.list_folders() if index else None
 
 
-def list_all_folders():
-    return fetch_data(_list_all_folders_internal)
+def get_folder_index():
+    """Return a FolderIndex of the whole Wrike folder tree, or None if it can't be fetched."""
+    folders = fetch_data(_get_folder_tree_internal)
+    return FolderIndex(folders) if folders is not None else None
 
 
-def _list_all_folders_internal():
-    response = requests.get(f"{WRIKE_API_URL}/folders", headers=_get_headers())
+def _get_folder_tree_internal():
+    response = _get(f"{WRIKE_API_URL}/folders")
     data = _handle_api_response(response)
-    return (
-        [(folder["id"], folder["title"]) for folder in data["data"]] if data else None
-    )
+    return data["data"] if data else None
+
+
+def get_tasks_for_folders(folder_or_project_ids):
+    """
+    Get the tasks of several folders or projects, each task listed once.
+
+    Folders nested in another requested folder are skipped since their tasks are
+    already part of the parent's descendants. The remaining folders are fetched
+    in parallel.
+    """
+    folder_or_project_ids = [
+        folder_id.strip() for folder_id in folder_or_project_ids if folder_id.strip()
+    ]
+    if not folder_or_project_ids:
+        return get_all_tasks()
+
+    index = get_folder_index()
+    if index:
+        folder_or_project_ids = index.minimal_roots(folder_or_project_ids)
+
+    with ThreadPoolExecutor(max_workers=WRIKE_MAX_WORKERS) as executor:
+        results = executor.map(
+            lambda folder_id: get_all_tasks(folder_or_project_id=folder_id),
+            folder_or_project_ids,
+        )
+
+        tasks = []
+        seen_ids = set()
+        for folder_tasks in results:
+            for task in folder_tasks:
+                if task[0] not in seen_ids:
+                    seen_ids.add(task[0])
+                    tasks.append(task)
+    return tasks
 
 
 def get_task_by_id(task_id):
@@ -161,7 +347,7 @@ def _get_task_by_id_internal(task_id):
     spinner = Halo(text="Fetching task from Wrike...", spinner="dots")
     spinner.start()
 
-    response = requests.get(f"{WRIKE_API_URL}/tasks/{task_id}", headers=_get_headers())
+    response = _get(f"{WRIKE_API_URL}/tasks/{task_id}")
 
     spinner.stop()
     return _handle_api_response(response)
@@ -176,11 +362,17 @@ def _create_timelog_internal(task_id, hours, tracked_date, comment=""):
     tracked_date = _validate_date(tracked_date)
 
     data = {"hours": hours, "trackedDate": tracked_date, "comment": comment}
+    _throttle()
     response = requests.post(
         f"{WRIKE_API_URL}/tasks/{task_id}/timelogs", headers=_get_headers(), data=data
     )
 
-    return _handle_api_response(response)
+    timelog = _handle_api_response(response)
+    if timelog is None and is_provider_error(response):
+        raise ProviderError(
+            f"Wrike answered {response.status_code}", response.status_code
+        )
+    return timelog
 
 
 def create_timelogs_from_csv(file_path, dry_run=False):
@@ -191,24 +383,79 @@ def create_timelogs_from_csv(file_path, dry_run=False):
         create_time_logs_from_data(reader, dry_run)
 
 
-def create_time_logs_from_data(data, dry_run=False):
-    timelogs = []
-    for row in data:
-        date, hours, comment, task_key = row
-        if dry_run:
+def create_time_logs_from_data(
+    data, dry_run=False, coalesce=False, resume=False, journal_path=SYNC_JOURNAL_PATH
+):
+    """
+    Create a timelog for each row (date, hours, comment, task_key).
+
+    Every write is recorded in the checkpoint journal. With resume, rows already
+    written by a previous run are skipped. Repeated Wrike errors pause the run,
+    see checkpoint.CircuitBreaker.
+    """
+    data = list(data)
+    if coalesce:
+        row_count = len(data)
+        data = coalesce_timelog_rows(data)
+        print_plan(
+            row_count,
+            data,
+            lambda row: f"{row[0]} {row[3]} {row[1]}h {row[2]}",
+        )
+    if dry_run:
+        for date, hours, comment, task_key in data:
             print(
                 f"Dry Run - create_timelog(task_id={task_key}, hours={hours}, date={date}, comment={comment})"
             )
-        else:
-            timelog = create_timelog(
-                task_id=task_key, hours=hours, tracked_date=date, comment=comment
-            )
-            print(timelog)
-            timelogs.append(timelog)
+        return []
+
+    timelogs = []
+    breaker = CircuitBreaker()
+    with closing(checkpoint.connect(journal_path)) as connection:
+        keys = checkpoint.write_keys("wrike", data)
+        done = checkpoint.done_keys(connection, keys) if resume else set()
+        try:
+            for key, row in zip(keys, data):
+                if key in done:
+                    date, hours, _, task_key = row
+                    print(f"Skipped, already written: {task_key} {date} {hours}h")
+                    continue
+                timelogs.append(
+                    _create_journaled_timelog(connection, key, row, breaker)
+                )
+        except CircuitOpenError as e:
+            print(f"{e}, run again with resume=True to continue")
     return timelogs
 
 
+def _create_journaled_timelog(connection, key, row, breaker):
+    date, hours, comment, task_key = row
+    try:
+        # Bypass the cached create_timelog, every row here must reach Wrike
+        timelog = _create_timelog_internal(task_key, hours, date, comment)
+    except ValueError as e:
+        print(f"Invalid row {row}: {e}")
+        checkpoint.record(connection, key, "wrike", "failed", e)
+        return None
+    except (ProviderError, requests.ConnectionError, requests.Timeout) as e:
+        print(f"Wrike error for row {row}: {e}")
+        checkpoint.record(connection, key, "wrike", "failed", e)
+        breaker.record(False)
+        return None
+
+    print(timelog)
+    timelog_id = timelog["data"][0]["id"] if timelog and timelog.get("data") else ""
+    checkpoint.record(
+        connection, key, "wrike", "written" if timelog else "failed", timelog_id
+    )
+    # A rejected row only fails that row, it doesn't count towards the breaker
+    if timelog:
+        breaker.record(True)
+    return timelog
+
+
 def delete_timelog(timelog_id):
+    _throttle()
     response = requests.delete(
         f"{WRIKE_API_URL}/timelogs/{timelog_id}", headers=_get_headers()
     )
@@ -220,9 +467,7 @@ def get_specific_timelog_from_id(timelog_id):
 
 
 def _get_specific_timelog_from_id_internal(timelog_id):
-    response = requests.get(
-        f"{WRIKE_API_URL}/timelogs/{timelog_id}", headers=_get_headers()
-    )
+    response = _get(f"{WRIKE_API_URL}/timelogs/{timelog_id}")
     return _handle_api_response(response)
 
 
@@ -232,9 +477,7 @@ def list_timelogs(task_id):
 
 def _list_timelogs_internal(task_id):
     task_id = _validate_task_id(str(task_id))
-    response = requests.get(
-        f"{WRIKE_API_URL}/tasks/{task_id}/timelogs", headers=_get_headers()
-    )
+    response = _get(f"{WRIKE_API_URL}/tasks/{task_id}/timelogs")
     return _handle_api_response(response)
 
 
@@ -249,20 +492,100 @@ def get_all_timelogs(
     :param for_current_user: Boolean, if set to True will only fetch timelogs created by current user.
     :return: List of timelog records.
     """
-    data = fetch_data(
+    data = _get_timelogs(created_date_range, tracked_date_range, for_current_user)
+    if tsv:
+        return "\n".join(
+            _to_tsv_row(
+                (
+                    row["id"],
+                    row["hours"],
+                    row["createdDate"],
+                    row["trackedDate"],
+                    row["comment"],
+                )
+            )
+            for row in data
+        )
+    return data
+
+
+def _get_timelogs(created_date_range, tracked_date_range, for_current_user):
+    if not tracked_date_range:
+        return fetch_data(
+            _get_all_timelogs_internal,
+            created_date_range,
+            tracked_date_range,
+            for_current_user,
+        )
+    return _get_timelogs_by_month(
+        created_date_range, tracked_date_range, for_current_user
+    )
+
+
+def _get_timelogs_by_month(created_date_range, tracked_date_range, for_current_user):
+    """
+    Fetch timelogs one calendar month at a time, in parallel, and merge them.
+
+    Months that are over are cached permanently and shared by every range that
+    overlaps them. The current month is cached for WRIKE_OPEN_WINDOW_TTL seconds.
+    """
+    start_date, end_date = (to_date(date) for date in tracked_date_range)
+
+    with ThreadPoolExecutor(max_workers=WRIKE_MAX_WORKERS) as executor:
+        windows = list(
+            executor.map(
+                lambda window: _get_timelog_window(
+                    created_date_range, window, for_current_user
+                ),
+                month_windows(start_date, end_date),
+            )
+        )
+
+    timelogs = []
+    seen_ids = set()
+    for window_timelogs in windows:
+        for timelog in _in_date_range(window_timelogs, start_date, end_date):
+            if timelog.get("id") not in seen_ids:
+                seen_ids.add(timelog.get("id"))
+                timelogs.append(timelog)
+    return timelogs
+
+
+def _get_timelog_window(created_date_range, window, for_current_user):
+    if is_closed(window[1]):
+        return fetch_data(
+            _get_all_timelogs_internal, created_date_range, window, for_current_user
+        )
+    return fetch_recent_data(
+        WRIKE_OPEN_WINDOW_TTL,
         _get_all_timelogs_internal,
         created_date_range,
-        tracked_date_range,
+        window,
         for_current_user,
     )
-    if tsv:
-        rows = []
-        for row in data:
-            rows.append(
-                f"{row['id']}\t{row['hours']}\t{row['createdDate']}\t{row['trackedDate']}\t{row['comment']}"
-            )
-        return "\n".join(rows)
-    return data
+
+
+def _in_date_range(timelogs, start_date, end_date):
+    return (
+        timelog
+        for timelog in timelogs
+        if start_date <= to_date(timelog["trackedDate"][:10]) <= end_date
+    )
+
+
+def _iter_timelogs(created_date_range, tracked_date_range, for_current_user):
+    """Yield timelogs with a single month in memory at a time."""
+    if not tracked_date_range:
+        yield from _get_timelogs(created_date_range, None, for_current_user)
+        return
+
+    start_date, end_date = (to_date(date) for date in tracked_date_range)
+    for window in month_windows(start_date, end_date):
+        yield from _in_date_range(
+            _get_timelog_window(created_date_range, window, for_current_user),
+            start_date,
+            end_date,
+        )
 
 
 def _get_all_timelogs_internal(
@@ -287,9 +610,7 @@ def _get_all_timelogs_internal(
     if for_current_user:
         params["me"] = True
 
-    response = requests.get(
-        f"{WRIKE_API_URL}/timelogs", headers=_get_headers(), params=params
-    )
+    response = _get(f"{WRIKE_API_URL}/timelogs", params=params)
     data = _handle_api_response(response)
     return data.get("data", []) if data else []
 
@@ -305,42 +626,218 @@ def get_all_timelogs_with_task_data(
     :param for_current_user: Boolean, if set to True will only fetch timelogs created by current user.
     :return: List of timelog records with their associated task data.
     """
-    timelogs = fetch_data(
-        _get_all_timelogs_internal,
-        created_date_range,
-        tracked_date_range,
-        for_current_user,
-    )
+    return [
+        timelog
+        for chunk in iter_timelogs_with_task_data(
+            created_date_range, tracked_date_range, for_current_user
+        )
+        for timelog in chunk
+    ]
 
-    # Iterate through the timelogs and fetch task data
-    enriched_timelogs = []
-    for timelog in timelogs:
-        task_id = timelog.get("taskId")
-        task_data_response = fetch_data(_get_task_by_id_internal, task_id)
-
-        # Extract task data
-        task_data = (
-            task_data_response["data"][0]
-            if task_data_response
-            and "data" in task_data_response
-            and len(task_data_response["data"]) > 0
-            else None
+
+def iter_timelogs_with_task_data(
+    created_date_range=None,
+    tracked_date_range=None,
+    for_current_user=True,
+    chunk_size=500,
+    task_cache_size=1024,
+):
+    """
+    Yield timelog records with their associated task data, in lists of chunk_size.
+
+    Timelogs are read one month at a time and task data is fetched up to 100
+    tasks per request, keeping only the task_cache_size most recently used tasks
+    in memory. Memory use doesn't grow with the size of the date range.
+
+    :param created_date_range: Optional tuple with start and end dates for creation date filtering.
+    :param tracked_date_range: Optional tuple with start and end dates for tracking date filtering.
+    :param for_current_user: Boolean, if set to True will only fetch timelogs created by current user.
+    :param chunk_size: Number of timelogs in each yielded list.
+    :param task_cache_size: Maximum number of tasks kept in memory.
+    """
+    tasks = OrderedDict()
+
+    def enrich(chunk):
+        missing_ids = list(
+            dict.fromkeys(
+                timelog.get("taskId")
+                for timelog in chunk
+                if timelog.get("taskId") is not None
+                and timelog.get("taskId") not in tasks
+            )
         )
+        tasks.update(_get_tasks_by_ids(missing_ids))
+
+        enriched_timelogs = []
+        for timelog in chunk:
+            task_data = tasks.get(timelog.get("taskId"))
+            if timelog.get("taskId") in tasks:
+                tasks.move_to_end(timelog.get("taskId"))
+
+            # Combine timelog and task data
+            enriched_timelogs.append(
+                {
+                    "hours": timelog.get("hours"),
+                    "createdDate": timelog.get("createdDate"),
+                    "updatedDate": timelog.get("updatedDate"),
+                    "trackedDate": timelog.get("trackedDate"),
+                    "comment": timelog.get("comment"),
+                    "permalink": task_data.get("permalink") if task_data else None,
+                    "task_name": (
+                        task_data.get("title") if task_data else "Unknown Task Name"
+                    ),
+                }
+            )
 
-        # Combine timelog and task data
-        enriched_timelog = {
-            "hours": timelog.get("hours"),
-            "createdDate": timelog.get("createdDate"),
-            "updatedDate": timelog.get("updatedDate"),
-            "trackedDate": timelog.get("trackedDate"),
-            "comment": timelog.get("comment"),
-            "permalink": task_data.get("permalink") if task_data else None,
-            "task_name": task_data.get("title") if task_data else "Unknown Task Name",
-        }
-        enriched_timelogs.append(enriched_timelog)
+        while len(tasks) > task_cache_size:
+            tasks.popitem(last=False)
+        return enriched_timelogs
 
-    return enriched_timelogs
+    chunk = []
+    for timelog in _iter_timelogs(
+        created_date_range, tracked_date_range, for_current_user
+    ):
+        chunk.append(timelog)
+        if len(chunk) >= chunk_size:
+            yield enrich(chunk)
+            chunk = []
+    if chunk:
+        yield enrich(chunk)
+
+
+def _get_tasks_by_ids(task_ids):
+    """
+    Return a dict of ID to task (None if not found), from the disk cache first.
+
+    Tasks are cached under the same key as get_task_by_id, only the ones missing
+    from the cache are fetched, TASKS_PER_REQUEST at a time.
+    """
+    tasks = {}
+    missing_ids = []
+    # One SQLite transaction per batch rather than per task
+    with cache.transact():
+        for task_id in task_ids:
+            response = cache.get(_cache_key(_get_task_by_id_internal, (task_id,), {}))
+            if response and response.get("data"):
+                tasks[task_id] = response["data"][0]
+            else:
+                missing_ids.append(task_id)
+
+    for start in range(0, len(missing_ids), TASKS_PER_REQUEST):
+        fetched = _get_tasks_by_ids_internal(
+            missing_ids[start : start + TASKS_PER_REQUEST]
+        )
+        with cache.transact():
+            for task_id, task in fetched.items():
+                if task is not None:
+                    cache.set(
+                        _cache_key(_get_task_by_id_internal, (task_id,), {}),
+                        {"data": [task]},
+                    )
+        tasks.update(fetched)
+    return tasks
+
+
+def _get_tasks_by_ids_internal(task_ids):
+    """Fetch up to TASKS_PER_REQUEST tasks in one request, returns a dict of ID to task."""
+    task_ids = [
+        _validate_task_id(str(task_id)) for task_id in task_ids if task_id is not None
+    ]
+    if not task_ids:
+        return {}
+    response = _get(f"{WRIKE_API_URL}/tasks/{','.join(task_ids)}", conditional=False)
+    data = _handle_api_response(response)
+    found = {task["id"]: task for task in data.get("data", [])} if data else {}
+    # Remember missing tasks too, so they aren't requested for every chunk
+    return {task_id: found.get(task_id) for task_id in task_ids}
 
 
 def delete_cache():
     cache.clear()
+
+
+def _cached_keys(func):
+    for key in list(cache.iterkeys()):
+        if isinstance(key, tuple) and key and key[0] == func.__name__:
+            yield key
+
+
+def _update_cached(key, update):
+    """Replace a cached value with update(value), keeping its remaining time to live."""
+    # The webhook server handles events in threads, don't let two updates interleave
+    with cache.transact():
+        value, expire_time = cache.get(key, default=None, expire_time=True)
+        if value is None:
+            return
+        expire = None if expire_time is None else max(expire_time - time.time(), 0)
+        cache.set(key, update(value), expire=expire)
+
+
+def invalidate_task(task_id, title=None, deleted=False):
+    """
+    Drop or patch the cache entries of a single task.
+
+    :param task_id: ID of the task that changed.
+    :param title: New title, patched into the cached task lists instead of dropping them.
+    :param deleted: The task was deleted, remove it from the cached task lists.
+    """
+    cache.delete(_cache_key(_get_task_by_id_internal, (task_id,), {}))
+    cache.delete(_cache_key(_list_timelogs_internal, (task_id,), {}))
+
+    for key in _cached_keys(_get_all_tasks_internal):
+        if deleted:
+            _update_cached(key, lambda tasks: [t for t in tasks if t[0] != task_id])
+        elif title is not None:
+            _update_cached(
+                key,
+                lambda tasks: [
+                    (t[0], title if t[0] == task_id else t[1]) for t in tasks
+                ],
+            )
+        else:
+            # A new or moved task, we can't tell which folders it belongs to
+            cache.delete(key)
+
+
+def invalidate_timelog(timelog_id, task_id=None, removed=False):
+    """
+    Patch a created, changed or removed timelog into the cached monthly timelog lists.
+
+    The timelog is removed from every cached list, then unless it was removed,
+    fetched again and added to the lists of the month it is tracked in. Lists
+    it may or may not belong to (no tracked window, a created date range, a
+    failed fetch) are dropped rather than left without it.
+    """
+    cache.delete(_cache_key(_get_specific_timelog_from_id_internal, (timelog_id,), {}))
+    if task_id:
+        cache.delete(_cache_key(_list_timelogs_internal, (task_id,), {}))
+
+    timelog = None
+    if not removed:
+        response = _get_specific_timelog_from_id_internal(timelog_id)
+        if response and response.get("data"):
+            timelog = response["data"][0]
+
+    def without(logs):
+        return [log for log in logs if log.get("id") != timelog_id]
+
+    for key in _cached_keys(_get_all_timelogs_internal):
+        created_date_range, window, for_current_user = key[1]
+        if removed:
+            _update_cached(key, without)
+        elif not timelog or not window or created_date_range:
+            # We can't tell if the timelog belongs to this list
+            cache.delete(key)
+        elif for_current_user and key[-1] != _user_scope():
+            # The list of another user of the cache, we don't know their user ID
+            cache.delete(key)
+        elif (
+            for_current_user and timelog.get("userId") != get_connected_user_id()
+        ) or not window[0] <= to_date(timelog["trackedDate"][:10]) <= window[1]:
+            _update_cached(key, without)
+        else:
+            _update_cached(key, lambda logs: [*without(logs), timelog])
+
+
+def invalidate_folders():
+    cache.delete(_cache_key(_get_folder_tree_internal, (), {}))
@@ -0,0 +1,51 @@
+from contextlib import closing
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from src import checkpoint
+from src.checkpoint import CircuitBreaker, CircuitOpenError, ProviderError
+
+
+def test_write_keys_depend_on_content_and_occurrence():
+    rows = [["2024-10-24", "1", "", "T1"], ["2024-10-24", "1", "", "T1"]]
+
+    keys = checkpoint.write_keys("wrike", rows)
+
+    assert len(set(keys)) == 2
+    assert checkpoint.write_keys("wrike", rows[::-1]) == keys
+    assert checkpoint.write_keys("jira:Acme", rows) != keys
+
+
+def test_done_keys_only_returns_written_keys(tmp_path):
+    with closing(checkpoint.connect(str(tmp_path / "journal.sqlite3"))) as connection:
+        checkpoint.record(connection, "a", "wrike", "written", "TL1")
+        checkpoint.record(connection, "b", "wrike", "failed", "Bad Request")
+
+        assert checkpoint.done_keys(connection, ["a", "b", "c"]) == {"a"}
+
+
+@patch("src.checkpoint.time.sleep")
+def test_circuit_breaker_pauses_then_opens(mock_sleep):
+    breaker = CircuitBreaker(threshold=2, pause=10, max_pauses=2)
+
+    for _ in range(4):
+        breaker.record(False)
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [10, 20]
+
+    breaker.record(False)
+    with pytest.raises(CircuitOpenError):
+        breaker.record(False)
+
+    breaker.record(True)
+    breaker.record(False)
+    assert mock_sleep.call_count == 2
+
+
+def test_is_provider_error_only_blames_rate_limits_server_errors_and_connections():
+    assert checkpoint.is_provider_error(ProviderError("Too Many Requests", 429))
+    assert checkpoint.is_provider_error(ProviderError("Bad Gateway", 502))
+    assert checkpoint.is_provider_error(requests.ConnectionError())
+    assert not checkpoint.is_provider_error(ProviderError("Bad Request", 400))
+    assert not checkpoint.is_provider_error(ValueError("Invalid date"))
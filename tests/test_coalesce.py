@@ -0,0 +1,42 @@
+import datetime
+
+from src.coalesce import coalesce_timelog_rows, coalesce_worklogs
+
+
+def test_coalesce_timelog_rows_merges_same_task_and_date():
+    rows = [
+        ["2024-10-24", "1.5", "Review", "T1"],
+        ["2024-10-24", "0.25", "Fix", "T2"],
+        ["2024-10-24", "0.5", "Review", "T1"],
+        ["2024-10-25", "1", "Review", "T1"],
+        ["2024-10-24", "oops", "Bad", "T1"],
+    ]
+
+    assert coalesce_timelog_rows(rows) == [
+        ["2024-10-24", 2.0, "Review", "T1"],
+        ["2024-10-24", 0.25, "Fix", "T2"],
+        ["2024-10-25", 1.0, "Review", "T1"],
+        ["2024-10-24", "oops", "Bad", "T1"],
+    ]
+
+
+def _worklog(task_id, hour, minute, seconds, comment=""):
+    start = datetime.datetime(2024, 10, 24, hour, minute)
+    return {"task_id": task_id, "start": start, "seconds": seconds, "comment": comment}
+
+
+def test_coalesce_worklogs_merges_contiguous_worklogs_only():
+    worklogs = [
+        _worklog("ABC-1", 10, 0, 1800, "Second"),
+        _worklog("ABC-1", 9, 0, 3600, "First"),
+        _worklog("ABC-1", 14, 0, 600, "Later"),
+        _worklog("ABC-2", 10, 30, 600),
+    ]
+
+    assert coalesce_worklogs(worklogs) == [
+        _worklog("ABC-1", 9, 0, 5400, "First; Second"),
+        _worklog("ABC-1", 14, 0, 600, "Later"),
+        _worklog("ABC-2", 10, 30, 600),
+    ]
+    # The input is left untouched
+    assert worklogs[1]["seconds"] == 3600
@@ -0,0 +1,169 @@
+import datetime
+from unittest.mock import MagicMock, patch
+
+from jira.exceptions import JIRAError
+
+from src.daemon import MAX_PUSH_ATTEMPTS, load_state, poll_once, save_state
+from src.entries import normalize_toggl_entry
+from src.jira import JiraAPI
+from src.targets import JiraTarget, TargetError
+
+today = datetime.date.today().isoformat()
+
+
+class FakeTarget:
+    name = "fake"
+
+    def __init__(self):
+        self.created = []
+        self.deleted = []
+        self.fail_for = set()
+        self.fail_delete = False
+
+    def create(self, entry):
+        if entry["task_key"] in self.fail_for:
+            raise TargetError("boom")
+        self.created.append(entry["id"])
+        return f"log-{len(self.created)}"
+
+    def delete(self, task_key, target_id):
+        if self.fail_delete:
+            return False
+        self.deleted.append(target_id)
+        return True
+
+
+def _entry(entry_id, description, duration=3600):
+    return normalize_toggl_entry(
+        {
+            "id": entry_id,
+            "description": description,
+            "start": f"{today}T15:00:00+00:00",
+            "duration": duration,
+        }
+    )
+
+
+@patch("src.daemon.fetch_entries")
+def test_poll_once_pushes_only_new_and_changed_entries(mock_fetch_entries):
+    target = FakeTarget()
+    state = {"watermarks": {}, "pushed": {}}
+
+    mock_fetch_entries.return_value = [_entry(1, "ABC-1 Work"), _entry(2, "")]
+    summary = poll_once("toggl", [target], state)
+
+    assert summary["new"] == 1
+    assert summary["skipped"] == 1
+    assert state["watermarks"]["toggl"] == today
+
+    mock_fetch_entries.return_value = [
+        _entry(1, "ABC-1 Work", duration=7200),
+        _entry(3, "ABC-3"),
+    ]
+    summary = poll_once("toggl", [target], state)
+
+    assert summary == {
+        "new": 1,
+        "changed": 1,
+        "unchanged": 0,
+        "skipped": 0,
+        "parked": 0,
+        "failed": 0,
+    }
+    assert target.deleted == ["log-1"]
+    assert target.created == ["1", "1", "3"]
+
+    summary = poll_once("toggl", [target], state)
+    assert summary["unchanged"] == 2
+
+
+@patch("src.daemon.fetch_entries")
+def test_poll_once_does_not_record_failed_entries(mock_fetch_entries):
+    target = FakeTarget()
+    target.fail_for = {"ABC-1"}
+    state = {"watermarks": {}, "pushed": {}}
+    mock_fetch_entries.return_value = [_entry(1, "ABC-1 Work")]
+
+    summary = poll_once("toggl", [target], state)
+
+    assert summary["failed"] == 1
+    assert state["pushed"] == {}
+
+
+@patch("src.daemon.fetch_entries")
+def test_poll_once_keeps_the_previous_push_when_delete_fails(mock_fetch_entries):
+    target = FakeTarget()
+    state = {"watermarks": {}, "pushed": {}}
+    mock_fetch_entries.return_value = [_entry(1, "ABC-1 Work")]
+    poll_once("toggl", [target], state)
+
+    target.fail_delete = True
+    mock_fetch_entries.return_value = [_entry(1, "ABC-1 Work", duration=7200)]
+    summary = poll_once("toggl", [target], state)
+
+    assert summary["failed"] == 1
+    assert target.created == ["1"]
+    assert state["pushed"]["toggl:1:fake"]["target_id"] == "log-1"
+
+
+@patch("src.daemon.fetch_entries")
+def test_poll_once_parks_entries_that_keep_failing(mock_fetch_entries):
+    target = FakeTarget()
+    target.fail_for = {"ABC-1"}
+    yesterday = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    state = {"watermarks": {"toggl": yesterday}, "pushed": {}}
+    mock_fetch_entries.return_value = [_entry(1, "ABC-1 Work"), _entry(2, "ABC-2")]
+
+    for _ in range(MAX_PUSH_ATTEMPTS - 1):
+        poll_once("toggl", [target], state)
+        # Failed entries are retried from their date
+        assert state["watermarks"]["toggl"] == today
+    summary = poll_once("toggl", [target], state)
+    assert summary["failed"] == 1
+    assert state["parked"]["toggl:1:fake"]["attempts"] == MAX_PUSH_ATTEMPTS
+
+    summary = poll_once("toggl", [target], state)
+    assert summary["parked"] == 1
+    assert summary["failed"] == 0
+
+    # An edited entry is tried again
+    target.fail_for = set()
+    mock_fetch_entries.return_value = [_entry(1, "ABC-1 Fixed")]
+    summary = poll_once("toggl", [target], state)
+    assert summary["new"] == 1
+    assert state["parked"] == {}
+
+
+@patch("src.daemon.fetch_entries")
+def test_poll_once_retries_entries_while_jira_is_unavailable(mock_fetch_entries):
+    target = JiraTarget.__new__(JiraTarget)
+    target.api = JiraAPI.__new__(JiraAPI)
+    target.api.client = MagicMock()
+    target.api.get_issue_key = lambda task_id: task_id
+    target.api.client.add_worklog.side_effect = JIRAError(
+        status_code=503, text="Service Unavailable"
+    )
+    yesterday = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    state = {"watermarks": {"toggl": yesterday}, "pushed": {}}
+    mock_fetch_entries.return_value = [_entry(1, "ABC-1 Work"), _entry(2, "ABC-2")]
+
+    for _ in range(MAX_PUSH_ATTEMPTS + 1):
+        summary = poll_once("toggl", [target], state)
+        assert summary["failed"] == 2
+        # Held at the failed entries, which are never parked
+        assert state["watermarks"]["toggl"] == today
+        assert state["parked"] == {}
+
+    target.api.client.add_worklog.side_effect = None
+    target.api.client.add_worklog.return_value.raw = {"id": "w1"}
+    summary = poll_once("toggl", [target], state)
+    assert summary["new"] == 2
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / "state.json")
+    assert load_state(path) == {"watermarks": {}, "pushed": {}, "parked": {}}
+
+    save_state({"watermarks": {"toggl": today}, "pushed": {}}, path)
+
+    assert load_state(path)["watermarks"] == {"toggl": today}
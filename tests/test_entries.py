@@ -0,0 +1,79 @@
+from src.entries import (
+    fingerprint,
+    normalize_clockify_entry,
+    normalize_toggl_entry,
+    task_key_from_description,
+)
+
+
+def test_task_key_from_description():
+    assert task_key_from_description("ABC-123 Review pull request") == "ABC-123"
+    assert task_key_from_description("") is None
+    assert task_key_from_description(None) is None
+
+
+def test_normalize_toggl_entry():
+    entry = normalize_toggl_entry(
+        {
+            "id": 1,
+            "description": "ABC-123 Review pull request",
+            "start": "2023-06-01T18:00:00+00:00",
+            "duration": 5400,
+            "pid": 42,
+        }
+    )
+
+    assert entry["id"] == "1"
+    assert entry["task_key"] == "ABC-123"
+    assert entry["comment"] == "Review pull request"
+    assert entry["start"].isoformat() == "2023-06-01T14:00:00-04:00"
+    assert entry["seconds"] == 5400
+    assert entry["project_id"] == 42
+
+
+def test_normalize_toggl_entry_skips_running_entries():
+    assert (
+        normalize_toggl_entry(
+            {"id": 1, "start": "2023-06-01T18:00:00Z", "duration": -1}
+        )
+        is None
+    )
+
+
+def test_normalize_clockify_entry():
+    entry = normalize_clockify_entry(
+        {
+            "id": "c1",
+            "description": "ABC-7",
+            "projectId": "p1",
+            "timeInterval": {
+                "start": "2023-06-01T18:00:00Z",
+                "end": "2023-06-01T19:30:00Z",
+            },
+        }
+    )
+
+    assert entry["task_key"] == "ABC-7"
+    assert entry["comment"] == ""
+    assert entry["seconds"] == 5400
+    assert (
+        normalize_clockify_entry(
+            {"id": "c2", "timeInterval": {"start": "2023-06-01T18:00:00Z"}}
+        )
+        is None
+    )
+
+
+def test_fingerprint_changes_with_duration():
+    entry = normalize_toggl_entry(
+        {
+            "id": 1,
+            "description": "ABC-1",
+            "start": "2023-06-01T18:00:00Z",
+            "duration": 60,
+        }
+    )
+    changed = dict(entry, seconds=120)
+
+    assert fingerprint(entry) == fingerprint(dict(entry))
+    assert fingerprint(entry) != fingerprint(changed)
@@ -0,0 +1,39 @@
+import json
+import logging
+from unittest.mock import MagicMock
+
+from src.events import JsonFormatter, redact_headers
+from src.wrike import _handle_api_response
+
+
+def test_redact_headers():
+    assert redact_headers(
+        {"Authorization": "Bearer secret", "x-api-key": "key", "Accept": "*/*"}
+    ) == {"Authorization": "***", "x-api-key": "***", "Accept": "*/*"}
+    assert redact_headers(None) == {}
+
+
+def test_json_formatter_keeps_extra_fields():
+    record = logging.makeLogRecord(
+        {"name": "wrike", "levelname": "ERROR", "msg": "Failed %s", "args": ("write",)}
+    )
+    record.status_code = 429
+
+    event = json.loads(JsonFormatter().format(record))
+
+    assert event["message"] == "Failed write"
+    assert event["logger"] == "wrike"
+    assert event["status_code"] == 429
+
+
+def test_failed_wrike_request_is_logged_without_credentials(caplog):
+    response = MagicMock()
+    response.status_code = 401
+    response.text = "Unauthorized"
+    response.request.headers = {"Authorization": "Bearer secret-token"}
+
+    with caplog.at_level(logging.ERROR, logger="wrike"):
+        assert _handle_api_response(response) is None
+
+    assert caplog.records[0].request_headers == {"Authorization": "***"}
+    assert "secret-token" not in caplog.text
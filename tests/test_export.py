@@ -0,0 +1,119 @@
+import csv
+import datetime
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.export import export_tasks, export_timelogs, write_records
+from src.wrike import _to_tsv_row
+
+mock_timelogs = [
+    {
+        "id": "log1",
+        "taskId": "task1",
+        "hours": 1.5,
+        "trackedDate": "2023-01-10",
+        "comment": "multi\tline\ncomment",
+    },
+    {"id": "log2", "taskId": "task2", "hours": 2, "trackedDate": "2023-01-11"},
+]
+
+
+def test_to_tsv_row_escapes_separators():
+    assert _to_tsv_row(("a\tb", "c\nd", 1)) == "a\\tb\tc\\nd\t1"
+
+
+def test_write_records_csv_round_trip(tmp_path):
+    path = tmp_path / "out.csv"
+    count = write_records(
+        iter(mock_timelogs), str(path), ["id", "comment"], batch_size=1
+    )
+
+    assert count == 2
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["id", "comment"]
+    assert rows[1] == ["log1", "multi\tline\ncomment"]
+    assert rows[2] == ["log2", ""]
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_write_records_arrow_and_parquet_round_trip(fmt, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / f"out.{fmt}"
+
+    count = write_records(
+        iter(mock_timelogs), str(path), ["id", "hours"], fmt=fmt, batch_size=1
+    )
+
+    if fmt == "arrow":
+        with pa.OSFile(str(path), "rb") as source:
+            table = pa.ipc.open_file(source).read_all()
+    else:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(str(path))
+    assert count == 2
+    assert table.to_pylist() == [
+        {"id": "log1", "hours": "1.5"},
+        {"id": "log2", "hours": "2"},
+    ]
+
+
+def test_write_records_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        write_records([], str(tmp_path / "out.xls"), ["id"], fmt="xls")
+
+
+@patch("src.export.wrike.get_all_timelogs")
+def test_export_timelogs_skips_closed_months_already_exported(
+    mock_get_all_timelogs, tmp_path
+):
+    mock_get_all_timelogs.return_value = mock_timelogs
+
+    written = export_timelogs("2023-01-15", "2023-02-10", output_dir=str(tmp_path))
+
+    assert written == {"2023-01": 2, "2023-02": 2}
+    mock_get_all_timelogs.assert_any_call(
+        tracked_date_range=(datetime.date(2023, 1, 1), datetime.date(2023, 1, 31)),
+        for_current_user=True,
+    )
+    assert os.path.exists(tmp_path / "timelogs" / "month=2023-01" / "part.csv")
+
+    mock_get_all_timelogs.reset_mock()
+    written = export_timelogs("2023-01-01", "2023-03-31", output_dir=str(tmp_path))
+
+    assert written == {"2023-03": 2}
+    assert mock_get_all_timelogs.call_count == 1
+
+
+@patch("src.export.wrike.get_all_timelogs")
+def test_export_timelogs_keeps_months_apart_per_user_filter(
+    mock_get_all_timelogs, tmp_path
+):
+    mock_get_all_timelogs.return_value = mock_timelogs
+
+    export_timelogs("2023-01-01", "2023-01-31", output_dir=str(tmp_path))
+    written = export_timelogs(
+        "2023-01-01", "2023-01-31", output_dir=str(tmp_path), for_current_user=False
+    )
+
+    assert written == {"2023-01": 2}
+    assert mock_get_all_timelogs.call_args.kwargs["for_current_user"] is False
+    assert os.path.exists(
+        tmp_path / "timelogs_all_users" / "month=2023-01" / "part.csv"
+    )
+
+
+@patch("src.export.wrike.iter_task_pages")
+def test_export_tasks_streams_pages(mock_iter_task_pages, tmp_path):
+    mock_iter_task_pages.return_value = iter([[("t1", "Task 1")], [("t2", "Task 2")]])
+
+    assert export_tasks(output_dir=str(tmp_path)) == 2
+    with open(tmp_path / "tasks.csv", newline="", encoding="utf-8") as file:
+        assert list(csv.reader(file)) == [
+            ["id", "title"],
+            ["t1", "Task 1"],
+            ["t2", "Task 2"],
+        ]
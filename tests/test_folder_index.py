@@ -0,0 +1,33 @@
+from src.folder_index import FolderIndex
+
+mock_folders = [
+    {"id": "root", "title": "Root", "childIds": ["clients", "internal"]},
+    {"id": "clients", "title": "Clients", "childIds": ["acme"]},
+    {"id": "acme", "title": "Acme", "childIds": [], "project": {"status": "Green"}},
+    {"id": "internal", "title": "Internal", "childIds": ["acme"]},
+]
+
+
+def test_list_folders_and_projects():
+    index = FolderIndex(mock_folders)
+
+    assert ("clients", "Clients") in index.list_folders()
+    assert len(index.list_folders()) == 4
+    assert index.list_projects() == [("acme", "Acme")]
+
+
+def test_ancestors_follow_every_parent():
+    index = FolderIndex(mock_folders)
+
+    assert index.ancestors("acme") == {"clients", "internal", "root"}
+    assert index.ancestors("root") == set()
+
+
+def test_minimal_roots_drops_nested_and_duplicate_folders():
+    index = FolderIndex(mock_folders)
+
+    assert index.minimal_roots(["acme", "clients", "acme", "unknown"]) == [
+        "clients",
+        "unknown",
+    ]
+    assert index.minimal_roots(["acme", "internal", "root"]) == ["root"]
@@ -0,0 +1,270 @@
+import threading
+from contextlib import closing
+from unittest.mock import MagicMock, patch
+
+import pytest
+from diskcache import Cache
+from googleapiclient.errors import HttpError
+
+from src import google_sheets
+from src.google_sheets import _a1_range, read_sheets
+
+
+@pytest.fixture(autouse=True)
+def sheet_cache(tmp_path, monkeypatch):
+    with Cache(str(tmp_path / "sheets")) as cache:
+        monkeypatch.setattr(google_sheets, "sheet_cache", cache)
+        yield cache
+
+
+def _service(value_ranges):
+    service = MagicMock()
+    batch_get = service.spreadsheets.return_value.values.return_value.batchGet
+    batch_get.return_value.execute.return_value = {"valueRanges": value_ranges}
+    return service, batch_get
+
+
+def test_a1_range_quotes_titles():
+    assert _a1_range("Jira Sync O'Brien", "A:E") == "'Jira Sync O''Brien'!A:E"
+
+
+@patch("src.google_sheets.get_spreadsheet_version")
+def test_read_sheets_skips_download_when_version_is_unchanged(mock_version):
+    service, batch_get = _service([{"values": [["a"]]}, {"values": [["b"]]}])
+    mock_version.return_value = "42"
+
+    values = read_sheets(["One", "Two"], "sheet-id", "A:E", service=service)
+
+    assert values == {"One": [["a"]], "Two": [["b"]]}
+    batch_get.assert_called_once_with(
+        spreadsheetId="sheet-id",
+        ranges=["'One'!A:E", "'Two'!A:E"],
+        fields="valueRanges.values",
+    )
+
+    values = read_sheets(["One", "Two"], "sheet-id", "A:E", service=service)
+
+    assert values == {"One": [["a"]], "Two": [["b"]]}
+    assert batch_get.call_count == 1
+
+    mock_version.return_value = "43"
+    service, batch_get = _service([{"values": [["c"]]}])
+    values = read_sheets(["One"], "sheet-id", "A:E", service=service)
+
+    assert values == {"One": [["c"]]}
+
+
+@patch("src.google_sheets.get_spreadsheet_version")
+def test_read_sheets_without_version_always_downloads(mock_version):
+    mock_version.return_value = None
+    service, batch_get = _service([{}])
+
+    assert read_sheets(["Empty"], "sheet-id", service=service) == {"Empty": []}
+    assert read_sheets(["Empty"], "sheet-id", service=service) == {"Empty": []}
+    assert batch_get.call_count == 2
+
+
+@patch("src.google_sheets.build")
+@patch("src.google_sheets._load_credentials")
+def test_get_service_builds_each_service_once(mock_load_credentials, mock_build):
+    google_sheets._services.clear()
+    google_sheets._credentials = None
+    mock_build.side_effect = lambda api, version, **kwargs: f"{api}-{version}"
+
+    threads = [
+        threading.Thread(target=google_sheets.get_service, args=("sheets", "v4"))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert google_sheets.login_to_google_sheets() == "sheets-v4"
+    assert google_sheets.get_service("drive", "v3") == "drive-v3"
+    assert mock_build.call_count == 2
+    assert mock_load_credentials.call_count == 1
+    assert mock_build.call_args.kwargs["static_discovery"] is True
+
+    google_sheets._services.clear()
+    google_sheets._credentials = None
+
+
+def test_plan_batch_sync_expands_globs():
+    titles = [
+        "wrike sync 2024-01-02",
+        "wrike sync 2024-01-03",
+        "Jira Sync Acme",
+        "Notes",
+    ]
+
+    jobs = google_sheets.plan_batch_sync(
+        [
+            "wrike:wrike sync 2024-*",
+            "jira:Acme:Jira Sync Acme",
+            "jira:Acme:Missing",
+            "jira:Acme:Nothing *",
+        ],
+        titles,
+    )
+
+    assert jobs == [
+        ("wrike", None, "wrike sync 2024-01-02"),
+        ("wrike", None, "wrike sync 2024-01-03"),
+        ("jira", "Acme", "Jira Sync Acme"),
+        ("jira", "Acme", "Missing"),
+    ]
+
+
+def test_plan_batch_sync_rejects_invalid_targets():
+    with pytest.raises(ValueError):
+        google_sheets.plan_batch_sync(["jira:Jira Sync Acme"], [])
+
+
+@patch("src.google_sheets.read_sheets")
+@patch("src.google_sheets.sync_sheet_to_jira")
+@patch("src.google_sheets.sync_sheet_to_wrike")
+def test_run_sync_jobs_collects_results(
+    mock_sync_sheet_to_wrike, mock_sync_sheet_to_jira, mock_read_sheets
+):
+    jira_rows = [["Date", "Start", "Hours", "Task", "Comment"]]
+    mock_read_sheets.return_value = {
+        "wrike sync": [["Date", "Hours", "Comment", "Task"]],
+        "Jira Sync Acme": jira_rows,
+    }
+    mock_sync_sheet_to_wrike.return_value = {"rows": 2, "written": 2, "failed": 0}
+    mock_sync_sheet_to_jira.return_value = {"rows": 3, "written": 1, "failed": 2}
+
+    results = google_sheets.run_sync_jobs(
+        [("wrike", None, "wrike sync"), ("jira", "Acme", "Jira Sync Acme")],
+        spreadsheet_id="sheet-id",
+        dry_run=True,
+    )
+
+    assert [(r["target"], r["sheet"], r["written"]) for r in results] == [
+        ("wrike", "wrike sync", 2),
+        ("jira:Acme", "Jira Sync Acme", 1),
+    ]
+    mock_read_sheets.assert_called_once_with(
+        ["wrike sync", "Jira Sync Acme"], "sheet-id", google_sheets.JIRA_SYNC_COLUMNS
+    )
+    mock_sync_sheet_to_jira.assert_called_once_with(
+        "Jira Sync Acme", "Acme", "sheet-id", True, False, False, values=jira_rows
+    )
+
+
+@patch("src.google_sheets.read_sheets")
+@patch("src.google_sheets.sync_sheet_to_jira")
+@patch("src.google_sheets.sync_sheet_to_wrike")
+def test_run_sync_jobs_reports_failing_jobs(
+    mock_sync_sheet_to_wrike, mock_sync_sheet_to_jira, mock_read_sheets
+):
+    # A missing sheet fails the batchGet, the jobs read their own sheet
+    mock_read_sheets.side_effect = HttpError(
+        MagicMock(status=400), b"Unable to parse range"
+    )
+    mock_sync_sheet_to_wrike.return_value = {"rows": 2, "written": 2, "failed": 0}
+    mock_sync_sheet_to_jira.side_effect = ValueError("No JIRA instance found")
+
+    results = google_sheets.run_sync_jobs(
+        [("jira", "Acme", "Jira Sync Acme"), ("wrike", None, "wrike sync")]
+    )
+
+    assert results[0]["error"] == "No JIRA instance found"
+    assert results[1]["written"] == 2
+    assert mock_sync_sheet_to_wrike.call_args.kwargs["values"] is None
+
+
+@patch("src.google_sheets.fetch_data_from_sheet")
+def test_sync_sheet_to_wrike_uses_given_values(mock_fetch_data_from_sheet):
+    summary = google_sheets.sync_sheet_to_wrike(
+        "wrike sync",
+        dry_run=True,
+        values=[["Date", "Hours", "Comment", "Task"]],
+    )
+
+    assert summary == {"rows": 0, "written": 0, "failed": 0}
+    mock_fetch_data_from_sheet.assert_not_called()
+
+
+@patch("src.google_sheets.login_to_google_sheets")
+@patch("src.google_sheets.task_index.wrike_index")
+def test_publish_task_catalog_adds_a_dropdown(mock_wrike_index, mock_login):
+    mock_wrike_index.return_value = google_sheets.task_index.TaskIndex(
+        [("T1", "Task one"), ("T2", "Task two")]
+    )
+    service = mock_login.return_value
+    service.spreadsheets.return_value.get.return_value.execute.return_value = {
+        "sheets": [
+            {"properties": {"title": "Task catalog", "sheetId": 1}},
+            {"properties": {"title": "wrike sync", "sheetId": 2}},
+        ]
+    }
+
+    assert google_sheets.publish_task_catalog("wrike sync") == 2
+
+    update = service.spreadsheets.return_value.values.return_value.update
+    assert update.call_args.kwargs["body"] == {
+        "values": [["T1 Task one"], ["T2 Task two"]]
+    }
+    batch_update = service.spreadsheets.return_value.batchUpdate
+    request = batch_update.call_args.kwargs["body"]["requests"][0]["setDataValidation"]
+    assert request["range"] == {
+        "sheetId": 2,
+        "startRowIndex": 1,
+        "startColumnIndex": 3,
+        "endColumnIndex": 4,
+    }
+    assert request["rule"]["condition"] == {
+        "type": "ONE_OF_RANGE",
+        "values": [{"userEnteredValue": "='Task catalog'!$A$1:$A$2"}],
+    }
+
+
+@patch("src.google_sheets.create_time_logs_from_data", return_value=[{"data": []}])
+@patch("src.google_sheets.fetch_data_from_sheet")
+def test_sync_sheet_to_wrike_reads_task_ids_from_dropdown_labels(
+    mock_fetch_data_from_sheet, mock_create_time_logs_from_data
+):
+    mock_fetch_data_from_sheet.return_value = [
+        ["Date", "Hours", "Comment", "Task"],
+        ["2024-10-24", "1", "", "T1 Task one"],
+    ]
+
+    google_sheets.sync_sheet_to_wrike("wrike sync")
+
+    assert mock_create_time_logs_from_data.call_args.kwargs["data"] == [
+        ["2024-10-24", "1", "", "T1"]
+    ]
+
+
+@patch("src.google_sheets.get_jira_api")
+@patch("src.google_sheets.read_sheets")
+def test_sync_sheet_to_jira_fails_invalid_rows_only(
+    mock_read_sheets, mock_get_jira_api, tmp_path, monkeypatch
+):
+    journal_path = str(tmp_path / "journal.sqlite3")
+    connect = google_sheets.checkpoint.connect
+    monkeypatch.setattr(
+        google_sheets.checkpoint, "connect", lambda: connect(journal_path)
+    )
+    mock_read_sheets.return_value = {
+        "Jira": [
+            ["Date", "Start", "Hours", "Task", "Comment"],
+            ["2024-10-24", "09:00:00", "one", "PROJ-1", ""],
+            ["2024-10-24", "10:00:00", "1", "PROJ-2 Some issue", ""],
+        ]
+    }
+    jira_api = mock_get_jira_api.return_value
+    jira_api.log_time_to_jira_task.return_value = {
+        "success": True,
+        "worklog": {"id": "w1"},
+    }
+
+    summary = google_sheets.sync_sheet_to_jira("Jira", "Acme")
+
+    assert summary == {"rows": 2, "written": 1, "failed": 1, "skipped": 0}
+    assert jira_api.log_time_to_jira_task.call_args.args[0] == "PROJ-2"
+    with closing(connect(journal_path)) as connection:
+        statuses = connection.execute("SELECT status, detail FROM journal").fetchall()
+    assert sorted(statuses) == [("failed", "Invalid hours 'one'"), ("written", "w1")]
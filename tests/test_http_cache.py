@@ -0,0 +1,81 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from diskcache import Cache
+
+from src.http_cache import _validators_key, conditional_get
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with Cache(str(tmp_path)) as cache:
+        yield cache
+
+
+def _response(status_code, content=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    return response
+
+
+def test_not_modified_reuses_the_stored_body(cache):
+    get = MagicMock(
+        side_effect=[
+            _response(200, b'{"data": [1]}', {"ETag": '"v1"'}),
+            _response(304),
+        ]
+    )
+
+    first = conditional_get(cache, "https://api/tasks", {"A": "b"}, {"page": 1}, get)
+    second = conditional_get(cache, "https://api/tasks", {"A": "b"}, {"page": 1}, get)
+
+    assert first.json() == second.json() == {"data": [1]}
+    assert second.status_code == 200
+    assert "If-None-Match" not in get.call_args_list[0].kwargs["headers"]
+    assert get.call_args_list[1].kwargs["headers"] == {
+        "A": "b",
+        "If-None-Match": '"v1"',
+    }
+
+
+def test_responses_without_validators_are_not_stored(cache):
+    get = MagicMock(return_value=_response(200, b"{}"))
+
+    conditional_get(cache, "https://api/tasks", get=get)
+
+    assert len(cache) == 0
+
+
+@patch("diskcache.core.time.time")
+def test_stored_bodies_expire_unless_revalidated(mock_time, cache):
+    mock_time.return_value = 1000
+    get = MagicMock(
+        side_effect=[
+            _response(200, b"{}", {"ETag": '"v1"'}),
+            _response(304),
+        ]
+    )
+    key = _validators_key("https://api/tasks", None, None)
+
+    conditional_get(cache, "https://api/tasks", get=get, expire=60)
+    assert cache.get(key, expire_time=True)[1] == 1060
+
+    # A 304 keeps the body for another `expire` seconds
+    mock_time.return_value = 1030
+    conditional_get(cache, "https://api/tasks", get=get, expire=60)
+    assert cache.get(key, expire_time=True)[1] == 1090
+
+    mock_time.return_value = 1100
+    assert cache.get(key) is None
+
+
+def test_bodies_are_only_reused_for_the_same_scope(cache):
+    get = MagicMock(return_value=_response(200, b"{}", {"ETag": '"v1"'}))
+
+    conditional_get(cache, "https://api/tasks", get=get, scope="alice")
+    conditional_get(cache, "https://api/tasks", get=get, scope="bob")
+
+    assert "If-None-Match" not in get.call_args_list[1].kwargs["headers"]
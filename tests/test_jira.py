@@ -0,0 +1,157 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from jira.exceptions import JIRAError
+
+from src import jira
+from src.jira import JiraAPI
+
+
+def _response(data):
+    response = MagicMock(status_code=200, headers={})
+    response.json.return_value = data
+    return response
+
+
+def _worklog(worklog_id, started, account_id="me"):
+    return {
+        "id": worklog_id,
+        "issueId": "10001",
+        "started": f"{started}T09:00:00.000-0400",
+        "timeSpentSeconds": 3600,
+        "author": {"accountId": account_id},
+    }
+
+
+def _jira_api(updated_pages, deleted_page, worklogs):
+    api = JiraAPI.__new__(JiraAPI)
+    api.instance_name = "test"
+    api.user_email = "me@example.com"
+    api.scope = "scope"
+    api.client = MagicMock()
+    api.client.server_url = "https://example.atlassian.net"
+    api.client.current_user.return_value = "me"
+
+    def get(url, headers=None, params=None):
+        if url.endswith("/worklog/updated"):
+            return _response(updated_pages.pop(0))
+        return _response(deleted_page)
+
+    def post(url, json=None):
+        return _response([worklogs[worklog_id] for worklog_id in json["ids"]])
+
+    api.client._session.get.side_effect = get
+    api.client._session.post.side_effect = post
+    return api
+
+
+def test_get_worklogs_fetches_only_changed_worklogs():
+    jira.cache.delete(("worklogs", "test", "scope"))
+    jira.cache.delete(("myself", "test", "me@example.com"))
+    worklogs = {
+        1: _worklog("1", "2024-10-01"),
+        2: _worklog("2", "2024-10-02", account_id="someone else"),
+        3: _worklog("3", "2024-11-01"),
+    }
+    api = _jira_api(
+        [
+            {
+                "values": [{"worklogId": 1}, {"worklogId": 2}],
+                "until": 100,
+                "lastPage": False,
+            },
+            {"values": [{"worklogId": 3}], "until": 200, "lastPage": True},
+            {"values": [], "until": 300, "lastPage": True},
+        ],
+        {"values": [], "until": 200, "lastPage": True},
+        worklogs,
+    )
+
+    assert [w["id"] for w in api.get_worklogs("2024-10-01", "2024-10-31")] == ["1"]
+    assert api.client._session.post.call_count == 1
+
+    # The second call only asks for the worklogs updated since the first one
+    api.client._session.get.reset_mock()
+    assert [w["id"] for w in api.get_worklogs("2024-10-01", "2024-11-30")] == [
+        "1",
+        "3",
+    ]
+    assert api.client._session.get.call_args_list[0].kwargs["params"] == {"since": 200}
+    assert api.client._session.post.call_count == 1
+    # The `since` cursor moves, its pages are not kept for revalidation
+    assert not [
+        key
+        for key in jira.cache.iterkeys()
+        if key[0] == "validators" and key[-1] == "scope"
+    ]
+
+    jira.cache.delete(("worklogs", "test", "scope"))
+    jira.cache.delete(("myself", "test", "me@example.com"))
+
+
+def test_log_time_to_jira_task_flags_provider_errors():
+    api = _jira_api([], [], {})
+    api.get_issue_key = lambda task_id: task_id
+
+    api.client.add_worklog.side_effect = JIRAError(status_code=503, text="Unavailable")
+    response = api.log_time_to_jira_task("PROJ-1", "2024-10-24 09:00:00", 3600)
+    assert response["provider_error"]
+
+    api.client.add_worklog.side_effect = JIRAError(status_code=400, text="Bad Request")
+    response = api.log_time_to_jira_task("PROJ-1", "2024-10-24 09:00:00", 3600)
+    assert not response["provider_error"]
+
+
+def test_sync_worklogs_raises_on_error_responses():
+    jira.cache.delete(("worklogs", "test", "scope"))
+    api = _jira_api([], [], {})
+    response = MagicMock(status_code=401, headers={})
+    response.raise_for_status.side_effect = requests.HTTPError("401 Unauthorized")
+    api.client._session.get.side_effect = None
+    api.client._session.get.return_value = response
+
+    with pytest.raises(requests.HTTPError):
+        api.sync_worklogs(0)
+
+    assert jira.cache.get(("worklogs", "test", "scope")) is None
+
+
+@patch("src.jira.JIRA")
+def test_credentials_are_replaced_per_instance(mock_jira, tmp_path, monkeypatch):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        "jira_instances:\n"
+        "  - {name: Acme, base_url: https://acme, user_email: a@x, api_token: A}\n"
+        "  - {name: Other, base_url: https://other, user_email: o@x, api_token: O}\n"
+    )
+    monkeypatch.setenv("JIRA_USER_EMAIL_ACME", "me@acme")
+    monkeypatch.setenv("JIRA_API_TOKEN_ACME", "MINE")
+
+    acme = JiraAPI(str(config_file), "Acme")
+    other = JiraAPI(str(config_file), "Other")
+
+    assert mock_jira.call_args_list[0].kwargs["basic_auth"] == ("me@acme", "MINE")
+    assert mock_jira.call_args_list[1].kwargs["basic_auth"] == ("o@x", "O")
+    assert acme.scope != other.scope
+
+
+def test_delete_all_worklogs_for_user_on_given_day_queries_that_day_only():
+    jira.cache.delete(("myself", "test", "me@example.com"))
+    api = _jira_api([], [], {})
+    api.client.search_issues.return_value = [MagicMock(key="PROJ-1")]
+    api.client.worklogs.return_value = [
+        MagicMock(raw=_worklog("1", "2024-10-24")),
+        MagicMock(raw=_worklog("2", "2024-10-25")),
+        MagicMock(raw=_worklog("3", "2024-10-24", account_id="someone else")),
+    ]
+
+    results = api.delete_all_worklogs_for_user_on_given_day("2024-10-24", dry_run=True)
+
+    assert results == ["Dry run mode: Would delete worklog 1 for issue 10001"]
+    assert (
+        "worklogDate = 2024-10-24"
+        in api.client.search_issues.call_args.kwargs["jql_str"]
+    )
+    api.client._session.get.assert_not_called()
+    jira.cache.delete(("myself", "test", "me@example.com"))
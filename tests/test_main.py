@@ -30,6 +30,38 @@ import pytest
             ["python", "-m", "main", "jira"],
             "main.py jira",
         ),
+        (
+            ["python", "-m", "main", "export"],
+            "main.py export",
+        ),
+        (
+            ["python", "-m", "main", "store"],
+            "main.py store",
+        ),
+        (
+            ["python", "-m", "main", "daemon"],
+            "main.py daemon",
+        ),
+        (
+            ["python", "-m", "main", "webhooks"],
+            "main.py webhooks",
+        ),
+        (
+            ["python", "-m", "main", "pipeline"],
+            "main.py pipeline",
+        ),
+        (
+            ["python", "-m", "main", "rollups"],
+            "main.py rollups",
+        ),
+        (
+            ["python", "-m", "main", "team"],
+            "main.py team",
+        ),
+        (
+            ["python", "-m", "main", "warm"],
+            "main.py warm",
+        ),
     ],
 )
 def test_fire_cli(command, expected_output):
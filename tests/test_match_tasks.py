@@ -1,6 +1,9 @@
 from unittest.mock import patch
 
-from src.match_tasks import match_toggl_entries_to_wrike_tasks
+from src.match_tasks import (
+    match_toggl_entries_by_description,
+    match_toggl_entries_to_wrike_tasks,
+)
 
 # Mock data
 mock_toggl_entries = [
@@ -37,3 +40,29 @@ def test_match_toggl_entries_to_wrike_tasks(mock_get_task_by_id, mock_get_time_e
         mock_print.assert_any_call(
             "Matched Toggl entry {'id': 'task2', 'description': 'Task 2 description'} to Wrike task {'id': 'task1', 'title': 'Task 1 title'}"
         )
+
+
+@patch("src.match_tasks.get_time_entries")
+@patch("src.match_tasks.connect")
+@patch("src.match_tasks.search")
+def test_match_toggl_entries_by_description(
+    mock_search, mock_connect, mock_get_time_entries
+):
+    mock_get_time_entries.return_value = mock_toggl_entries
+    mock_search.side_effect = lambda query, limit, connection: (
+        [("wrike1", "Task 1 title")] if query == "Task 1 description" else []
+    )
+
+    with patch("builtins.print"):
+        matches = match_toggl_entries_by_description("2023-06-01", "2023-06-18")
+
+    assert matches == [
+        (mock_toggl_entries[0], ("wrike1", "Task 1 title")),
+        (mock_toggl_entries[1], None),
+    ]
+    # Every search goes through the same connection
+    mock_connect.assert_called_once_with()
+    assert {call.kwargs["connection"] for call in mock_search.call_args_list} == {
+        mock_connect.return_value
+    }
+    mock_connect.return_value.close.assert_called_once_with()
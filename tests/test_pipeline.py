@@ -0,0 +1,118 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from src.entries import normalize_toggl_entry
+from src.pipeline import iter_entries, load_mapping, resolve_task_key, run
+from src.targets import TargetError
+
+
+def _toggl_entry(entry_id, description, project_id=None):
+    return {
+        "id": entry_id,
+        "description": description,
+        "start": "2023-06-01T15:00:00+00:00",
+        "duration": 1800,
+        "pid": project_id,
+    }
+
+
+@patch("src.pipeline.toggl.get_time_entries")
+def test_iter_entries_fetches_in_chunks(mock_get_time_entries):
+    mock_get_time_entries.return_value = [_toggl_entry(1, "ABC-1")]
+
+    entries = list(iter_entries("toggl", "2023-06-01", "2023-06-10", chunk_days=7))
+
+    assert len(entries) == 2
+    assert [call.args for call in mock_get_time_entries.call_args_list] == [
+        ("2023-06-01", "2023-06-08"),
+        ("2023-06-08", "2023-06-11"),
+    ]
+
+
+def test_resolve_task_key_prefers_mapping(tmp_path):
+    mapping_file = tmp_path / "mapping.csv"
+    mapping_file.write_text("match,task_key\nstandup,ABC-9\n42,XYZ-1\n")
+    mapping = load_mapping(str(mapping_file))
+
+    assert (
+        resolve_task_key(
+            normalize_toggl_entry(_toggl_entry(1, "Daily Standup")), mapping
+        )
+        == "ABC-9"
+    )
+    assert (
+        resolve_task_key(normalize_toggl_entry(_toggl_entry(2, "Review", 42)), mapping)
+        == "XYZ-1"
+    )
+    assert (
+        resolve_task_key(
+            normalize_toggl_entry(_toggl_entry(3, "ABC-3 Review")), mapping
+        )
+        == "ABC-3"
+    )
+
+
+@patch("src.pipeline.get_target")
+@patch("src.pipeline.toggl.get_time_entries")
+def test_run_writes_entries_to_target(mock_get_time_entries, mock_get_target, tmp_path):
+    mock_get_time_entries.return_value = [
+        _toggl_entry(1, "ABC-1 Work"),
+        _toggl_entry(2, ""),
+        _toggl_entry(3, "ABC-3 Work"),
+        _toggl_entry(4, "ABC-4 Work"),
+        _toggl_entry(5, None),
+    ]
+
+    def create(entry):
+        if entry["id"] == "3":
+            raise TargetError("boom")
+        if entry["id"] == "4":
+            raise requests.ConnectionError("Connection reset")
+        return "worklog-1"
+
+    target = MagicMock()
+    target.create.side_effect = create
+    mock_get_target.return_value = target
+
+    journal_path = str(tmp_path / "journal.sqlite3")
+    with patch("builtins.print"):
+        summary = run(
+            "toggl",
+            "2023-06-01",
+            "2023-06-01",
+            "jira",
+            max_workers=2,
+            journal_path=journal_path,
+        )
+
+    assert summary == {"written": 1, "failed": 2, "skipped": 2, "dry run": 0}
+    mock_get_target.assert_called_with("jira", "default")
+
+    # A rerun only retries the failed entries
+    with patch("builtins.print"):
+        summary = run(
+            "toggl", "2023-06-01", "2023-06-01", "jira", journal_path=journal_path
+        )
+
+    assert summary == {"written": 0, "failed": 2, "skipped": 3, "dry run": 0}
+    assert target.create.call_count == 5
+
+
+@patch("src.pipeline.get_target")
+@patch("src.pipeline.toggl.get_time_entries")
+def test_run_dry_run_writes_nothing(mock_get_time_entries, mock_get_target, tmp_path):
+    mock_get_time_entries.return_value = [_toggl_entry(1, "ABC-1 Work")]
+
+    with patch("builtins.print"):
+        summary = run(
+            "toggl",
+            "2023-06-01",
+            "2023-06-01",
+            "wrike",
+            dry_run=True,
+            journal_path=str(tmp_path / "journal.sqlite3"),
+        )
+
+    assert summary["dry run"] == 1
+    mock_get_target.assert_not_called()
@@ -0,0 +1,23 @@
+from unittest.mock import patch
+
+from src import rate_limit
+from src.rate_limit import RateLimiter
+
+
+@patch("src.rate_limit.time")
+def test_rate_limiter_spaces_requests(mock_time):
+    mock_time.monotonic.return_value = 100.0
+    limiter = RateLimiter(per_minute=60)
+
+    limiter.wait()
+    limiter.wait()
+    limiter.wait()
+
+    assert [call.args[0] for call in mock_time.sleep.call_args_list] == [1.0, 2.0]
+
+
+def test_each_credential_has_its_own_limiter():
+    rate_limit.wait("test", "token A", 60)
+    rate_limit.wait("test", "token B", 60)
+
+    assert len([key for key in rate_limit._limiters if key[0] == "test"]) == 2
@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from diskcache import Cache
+
+from src import clockify, reports, toggl
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    with Cache(str(tmp_path)) as cache:
+        monkeypatch.setattr(reports, "cache", cache)
+        yield cache
+
+
+def _response(data):
+    response = MagicMock()
+    response.status_code = 200
+    response.json.return_value = data
+    return response
+
+
+@patch("src.clockify.requests.post")
+def test_clockify_summary_is_cached_for_closed_periods(mock_post):
+    mock_post.return_value = _response({"groupOne": [{"name": "Project"}]})
+
+    for _ in range(2):
+        report = clockify.get_summary_report(
+            "ws", "2023-01-01", "2023-01-31", "PROJECT"
+        )
+
+    assert report == {"groupOne": [{"name": "Project"}]}
+    assert mock_post.call_count == 1
+    assert mock_post.call_args.kwargs["json"]["summaryFilter"] == {
+        "groups": ["PROJECT"]
+    }
+    assert mock_post.call_args.kwargs["json"]["dateRangeEnd"] == (
+        "2023-01-31T23:59:59.999Z"
+    )
+
+
+@patch("src.clockify.requests.post")
+def test_clockify_detailed_report_streams_pages(mock_post):
+    mock_post.side_effect = [
+        _response({"timeentries": [{"_id": "1"}, {"_id": "2"}]}),
+        _response({"timeentries": [{"_id": "3"}]}),
+    ]
+
+    entries = clockify.iter_detailed_report("ws", "2023-01-01", "2023-01-31", 2)
+
+    assert [entry["_id"] for entry in entries] == ["1", "2", "3"]
+    assert [
+        call.kwargs["json"]["detailedFilter"]["page"]
+        for call in mock_post.call_args_list
+    ] == [1, 2]
+
+
+@patch("src.toggl.requests.get")
+def test_toggl_detailed_report_streams_pages(mock_get):
+    mock_get.side_effect = [
+        _response({"total_count": 3, "per_page": 2, "data": [{"id": 1}, {"id": 2}]}),
+        _response({"total_count": 3, "per_page": 2, "data": [{"id": 3}]}),
+    ]
+
+    entries = list(toggl.iter_detailed_report("ws", "2023-01-01", "2023-01-31"))
+
+    assert [entry["id"] for entry in entries] == [1, 2, 3]
+    assert mock_get.call_args.kwargs["params"]["page"] == 2
+
+    # Closed periods are read from the cache
+    assert list(toggl.iter_detailed_report("ws", "2023-01-01", "2023-01-31")) == entries
+    assert mock_get.call_count == 2
+
+
+@patch("src.toggl.requests.get")
+def test_reports_are_cached_per_api_key(mock_get, monkeypatch):
+    mock_get.return_value = _response({"total_count": 1, "per_page": 50, "data": []})
+
+    toggl.get_summary_report("ws", "2023-01-01", "2023-01-31")
+    monkeypatch.setattr(toggl, "TOGGL_API_KEY", "someone else")
+    toggl.get_summary_report("ws", "2023-01-01", "2023-01-31")
+
+    assert mock_get.call_count == 2
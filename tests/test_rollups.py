@@ -0,0 +1,54 @@
+from src.entries import normalize_toggl_entry
+from src.rollups import hours, ingest
+
+
+def _toggl_entry(entry_id, description, start, duration, project_id=None):
+    return normalize_toggl_entry(
+        {
+            "id": entry_id,
+            "description": description,
+            "start": start,
+            "duration": duration,
+            "pid": project_id,
+        }
+    )
+
+
+def test_ingest_and_query_totals(tmp_path):
+    path = str(tmp_path / "rollups.sqlite3")
+    ingest(
+        "toggl",
+        [
+            _toggl_entry(1, "ABC-1 Work", "2024-07-01T15:00:00Z", 3600, 10),
+            _toggl_entry(2, "ABC-1 More", "2024-07-02T15:00:00Z", 1800, 10),
+            _toggl_entry(3, "XYZ-1 Work", "2024-07-08T15:00:00Z", 7200, 20),
+        ],
+        path,
+    )
+    ingest(
+        "wrike",
+        [{"id": "w1", "taskId": "T1", "hours": 1, "trackedDate": "2024-07-03"}],
+        path,
+    )
+
+    assert hours("task", path=path) == [("XYZ-1", 2.0), ("ABC-1", 1.5), ("T1", 1.0)]
+    assert hours("project", source="toggl", path=path) == [("20", 2.0), ("10", 1.5)]
+    assert hours("week", path=path) == [("2024-07-01", 2.5), ("2024-07-08", 2.0)]
+    assert hours("week", start_date="2024-07-02", end_date="2024-07-08", path=path) == [
+        ("2024-07-08", 2.0),
+        ("2024-07-01", 1.5),
+    ]
+    assert hours(
+        "source", start_date="2024-07-02", end_date="2024-07-03", path=path
+    ) == [("wrike", 1.0), ("toggl", 0.5)]
+
+
+def test_ingest_updates_moved_entries(tmp_path):
+    path = str(tmp_path / "rollups.sqlite3")
+    ingest("toggl", [_toggl_entry(1, "ABC-1", "2024-07-01T15:00:00Z", 3600)], path)
+
+    ingest("toggl", [_toggl_entry(1, "ABC-2", "2024-07-09T15:00:00Z", 1800)], path)
+
+    assert hours("task", path=path) == [("ABC-2", 0.5)]
+    assert hours("day", path=path) == [("2024-07-09", 0.5)]
+    assert hours("week", path=path) == [("2024-07-08", 0.5)]
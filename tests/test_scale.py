@@ -0,0 +1,252 @@
+"""
+Scale tests of the bulk paths, against in-process fakes of the APIs.
+
+Each test streams a large synthetic data set through a real code path and
+checks the number of API calls and the peak memory traced by tracemalloc. A
+regression to one call per record, or to holding the whole data set in memory,
+fails these tests. They are deselected by default, run them with
+`pytest -m scale`.
+
+With SCALE_TIME_LIMITS=1, set by the scale CI job, the wall time of each test
+is checked too. The ceilings are a few times what the job takes, so they catch
+quadratic work but not a slow runner.
+"""
+
+import datetime
+import os
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from jira.exceptions import JIRAError
+
+from src import checkpoint, export, google_sheets, store, wrike
+from src.task_index import TaskIndex
+
+pytestmark = pytest.mark.scale
+
+TASK_COUNT = 100_000
+TIMELOG_COUNT = 1_000_000
+SHEET_ROW_COUNT = 20_000
+PAGE_SIZE = 1000
+
+MB = 1024 * 1024
+
+CHECK_TIME_LIMITS = os.getenv("SCALE_TIME_LIMITS") == "1"
+
+
+@contextmanager
+def measure():
+    """Fill a dict with the peak traced memory (bytes) and the seconds of the block."""
+    stats = {}
+    started_at = time.perf_counter()
+    tracemalloc.start()
+    try:
+        yield stats
+    finally:
+        stats["peak"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stats["seconds"] = time.perf_counter() - started_at
+
+
+def assert_seconds(stats, ceiling):
+    if CHECK_TIME_LIMITS:
+        assert stats["seconds"] < ceiling
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, data):
+        self.headers = {}
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+def fake_task_pages(url, headers=None, params=None):
+    """GET /tasks of a Wrike account with TASK_COUNT tasks, the page token is the offset."""
+    start = int(params.get("nextPageToken", 0))
+    end = min(start + params["pageSize"], TASK_COUNT)
+    data = {"data": [{"id": f"T{i}", "title": f"Task {i}"} for i in range(start, end)]}
+    if end < TASK_COUNT:
+        data["nextPageToken"] = str(end)
+    return FakeResponse(data)
+
+
+def fake_timelogs(window):
+    """Timelogs of a month, generated lazily, ten in a row per task."""
+    months = 12
+    first = (window[0].month - 1) * TIMELOG_COUNT // months
+    last = window[0].month * TIMELOG_COUNT // months
+    day = window[0].isoformat()
+    return (
+        {
+            "id": f"L{i}",
+            "taskId": f"T{i // 10}",
+            "hours": 1,
+            "trackedDate": day,
+            "comment": "",
+        }
+        for i in range(first, last)
+    )
+
+
+def fake_tasks_by_ids(task_ids):
+    return {
+        task_id: {"title": f"Task {task_id}", "permalink": task_id}
+        for task_id in task_ids
+    }
+
+
+class FakeJiraAPI:
+    """Jira instance with TASK_COUNT open issues, counting the calls of each method."""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def list_issues(self, jql):
+        self.calls["list_issues"] += 1
+        return [(f"PROJ-{i}", str(10000 + i), f"Issue {i}") for i in range(TASK_COUNT)]
+
+    def get_issue_key(self, task_id):
+        self.calls["get_issue_key"] += 1
+        raise JIRAError(status_code=404, text=f"Issue {task_id} does not exist")
+
+    def log_time_to_jira_task(self, task_id, start, seconds, comment=""):
+        self.calls["log_time_to_jira_task"] += 1
+        return {
+            "success": True,
+            "worklog": {"id": str(self.calls["log_time_to_jira_task"])},
+        }
+
+
+@pytest.fixture
+def wrike_api():
+    with (
+        patch("src.wrike._throttle"),
+        patch("src.wrike.requests.get", side_effect=fake_task_pages) as get,
+    ):
+        yield get
+
+
+def test_export_tasks_streams_pages(wrike_api, tmp_path):
+    with measure() as stats:
+        count = export.export_tasks(output_dir=str(tmp_path), page_size=PAGE_SIZE)
+
+    assert count == TASK_COUNT
+    assert wrike_api.call_count == TASK_COUNT // PAGE_SIZE
+    assert stats["peak"] < 5 * MB
+    assert_seconds(stats, 15)
+
+
+def test_store_sync_tasks_streams_pages(wrike_api, tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+
+    with measure() as stats:
+        count = store.sync_tasks(page_size=PAGE_SIZE, path=path)
+
+    assert count == TASK_COUNT
+    assert wrike_api.call_count == TASK_COUNT // PAGE_SIZE
+    assert stats["peak"] < 5 * MB
+    assert_seconds(stats, 30)
+    assert store.search("Task 99999", path=path)[0] == ("T99999", "Task 99999")
+
+
+@patch("src.wrike._get_tasks_by_ids_internal", side_effect=fake_tasks_by_ids)
+@patch("src.wrike._get_timelog_window")
+def test_iter_timelogs_with_task_data_keeps_memory_flat(
+    mock_get_timelog_window, mock_get_tasks_by_ids
+):
+    mock_get_timelog_window.side_effect = lambda created, window, for_current_user: (
+        fake_timelogs(window)
+    )
+
+    wrike.delete_cache()
+    count = 0
+    with measure() as stats:
+        for chunk in wrike.iter_timelogs_with_task_data(
+            tracked_date_range=("2023-01-01", "2023-12-31")
+        ):
+            count += len(chunk)
+
+    assert count == TIMELOG_COUNT
+    assert mock_get_timelog_window.call_count == 12
+    # One request per chunk of 500 timelogs, each task fetched once
+    assert mock_get_tasks_by_ids.call_count == TIMELOG_COUNT // 500
+    assert (
+        sum(len(call.args[0]) for call in mock_get_tasks_by_ids.call_args_list)
+        == TASK_COUNT
+    )
+    wrike.delete_cache()
+    assert stats["peak"] < 20 * MB
+    assert_seconds(stats, 300)
+
+
+@patch("src.export.wrike.get_all_timelogs")
+def test_export_timelogs_writes_in_batches(mock_get_all_timelogs, tmp_path):
+    mock_get_all_timelogs.side_effect = lambda tracked_date_range, for_current_user: (
+        fake_timelogs(tracked_date_range)
+    )
+
+    with measure() as stats:
+        written = export.export_timelogs(
+            "2023-01-01", "2023-12-31", output_dir=str(tmp_path)
+        )
+
+    assert sum(written.values()) == TIMELOG_COUNT
+    assert mock_get_all_timelogs.call_count == 12
+    assert stats["peak"] < 10 * MB
+    assert_seconds(stats, 120)
+
+
+def test_task_index_resolves_cells_without_requests():
+    tasks = [(f"T{i}", f"Task number {i}") for i in range(TASK_COUNT)]
+    cells = [f"task number {i}" for i in range(TASK_COUNT)]
+
+    with measure() as stats:
+        index = TaskIndex(tasks)
+        resolved = [index.resolve(cell) for cell in cells]
+
+    assert resolved == [task_id for task_id, _ in tasks]
+    # Strings, not one node per character of every title
+    assert stats["peak"] < 60 * MB
+    assert_seconds(stats, 30)
+
+
+def test_sync_sheet_to_jira_validates_and_writes_each_row_once(monkeypatch):
+    connect = checkpoint.connect
+    monkeypatch.setattr(checkpoint, "connect", lambda: connect(":memory:"))
+    start = datetime.datetime(2023, 1, 2, 9, 0)
+    values = [["Date", "Start", "Hours", "Task", "Comment"]] + [
+        [
+            f"{start + datetime.timedelta(hours=i):%Y-%m-%d}",
+            f"{start + datetime.timedelta(hours=i):%H:%M:%S}",
+            "0.5",
+            f"PROJ-{i % TASK_COUNT} Issue {i % TASK_COUNT}",
+            "",
+        ]
+        for i in range(SHEET_ROW_COUNT)
+    ]
+    jira_api = FakeJiraAPI()
+
+    with (
+        patch("src.google_sheets.read_sheets", return_value={"Jira": values}) as read,
+        patch("src.google_sheets.get_jira_api", return_value=jira_api),
+        measure() as stats,
+    ):
+        summary = google_sheets.sync_sheet_to_jira("Jira", "Acme", validate=True)
+
+    assert summary["written"] == SHEET_ROW_COUNT
+    assert summary["failed"] == 0
+    assert read.call_count == 1
+    assert jira_api.calls == {
+        "list_issues": 1,
+        "log_time_to_jira_task": SHEET_ROW_COUNT,
+    }
+    assert stats["peak"] < 120 * MB
+    assert_seconds(stats, 90)
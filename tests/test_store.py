@@ -0,0 +1,41 @@
+from contextlib import closing
+from unittest.mock import patch
+
+from src.store import connect, get_task, search, sync_tasks
+
+mock_pages = [
+    [("t1", "Onboarding API"), ("t2", "Onboarding UI")],
+    [("t3", "Billing API"), ("t4", "Weekly meeting")],
+]
+
+
+@patch("src.store.wrike.iter_task_pages")
+def test_sync_tasks_and_search(mock_iter_task_pages, tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    mock_iter_task_pages.return_value = iter(mock_pages)
+
+    assert sync_tasks(path=path) == 4
+    assert search("onboarding api", path=path) == [("t1", "Onboarding API")]
+    assert search("onboard", path=path) == [
+        ("t1", "Onboarding API"),
+        ("t2", "Onboarding UI"),
+    ]
+    assert search("api", path=path) == [("t1", "Onboarding API"), ("t3", "Billing API")]
+    assert search("", path=path) == []
+    assert search('"', path=path) == []
+    with closing(connect(path)) as connection:
+        assert search("billing", connection=connection) == [("t3", "Billing API")]
+
+
+@patch("src.store.wrike.iter_task_pages")
+def test_sync_tasks_updates_renamed_tasks(mock_iter_task_pages, tmp_path):
+    path = str(tmp_path / "store.sqlite3")
+    mock_iter_task_pages.return_value = iter(mock_pages)
+    sync_tasks(path=path)
+
+    mock_iter_task_pages.return_value = iter([[("t4", "Weekly sync")]])
+    sync_tasks(path=path)
+
+    assert get_task("t4", path=path) == ("t4", "Weekly sync")
+    assert search("meeting", path=path) == []
+    assert search("weekly", path=path) == [("t4", "Weekly sync")]
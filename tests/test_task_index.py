@@ -0,0 +1,71 @@
+from unittest.mock import MagicMock
+
+import pytest
+from jira.exceptions import JIRAError
+
+from src.task_index import TaskIndex, resolve_issue
+
+TASKS = [
+    ("PROJ-12", "Fix the login page", ("10012",)),
+    ("PROJ-13", "Fix the logout page", ("10013",)),
+    ("PROJ-20", "Quarterly report"),
+    ("PROJ-21", "Quarterly report"),
+]
+
+
+def test_resolve_by_key_alias_title_and_prefix():
+    index = TaskIndex(TASKS)
+
+    assert index.resolve("PROJ-12 Fix the login page") == "PROJ-12"
+    assert index.resolve("proj-13") == "PROJ-13"
+    assert index.resolve("10012") == "PROJ-12"
+    assert index.resolve("  fix the LOGIN page ") == "PROJ-12"
+    assert index.resolve("Fix the logi") == "PROJ-12"
+
+
+def test_resolve_rejects_unknown_and_ambiguous_cells():
+    index = TaskIndex(TASKS)
+
+    assert index.resolve("PROJ-99") is None
+    assert index.resolve("Fix the") is None
+    assert index.resolve("Quarterly report") is None
+    assert index.resolve("") is None
+
+
+def test_suggest_lists_close_keys_and_titles():
+    index = TaskIndex(TASKS)
+
+    assert index.suggest("PROJ-1") == [
+        "PROJ-12 Fix the login page",
+        "PROJ-13 Fix the logout page",
+    ]
+    assert index.suggest("Quarterly") == [
+        "PROJ-20 Quarterly report",
+        "PROJ-21 Quarterly report",
+    ]
+
+
+def test_resolve_issue_looks_up_keys_missing_from_the_catalog():
+    index = TaskIndex(TASKS)
+    jira_api = MagicMock()
+
+    def get_issue_key(key):
+        if key != "PROJ-1":
+            raise JIRAError(status_code=404, text="Issue does not exist")
+        return key
+
+    jira_api.get_issue_key.side_effect = get_issue_key
+
+    assert resolve_issue(index, "PROJ-12", jira_api) == "PROJ-12"
+    assert resolve_issue(index, "PROJ-1 Closed issue", jira_api) == "PROJ-1"
+    assert resolve_issue(index, "PROJ-2", jira_api) is None
+    assert resolve_issue(index, "No such task", jira_api) is None
+    assert jira_api.get_issue_key.call_count == 2
+
+
+def test_resolve_issue_raises_jira_errors_other_than_not_found():
+    jira_api = MagicMock()
+    jira_api.get_issue_key.side_effect = JIRAError(status_code=401, text="Unauthorized")
+
+    with pytest.raises(JIRAError):
+        resolve_issue(TaskIndex(TASKS), "PROJ-2", jira_api)
@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+import pytest
+
+from src import team
+
+
+def test_load_roster_rejects_duplicate_names(tmp_path):
+    roster = tmp_path / "team.yaml"
+    roster.write_text("users:\n  - name: alice\n  - name: alice\n")
+
+    with pytest.raises(ValueError):
+        team.load_roster(str(roster))
+
+
+def test_user_env_keeps_credentials_and_state_per_user():
+    env = team.user_env(
+        {
+            "name": "alice",
+            "wrike_access_token": "A",
+            "toggl_api_key": "",
+            "jira_instances": {"Instance1": {"api_token": "J"}},
+        },
+        base_env={"WRIKE_ACCESS_TOKEN": "SHARED", "TOGGL_API_KEY": "SHARED"},
+    )
+
+    assert env["WRIKE_ACCESS_TOKEN"] == "A"
+    # Missing credentials fall back to the shared ones
+    assert env["TOGGL_API_KEY"] == "SHARED"
+    # Jira credentials only replace those of the instances listed
+    assert env["JIRA_API_TOKEN_INSTANCE1"] == "J"
+    assert "JIRA_USER_EMAIL_INSTANCE1" not in env
+    assert env["SYNC_JOURNAL_PATH"].startswith(team.os.path.join("team", "alice"))
+
+
+@patch("src.team.warm.warm_once")
+@patch("src.team.subprocess.run")
+def test_run_starts_one_process_per_user(
+    mock_run, mock_warm_once, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(team, "TEAM_STATE_DIR", str(tmp_path / "team"))
+    roster = tmp_path / "team.yaml"
+    roster.write_text(
+        "users:\n"
+        "  - name: alice\n    wrike_access_token: A\n"
+        "  - name: bob\n    wrike_access_token: B\n"
+    )
+    mock_run.side_effect = lambda args, env, **kwargs: team.subprocess.CompletedProcess(
+        args, 0 if env["WRIKE_ACCESS_TOKEN"] == "A" else 1
+    )
+
+    ok = team.run(
+        "google_sheets sync_sheet_to_wrike --title={name}",
+        roster_file=str(roster),
+        folder_ids="F1",
+    )
+
+    assert not ok
+    mock_warm_once.assert_called_once_with(["F1"], [])
+    commands = sorted(call.args[0][3:] for call in mock_run.call_args_list)
+    assert commands == [
+        ["google_sheets", "sync_sheet_to_wrike", "--title=alice"],
+        ["google_sheets", "sync_sheet_to_wrike", "--title=bob"],
+    ]
+
+
+@patch("src.team.subprocess.run")
+def test_run_keeps_names_with_spaces_and_quotes_in_one_argument(
+    mock_run, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(team, "TEAM_STATE_DIR", str(tmp_path / "team"))
+    mock_run.return_value = team.subprocess.CompletedProcess([], 0)
+
+    team._run_user({"name": "Siobhan O'Neil"}, "daemon run --title='{name} sync'")
+
+    assert mock_run.call_args.args[0][3:] == [
+        "daemon",
+        "run",
+        "--title=Siobhan O'Neil sync",
+    ]
@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+import requests
+from diskcache import Cache
+
+from src import wrike
+from src.warm import warm_once
+
+
+@patch("src.warm._warm_jira")
+@patch("src.warm.wrike")
+def test_warm_once_reports_each_lookup(mock_wrike, mock_warm_jira):
+    mock_wrike.get_connected_user_id.return_value = "USER"
+    mock_wrike.list_all_folders.return_value = [("F1", "Folder")]
+    mock_wrike.list_all_projects.return_value = None
+    mock_wrike.get_all_tasks.side_effect = lambda folder_id: [("T1", "Task")] * 3
+    mock_warm_jira.side_effect = RuntimeError("401 Unauthorized")
+
+    results = warm_once(["F1", "F2"], ["Acme"])
+
+    assert [(r["job"], r["loaded"], r["error"]) for r in results] == [
+        ("wrike user", 1, ""),
+        ("wrike folders", 1, ""),
+        ("wrike projects", 0, ""),
+        ("wrike tasks F1", 3, ""),
+        ("wrike tasks F2", 3, ""),
+        ("jira Acme", 0, "401 Unauthorized"),
+    ]
+    mock_warm_jira.assert_called_once_with("Acme", False)
+
+
+@patch("src.warm._warm_jira")
+@patch("src.wrike.iter_task_pages")
+@patch("src.wrike._get")
+def test_refresh_keeps_cached_lookups_until_fetched(
+    mock_get, mock_iter_task_pages, mock_warm_jira, tmp_path, monkeypatch
+):
+    monkeypatch.setattr(wrike, "cache", Cache(str(tmp_path)))
+    key = wrike._cache_key(wrike._get_all_tasks_internal, ("F1", 1000), {})
+    wrike.cache[key] = [("T1", "Old")]
+    mock_get.side_effect = requests.ConnectionError("Wrike is down")
+    mock_iter_task_pages.side_effect = requests.ConnectionError("Wrike is down")
+
+    results = warm_once(["F1"], [], refresh=True)
+
+    assert results[0]["job"] == "refresh get_all_tasks_internal F1 1000"
+    assert results[0]["error"] == "Wrike is down"
+    # The tasks job still reads the old tasks
+    assert wrike.get_all_tasks("F1") == [("T1", "Old")]
+
+    mock_iter_task_pages.side_effect = None
+    mock_iter_task_pages.return_value = [[("T1", "New")]]
+    warm_once(["F1"], [], refresh=True)
+
+    assert wrike.get_all_tasks("F1") == [("T1", "New")]
+    wrike.cache.close()
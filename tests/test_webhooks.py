@@ -0,0 +1,150 @@
+import datetime
+import json
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+from src import wrike
+from src.webhooks import WebhookHandler, handle_jira_event, handle_wrike_events, replay
+
+january = (datetime.date(2023, 1, 1), datetime.date(2023, 1, 31))
+february = (datetime.date(2023, 2, 1), datetime.date(2023, 2, 28))
+
+
+def _seed_cache():
+    wrike.delete_cache()
+    wrike.cache[wrike._cache_key(wrike._get_task_by_id_internal, ("t1",), {})] = {
+        "data": []
+    }
+    wrike.cache[wrike._cache_key(wrike._get_all_tasks_internal, ("f1", 1000), {})] = [
+        ("t1", "Old title"),
+        ("t2", "Other task"),
+    ]
+    wrike.cache[
+        wrike._cache_key(wrike._get_all_timelogs_internal, (None, january, False), {})
+    ] = [{"id": "log1", "trackedDate": "2023-01-10"}]
+    wrike.cache[
+        wrike._cache_key(wrike._get_all_timelogs_internal, (None, february, False), {})
+    ] = []
+    wrike.cache[wrike._cache_key(wrike._get_folder_tree_internal, (), {})] = []
+
+
+def _cached(func, *args):
+    return wrike.cache.get(wrike._cache_key(func, args, {}))
+
+
+def test_task_title_change_patches_task_lists():
+    _seed_cache()
+
+    handle_wrike_events(
+        [{"eventType": "TaskTitleChanged", "taskId": "t1", "title": "New title"}]
+    )
+
+    assert _cached(wrike._get_task_by_id_internal, "t1") is None
+    assert _cached(wrike._get_all_tasks_internal, "f1", 1000) == [
+        ("t1", "New title"),
+        ("t2", "Other task"),
+    ]
+    assert _cached(wrike._get_folder_tree_internal) == []
+    wrike.delete_cache()
+
+
+def test_task_deleted_is_removed_from_task_lists():
+    _seed_cache()
+
+    handle_wrike_events([{"eventType": "TaskDeleted", "taskId": "t2"}])
+
+    assert _cached(wrike._get_all_tasks_internal, "f1", 1000) == [("t1", "Old title")]
+    wrike.delete_cache()
+
+
+@patch("src.wrike.requests.get")
+def test_timelog_change_moves_it_to_its_month(mock_get):
+    _seed_cache()
+    mock_get.return_value = MagicMock(status_code=200, headers={})
+    mock_get.return_value.json.return_value = {
+        "data": [{"id": "log1", "trackedDate": "2023-02-03"}]
+    }
+
+    actions = handle_wrike_events(
+        [{"eventType": "TimelogChanged", "timelogId": "log1", "taskId": "t1"}]
+    )
+
+    assert actions == ["timelog log1"]
+    assert _cached(wrike._get_all_timelogs_internal, None, january, False) == []
+    assert _cached(wrike._get_all_timelogs_internal, None, february, False) == [
+        {"id": "log1", "trackedDate": "2023-02-03"}
+    ]
+    wrike.delete_cache()
+
+
+def test_folder_events_only_drop_the_folder_tree(tmp_path):
+    _seed_cache()
+    payload = tmp_path / "payload.json"
+    payload.write_text(
+        json.dumps([{"eventType": "FolderTitleChanged", "folderId": "f1"}])
+    )
+
+    assert replay(str(payload)) == ["folders"]
+    assert _cached(wrike._get_folder_tree_internal) is None
+    assert _cached(wrike._get_task_by_id_internal, "t1") == {"data": []}
+    wrike.delete_cache()
+
+
+@patch("src.webhooks.jira.invalidate_issue")
+def test_handle_jira_event(mock_invalidate_issue):
+    actions = handle_jira_event(
+        {"webhookEvent": "jira:issue_updated", "issue": {"id": "10001", "key": "ABC-1"}}
+    )
+
+    assert actions == ["issue ABC-1"]
+    mock_invalidate_issue.assert_any_call("ABC-1")
+    assert handle_jira_event({"webhookEvent": "comment_created"}) == []
+
+
+def test_server_accepts_wrike_notifications():
+    _seed_cache()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), WebhookHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.server_port}/wrike",
+            data=json.dumps(
+                [{"eventType": "FolderCreated", "folderId": "f2"}]
+            ).encode(),
+            method="POST",
+        )
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert _cached(wrike._get_folder_tree_internal) is None
+    wrike.delete_cache()
+
+
+@patch("src.wrike.requests.get")
+def test_timelog_change_drops_lists_without_a_tracked_window(mock_get):
+    _seed_cache()
+    all_timelogs = (None, None, False)
+    wrike.cache[
+        wrike._cache_key(wrike._get_all_timelogs_internal, all_timelogs, {})
+    ] = [{"id": "log1", "trackedDate": "2023-01-10"}]
+    mock_get.return_value = MagicMock(status_code=200, headers={})
+    mock_get.return_value.json.return_value = {
+        "data": [{"id": "log1", "trackedDate": "2023-01-12"}]
+    }
+
+    handle_wrike_events(
+        [{"eventType": "TimelogChanged", "timelogId": "log1", "taskId": "t1"}]
+    )
+
+    # Fetched again on the next call instead of missing the timelog
+    assert _cached(wrike._get_all_timelogs_internal, *all_timelogs) is None
+    assert _cached(wrike._get_all_timelogs_internal, None, january, False) == [
+        {"id": "log1", "trackedDate": "2023-01-12"}
+    ]
+    wrike.delete_cache()
@@ -1,7 +1,21 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch, MagicMock
 import pytest
-from src.wrike import _validate_task_id, get_task_by_id, delete_cache
+from src import wrike
+from src.checkpoint import ProviderError
+from src.folder_index import FolderIndex
+from src.wrike import (
+    _validate_task_id,
+    create_time_logs_from_data,
+    delete_cache,
+    fetch_data,
+    get_all_timelogs,
+    get_task_by_id,
+    get_tasks_for_folders,
+    iter_timelogs_with_task_data,
+)
 
 # Set a temporary cache directory for testing
 os.environ["WRIKE_DISK_CACHE_DIR"] = "/tmp/test_disk_cache"
@@ -26,6 +40,7 @@ def test_get_task_by_id(mock_get):
     # Mocking a successful API response
     successful_response = MagicMock()
     successful_response.status_code = 200
+    successful_response.headers = {}
     successful_response.json = MockResponse.json
     mock_get.return_value = successful_response
 
@@ -39,6 +54,7 @@ def test_get_task_by_id(mock_get):
     # Mocking an unsuccessful API response
     unsuccessful_response = MagicMock()
     unsuccessful_response.status_code = 400
+    unsuccessful_response.headers = {}
     unsuccessful_response.json = lambda: {"error": "Bad Request"}
     mock_get.return_value = unsuccessful_response
 
@@ -46,4 +62,190 @@ def test_get_task_by_id(mock_get):
     assert task is None
 
     # Clean up the cache at the end of the test
-    delete_cache()
\ No newline at end of file
+    delete_cache()
+
+
+def _timelogs_response(url, headers=None, params=None):
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {}
+    month = params["trackedDate"]["start"][:7]
+    response.json.return_value = {
+        "data": [
+            {"id": f"{month}-a", "trackedDate": f"{month}-05"},
+            {"id": f"{month}-b", "trackedDate": f"{month}-20"},
+        ]
+    }
+    return response
+
+
+@patch("src.wrike.requests.get")
+def test_get_all_timelogs_fetches_and_caches_month_windows(mock_get):
+    delete_cache()
+    mock_get.side_effect = _timelogs_response
+
+    timelogs = get_all_timelogs(tracked_date_range=("2023-01-10", "2023-02-10"))
+
+    assert [timelog["id"] for timelog in timelogs] == ["2023-01-b", "2023-02-a"]
+    assert mock_get.call_count == 2
+
+    # February is over, so an overlapping range is served from the cache
+    timelogs = get_all_timelogs(tracked_date_range=("2023-02-01", "2023-02-28"))
+
+    assert [timelog["id"] for timelog in timelogs] == ["2023-02-a", "2023-02-b"]
+    assert mock_get.call_count == 2
+
+    delete_cache()
+
+
+@patch("src.wrike.get_all_tasks")
+@patch("src.wrike.get_folder_index")
+def test_get_tasks_for_folders_fetches_roots_once(
+    mock_get_folder_index, mock_get_all_tasks
+):
+    mock_get_folder_index.return_value = FolderIndex(
+        [
+            {"id": "parent", "title": "Parent", "childIds": ["child"]},
+            {"id": "child", "title": "Child", "childIds": []},
+            {"id": "other", "title": "Other", "childIds": []},
+        ]
+    )
+    mock_get_all_tasks.side_effect = lambda folder_or_project_id: {
+        "parent": [("t1", "Task 1"), ("t2", "Task 2")],
+        "other": [("t2", "Task 2"), ("t3", "Task 3")],
+    }[folder_or_project_id]
+
+    tasks = get_tasks_for_folders(["child", " parent", "other", ""])
+
+    assert tasks == [("t1", "Task 1"), ("t2", "Task 2"), ("t3", "Task 3")]
+    assert mock_get_all_tasks.call_count == 2
+
+
+@patch("src.wrike._get_tasks_by_ids_internal")
+@patch("src.wrike._iter_timelogs")
+def test_iter_timelogs_with_task_data_batches_task_fetches(
+    mock_iter_timelogs, mock_get_tasks_by_ids
+):
+    delete_cache()
+    mock_iter_timelogs.return_value = iter(
+        {"id": str(i), "taskId": f"T{i % 250}", "hours": 1} for i in range(1000)
+    )
+    mock_get_tasks_by_ids.side_effect = lambda task_ids: {
+        task_id: (
+            None
+            if task_id == "T0"
+            else {"title": f"Task {task_id}", "permalink": task_id}
+        )
+        for task_id in task_ids
+    }
+
+    chunks = list(iter_timelogs_with_task_data(chunk_size=500, task_cache_size=300))
+
+    assert [len(chunk) for chunk in chunks] == [500, 500]
+    # 250 distinct tasks, fetched 100 at a time and kept in memory for the second chunk
+    assert mock_get_tasks_by_ids.call_count == 3
+    assert (
+        max(len(call.args[0]) for call in mock_get_tasks_by_ids.call_args_list) == 100
+    )
+    assert chunks[0][0]["task_name"] == "Unknown Task Name"
+    assert chunks[0][1]["task_name"] == "Task T1"
+    assert chunks[1][1]["permalink"] == "T1"
+
+    # The tasks found are read from the disk cache on the next run
+    mock_iter_timelogs.return_value = iter(
+        [{"id": "1", "taskId": "T1", "hours": 1}, {"id": "2", "hours": 1}]
+    )
+    chunks = list(iter_timelogs_with_task_data())
+
+    assert mock_get_tasks_by_ids.call_count == 3
+    assert chunks[0][0]["task_name"] == "Task T1"
+    assert chunks[0][1]["task_name"] == "Unknown Task Name"
+    delete_cache()
+
+
+@patch("src.wrike._create_timelog_internal")
+def test_create_time_logs_from_data_resumes_from_journal(mock_create_timelog, tmp_path):
+    journal_path = str(tmp_path / "journal.sqlite3")
+    rows = [["2024-10-24", "1", "", "T1"], ["2024-10-24", "2", "", "T2"]]
+    mock_create_timelog.side_effect = [{"data": [{"id": "TL1"}]}, None]
+
+    timelogs = create_time_logs_from_data(rows, journal_path=journal_path)
+
+    assert timelogs == [{"data": [{"id": "TL1"}]}, None]
+
+    mock_create_timelog.side_effect = [{"data": [{"id": "TL2"}]}]
+    timelogs = create_time_logs_from_data(rows, resume=True, journal_path=journal_path)
+
+    assert timelogs == [{"data": [{"id": "TL2"}]}]
+    assert mock_create_timelog.call_args.args[0] == "T2"
+
+
+@patch("src.checkpoint.time.sleep")
+@patch("src.wrike._create_timelog_internal")
+def test_create_time_logs_from_data_only_pauses_on_provider_errors(
+    mock_create_timelog, mock_sleep, tmp_path
+):
+    journal_path = str(tmp_path / "journal.sqlite3")
+    rows = [["2024-10-24", str(hours), "", "T1"] for hours in range(1, 11)]
+
+    # Rejected rows fail one by one, Wrike is fine
+    mock_create_timelog.return_value = None
+    timelogs = create_time_logs_from_data(rows, journal_path=journal_path)
+
+    assert timelogs == [None] * 10
+    mock_sleep.assert_not_called()
+
+    mock_create_timelog.side_effect = [ProviderError("Wrike answered 503", 503)] * 5
+    create_time_logs_from_data(rows[:5], journal_path=journal_path)
+
+    mock_sleep.assert_called_once_with(30)
+
+
+@patch("src.wrike.requests.get")
+def test_iter_task_pages_does_not_keep_pages(mock_get):
+    delete_cache()
+    first, last = MagicMock(status_code=200), MagicMock(status_code=200)
+    first.headers, last.headers = {"ETag": '"p1"'}, {"ETag": '"p2"'}
+    first.json.return_value = {"data": [{"id": "T1"}], "nextPageToken": "next"}
+    last.json.return_value = {"data": [{"id": "T2"}]}
+    mock_get.side_effect = [first, last]
+
+    pages = list(wrike.iter_task_pages(page_size=1))
+
+    assert pages == [[("T1", None)], [("T2", None)]]
+    assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+    assert len(wrike.cache) == 0
+
+
+def test_fetch_data_calls_once_for_concurrent_callers():
+    delete_cache()
+    calls = []
+
+    def _get_slow_task_internal(task_id):
+        calls.append(task_id)
+        time.sleep(0.1)
+        return {"id": task_id}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(
+                lambda _: fetch_data(_get_slow_task_internal, "abc123"), range(8)
+            )
+        )
+
+    assert results == [{"id": "abc123"}] * 8
+    assert calls == ["abc123"]
+    delete_cache()
+
+
+def test_fetch_data_keeps_user_lookups_apart_per_token():
+    delete_cache()
+
+    def _get_connected_user_id_internal():
+        return wrike.WRIKE_ACCESS_TOKEN
+
+    with patch("src.wrike.WRIKE_ACCESS_TOKEN", "token A"):
+        assert fetch_data(_get_connected_user_id_internal) == "token A"
+    with patch("src.wrike.WRIKE_ACCESS_TOKEN", "token B"):
+        assert fetch_data(_get_connected_user_id_internal) == "token B"
+    delete_cache()